@@ -0,0 +1,64 @@
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scraper'))
+
+from crawl4ai import AsyncWebCrawler
+from hn_scraper import HackerNewsJobScraper
+from scraper_config import ScraperConfig
+
+# Per-URL latency with one browser launch per URL (the old behaviour)
+# versus warm browsers borrowed from the scraper's pool.
+#
+#   python benchmarks/bench_browser_pool.py [url] [repeats]
+
+DEFAULT_URL = "https://hnhiring.com/march-2025"
+
+
+async def scrape_cold(url: str) -> float:
+    config = ScraperConfig()
+    start = time.perf_counter()
+    crawler = AsyncWebCrawler(config=config.browser_config)
+    await crawler.__aenter__()
+    try:
+        await crawler.arun(url=url, config=config.crawler_run_config)
+    finally:
+        await crawler.__aexit__(None, None, None)
+    return time.perf_counter() - start
+
+
+async def bench_cold(url: str, repeats: int) -> list:
+    return [await scrape_cold(url) for _ in range(repeats)]
+
+
+async def bench_pooled(url: str, repeats: int) -> list:
+    timings = []
+    async with HackerNewsJobScraper(pool_size=1) as scraper:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            await scraper.scrape_url(url)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label: str, timings: list):
+    print(f"{label:>8}: mean={statistics.mean(timings) * 1000:8.1f} ms  "
+          f"median={statistics.median(timings) * 1000:8.1f} ms  "
+          f"min={min(timings) * 1000:8.1f} ms  n={len(timings)}")
+
+
+async def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_URL
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print(f"Benchmarking {url} x{repeats}")
+    report("cold", await bench_cold(url, repeats))
+    # The first pooled request includes the one-off browser launch
+    report("pooled", await bench_pooled(url, repeats))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
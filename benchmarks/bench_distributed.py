@@ -0,0 +1,189 @@
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import yaml
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, '..')
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+from fake_services import FakeLLMServer, SyntheticSite
+from job_store import JobStore
+from work_queue import DONE, WorkQueue
+
+# Throughput of distributed.py against worker count, with a synthetic
+# hnhiring.com and a fake LLM provider: the coordinator enqueues every
+# thread, then 1, 2, 4 ... worker processes drain the queue. With --kill,
+# one more run SIGKILLs a worker once a third of the post chunks are done;
+# the others must pick up its tasks when its leases expire and end with the
+# same jobs as the clean runs, none twice. With --remote the coordinator
+# serves the queue over HTTP (coordinator --serve) and every worker runs in
+# a directory of its own, joined with --coordinator as from another host.
+#
+#   python benchmarks/bench_distributed.py [--workers 1,2,4] [--pages 6] [--posts 200]
+#                                          [--llm-latency 0.2] [--lease-seconds 3] [--kill] [--remote]
+#
+# Workers need crawl4ai installed, like the extract stage of bench_end_to_end.
+
+DISTRIBUTED = os.path.join(ROOT, 'distributed.py')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and process.poll() is None:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"coordinator did not start serving on port {port}")
+
+
+def write_config(work_dir: str, site: SyntheticSite, llm: FakeLLMServer, args, port: int = 8765) -> str:
+    config = {
+        'provider': 'openai/gpt-4o-mini',
+        'api_token': 'bench',
+        'base_url': llm.openai_base_url,
+        'params': {'temperature': 0},
+        'chunking': {'chunk_tokens': 1500, 'workers': args.llm_concurrency},
+        'batching': {'enabled': True, 'max_batch_size': 8, 'batch_tokens': 1500},
+        'provider_client': {
+            'max_concurrency': args.llm_concurrency, 'initial_concurrency': args.llm_concurrency, 'backoff_base': 0.1
+        },
+        # The synthetic posts share their bodies and are all well-formed
+        'dedup': {'threshold': 0},
+        'rule_extraction': False,
+        'validation': {'enabled': True},
+        'extraction_cache': {'path': os.path.join(work_dir, 'extraction_cache.sqlite')},
+        'output': {'store': os.path.join(work_dir, 'jobs.sqlite'), 'json': os.path.join(work_dir, 'jobs.json')},
+        'distributed': {
+            'queue': os.path.join(work_dir, 'queue.sqlite'),
+            'lease_seconds': args.lease_seconds,
+            'retry_seconds': 0.5,
+            'posts_per_task': args.posts_per_task,
+            'poll_seconds': 0.2,
+            'server': {'host': '127.0.0.1', 'port': port},
+            'scraper': {
+                'cache_dir': 'page_cache',  # Relative to each worker's directory
+                'requests_per_second': 1000.0,
+                'burst': 1000,
+                'http_fetch_patterns': ['^' + site.url]
+            }
+        }
+    }
+    path = os.path.join(work_dir, 'config.yml')
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return path
+
+
+def run(site: SyntheticSite, llm: FakeLLMServer, args, workers: int, kill: bool = False) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as work_dir:
+        port = free_port()
+        config_path = write_config(work_dir, site, llm, args, port)
+        coordinator_command = [sys.executable, DISTRIBUTED, '--config', config_path, 'coordinator', *site.month_urls]
+        worker_options = []
+        coordinator = None
+        if args.remote:
+            coordinator = subprocess.Popen(coordinator_command + ['--serve'], cwd=work_dir, stdout=subprocess.DEVNULL)
+            wait_for_port(port, coordinator)
+            worker_options = ['--coordinator', f'http://127.0.0.1:{port}']
+        else:
+            subprocess.run(coordinator_command, cwd=work_dir, check=True, stdout=subprocess.DEVNULL)
+        queue = WorkQueue(os.path.join(work_dir, 'queue.sqlite'))
+        requests_before = llm.requests
+        start = time.perf_counter()
+        processes: List[subprocess.Popen] = []
+        for i in range(workers):
+            log = open(os.path.join(work_dir, f'worker{i}.log'), 'w')
+            # A remote worker gets a directory of its own, sharing no files with the coordinator
+            worker_dir = os.path.join(work_dir, f'worker{i}') if args.remote else work_dir
+            os.makedirs(worker_dir, exist_ok=True)
+            processes.append(subprocess.Popen(
+                [sys.executable, DISTRIBUTED, '--config', config_path, 'worker', '--id', f'worker{i}', *worker_options],
+                cwd=worker_dir, stdout=log, stderr=subprocess.STDOUT
+            ))
+        killed_at: Optional[float] = None
+        expected_chunks = len(site.month_urls) * -(-args.posts // args.posts_per_task)
+        while any(process.poll() is None for process in processes):
+            time.sleep(0.1)
+            if kill and killed_at is None and queue.counts().get('posts', {}).get(DONE, 0) >= expected_chunks // 3:
+                processes[0].send_signal(signal.SIGKILL)
+                killed_at = time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+        if coordinator is not None:
+            coordinator.wait(timeout=60)
+        failed = [process.returncode for process in processes[1 if kill else 0:] if process.returncode]
+        if failed:
+            with open(os.path.join(work_dir, 'worker1.log' if kill else 'worker0.log')) as f:
+                print(f.read()[-3000:])
+            raise RuntimeError(f"workers exited with {failed}")
+
+        counts = queue.counts()
+        queue.close()
+        with JobStore(os.path.join(work_dir, 'jobs.sqlite')) as store:
+            ids = [job['id'] for job in store.iter_jobs(columns=['id'])]
+        return {
+            'seconds': elapsed,
+            'posts_per_sec': len(site.month_urls) * args.posts / elapsed,
+            'jobs': len(ids),
+            'distinct_jobs': len(set(ids)),
+            'llm_requests': llm.requests - requests_before,
+            'tasks_done': sum(states.get(DONE, 0) for states in counts.values()),
+            'tasks_unfinished': sum(count for states in counts.values() for state, count in states.items() if state != DONE),
+            'killed_at': killed_at
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed crawl + extraction throughput against worker count")
+    parser.add_argument('--workers', default='1,2,4', help="Worker counts to run")
+    parser.add_argument('--pages', type=int, default=6, help="Monthly thread pages served")
+    parser.add_argument('--posts', type=int, default=200, help="Posts per page")
+    parser.add_argument('--posts-per-task', type=int, default=24)
+    parser.add_argument('--llm-latency', type=float, default=0.2, help="Seconds per fake LLM request")
+    parser.add_argument('--llm-concurrency', type=int, default=4, help="LLM requests in flight per worker")
+    parser.add_argument('--lease-seconds', type=float, default=3.0)
+    parser.add_argument('--kill', action='store_true', help="Also run with a worker killed mid-way")
+    parser.add_argument('--remote', action='store_true', help="Workers join over HTTP, sharing no files")
+    args = parser.parse_args()
+    worker_counts = [int(count) for count in args.workers.split(',')]
+
+    jobs_html = os.path.join(ROOT, 'jobs.html')
+    with SyntheticSite(jobs_html, posts_per_page=args.posts, months=args.pages) as site, \
+            FakeLLMServer(latency=args.llm_latency, jitter=0.05) as llm:
+        baseline = None
+        for workers in worker_counts:
+            result = run(site, llm, args, workers)
+            baseline = baseline or result
+            print(f"{workers} workers: {result['seconds']:6.1f} s  {result['posts_per_sec']:8.1f} posts/s  "
+                  f"x{baseline['seconds'] / result['seconds']:.2f}  {result['jobs']:,} jobs  "
+                  f"{result['llm_requests']:,} LLM requests  {result['tasks_done']} tasks")
+            if result['jobs'] != baseline['jobs']:
+                print(f"    MISMATCH: {result['jobs']:,} jobs against {baseline['jobs']:,}")
+
+        if args.kill:
+            workers = max(worker_counts[-1], 2)
+            result = run(site, llm, args, workers, kill=True)
+            ok = result['jobs'] == result['distinct_jobs'] == baseline['jobs'] and not result['tasks_unfinished']
+            print(f"{workers} workers, one killed at {result['killed_at']:.1f} s: {result['seconds']:6.1f} s  "
+                  f"{result['jobs']:,} jobs ({result['distinct_jobs']:,} distinct)  "
+                  f"{result['llm_requests']:,} LLM requests  {'OK' if ok else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
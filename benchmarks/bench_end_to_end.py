@@ -0,0 +1,257 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCH_DIR, '..')
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scraper'))
+sys.path.insert(0, os.path.join(ROOT, 'preprocessing'))
+
+from fake_services import FakeLLMServer, SyntheticSite
+from bench_rule_extractor import html_to_markdown
+from bench_preprocess import PRIORITY, write_corpus
+
+# End-to-end throughput of the scraper, LLM extraction and preprocessing
+# against local stand-ins: a synthetic hnhiring.com built from jobs.html and
+# a fake OpenAI-compatible provider with configurable latency. No network
+# or model is needed. Each run is appended to a results file and compared
+# with the last run that used the same parameters.
+#
+#   python benchmarks/bench_end_to_end.py [--pages 6] [--posts 200] [--llm-latency 0.2]
+#                                         [--jobs 100000] [--stages scrape,extract,preprocess] [--http-fetch] [--prune]
+#                                         [--batch-size 8] [--llm-failure-rate 0.1] [--fail-on-regression 10]
+#
+# The scrape stage needs crawl4ai with a browser installed and the extract
+# stage needs crawl4ai; stages whose dependencies are missing are reported
+# as skipped rather than failing the run.
+
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, 'results', 'end_to_end.jsonl')
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def fetch_markdown(urls: List[str]) -> List[Tuple[str, str]]:
+    """Plain urllib fallback used when the scrape stage is skipped"""
+    pages = []
+    for url in urls:
+        with urllib.request.urlopen(url) as response:
+            pages.append((url, html_to_markdown(response.read().decode('utf-8'))))
+    return pages
+
+
+async def bench_scrape(site: SyntheticSite, cache_dir: str, http_fetch: bool) -> Tuple[Dict[str, float], List[Tuple[str, str]]]:
+    from hn_scraper import HackerNewsJobScraper
+    from page_cache import CachePolicy
+    from scraper_config import ScraperConfig
+
+    # No throttling and no cache reuse: this measures fetch + render
+    config = ScraperConfig(
+        cache_policy=CachePolicy.ALWAYS_FRESH,
+        cache_dir=cache_dir,
+        requests_per_second=1000.0,
+        burst=1000,
+        # The synthetic site is server-rendered, like hnhiring.com
+        http_fetch_patterns=['^' + site.url] if http_fetch else []
+    )
+    pages = []
+    start = time.perf_counter()
+    async with HackerNewsJobScraper(config=config) as scraper:
+        async for result in scraper.scrape_many(site.month_urls):
+            if result['success']:
+                pages.append((result['url'], str(result['content'])))
+    elapsed = time.perf_counter() - start
+    total_bytes = sum(len(site.page(path)[0]) for path in site.month_paths)
+    return {
+        'scrape_pages_per_sec': len(pages) / elapsed,
+        'scrape_posts_per_sec': len(pages) * site.posts_per_page / elapsed,
+        'scrape_mb_per_sec': total_bytes / elapsed / 1e6,
+        'scrape_failed_pages': len(site.month_urls) - len(pages)
+    }, pages
+
+
+async def bench_extract(
+    llm: FakeLLMServer,
+    pages: List[Tuple[str, str]],
+    posts_per_page: int,
+    work_dir: str,
+    chunk_tokens: int,
+    workers: int,
+    rule_extraction: bool,
+    batch_size: int,
+    prune: bool
+) -> Dict[str, float]:
+    from newllmextraction import (
+        JOB_INSTRUCTION, create_batch_extractor, create_extraction_strategy, create_provider_client,
+        create_record_validator, extract_jobs_from_page
+    )
+    from schema import WhoIsHiring
+    from job_sink import JsonlJobSink
+
+    config = {
+        'provider': 'openai/gpt-4o-mini',
+        'api_token': 'bench',
+        'base_url': llm.openai_base_url,
+        'params': {'temperature': 0},
+        'batching': {'enabled': batch_size > 0, 'max_batch_size': batch_size, 'batch_tokens': chunk_tokens},
+        'validation': {'enabled': True},
+        # Start at the ceiling so runs without failures measure the same thing as before
+        'provider_client': {'max_concurrency': workers, 'initial_concurrency': workers, 'backoff_base': 0.1}
+    }
+    strategy = create_extraction_strategy(config, WhoIsHiring.model_json_schema(), JOB_INSTRUCTION)
+    client = create_provider_client(config)
+    batcher = create_batch_extractor(config, WhoIsHiring.model_json_schema(), JOB_INSTRUCTION, client)
+    validator = create_record_validator(config, WhoIsHiring.model_json_schema())
+    requests_before = llm.requests
+    prompt_tokens_before = llm.prompt_tokens
+    records = 0
+    start = time.perf_counter()
+    with JsonlJobSink(os.path.join(work_dir, 'jobs.jsonl')) as sink:
+        for url, markdown in pages:
+            # Repost collapsing is off: the synthetic posts share their bodies
+            page_records = await extract_jobs_from_page(
+                strategy, url, markdown, sink, chunk_tokens=chunk_tokens, workers=workers,
+                dedup_threshold=0, rule_extraction=rule_extraction, batcher=batcher,
+                client=client, prune=prune, validator=validator
+            )
+            records += sum(1 for record in page_records if not record.get('error'))
+    elapsed = time.perf_counter() - start
+    return {
+        'extract_pages_per_sec': len(pages) / elapsed,
+        'extract_posts_per_sec': len(pages) * posts_per_page / elapsed,
+        'extract_records': records,
+        'extract_llm_requests': llm.requests - requests_before,
+        'extract_llm_prompt_tokens': llm.prompt_tokens - prompt_tokens_before,
+        'extract_llm_retries': client.retries
+    }
+
+
+def bench_preprocess(num_jobs: int, work_dir: str) -> Dict[str, float]:
+    import preprocess_data
+
+    path = os.path.join(work_dir, 'corpus.json')
+    write_corpus(path, num_jobs)
+    stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    try:
+        start = time.perf_counter()
+        documents = preprocess_data.preprocess_job_data(path, PRIORITY)
+        elapsed = time.perf_counter() - start
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return {'preprocess_docs_per_sec': len(documents) / elapsed}
+
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(current: Dict[str, Any], previous: Optional[Dict[str, Any]], threshold: float) -> List[str]:
+    """Print each metric against the previous comparable run. Returns the regressed metrics"""
+    regressions = []
+    for name, value in current['metrics'].items():
+        line = f"{name:>26}: {value:>12,.2f}"
+        old = (previous or {}).get('metrics', {}).get(name)
+        if old:
+            change = (value - old) / old * 100
+            line += f"   {change:+6.1f}% vs {previous.get('commit') or 'previous run'}"
+            # Throughput metrics regress by going down
+            if name.endswith('_per_sec') and change < -threshold:
+                line += "   REGRESSION"
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark against a local site and fake LLM provider")
+    parser.add_argument('--pages', type=int, default=6, help="Monthly thread pages served")
+    parser.add_argument('--posts', type=int, default=200, help="Posts per page")
+    parser.add_argument('--site-latency', type=float, default=0.0, help="Seconds added to each page request")
+    parser.add_argument('--llm-latency', type=float, default=0.2, help="Seconds per fake LLM request")
+    parser.add_argument('--llm-jitter', type=float, default=0.05)
+    parser.add_argument('--llm-failure-rate', type=float, default=0.0, help="Share of fake LLM requests failing with a 500")
+    parser.add_argument('--chunk-tokens', type=int, default=1500)
+    parser.add_argument('--workers', type=int, default=4, help="Concurrent LLM requests")
+    parser.add_argument('--rules', action='store_true', help="Let the rule extractor skip well-formed posts")
+    parser.add_argument('--batch-size', type=int, default=0,
+                        help="Posts per request with the batching extractor (0: chunked extraction)")
+    parser.add_argument('--prune', action='store_true', help="Prune pages and posts before extraction")
+    parser.add_argument('--jobs', type=int, default=100_000, help="Jobs in the preprocessing corpus")
+    parser.add_argument('--http-fetch', action='store_true', help="Scrape over plain HTTP instead of the browser")
+    parser.add_argument('--stages', default='scrape,extract,preprocess')
+    parser.add_argument('--results', default=DEFAULT_RESULTS)
+    parser.add_argument('--fail-on-regression', type=float, default=None, metavar='PCT',
+                        help="Exit with 1 if a throughput drops more than PCT%% against the last comparable run")
+    args = parser.parse_args()
+    stages = set(args.stages.split(','))
+
+    params = {k: v for k, v in vars(args).items() if k not in ('results', 'fail_on_regression')}
+    metrics: Dict[str, float] = {}
+    skipped: Dict[str, str] = {}
+    jobs_html = os.path.join(ROOT, 'jobs.html')
+
+    with tempfile.TemporaryDirectory() as work_dir, \
+            SyntheticSite(jobs_html, posts_per_page=args.posts, months=args.pages, latency=args.site_latency) as site, \
+            FakeLLMServer(latency=args.llm_latency, jitter=args.llm_jitter, failure_rate=args.llm_failure_rate) as llm:
+        pages = None
+        if 'scrape' in stages:
+            try:
+                scrape_metrics, pages = asyncio.run(bench_scrape(site, os.path.join(work_dir, 'page_cache'), args.http_fetch))
+                metrics.update(scrape_metrics)
+            except ImportError as e:
+                skipped['scrape'] = f"missing dependency: {e.name}"
+
+        if 'extract' in stages:
+            if not pages:
+                pages = fetch_markdown(site.month_urls)
+            try:
+                metrics.update(asyncio.run(
+                    bench_extract(llm, pages, args.posts, work_dir, args.chunk_tokens, args.workers, args.rules,
+                                  args.batch_size, args.prune)
+                ))
+            except ImportError as e:
+                skipped['extract'] = f"missing dependency: {e.name}"
+
+        if 'preprocess' in stages:
+            metrics.update(bench_preprocess(args.jobs, work_dir))
+
+    result = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'params': params,
+        'metrics': metrics,
+        'skipped': skipped
+    }
+    previous = next((run for run in reversed(load_history(args.results)) if run['params'] == params), None)
+    regressions = compare(result, previous, args.fail_on_regression or 0.0)
+    for stage, reason in skipped.items():
+        print(f"{stage:>26}: skipped ({reason})")
+
+    os.makedirs(os.path.dirname(args.results), exist_ok=True)
+    with open(args.results, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(result) + '\n')
+    print(f"Appended results to {args.results}")
+
+    if args.fail_on_regression is not None and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
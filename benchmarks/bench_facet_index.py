@@ -0,0 +1,110 @@
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'search'))
+
+from facet_index import KEYWORD_FIELDS, FacetIndex, build_facet_index, keyword_terms
+from job_facets import job_facets
+
+# Build time, size and filtered query latency of the facet index, against
+# a linear scan of the same jobs, on a synthetic corpus made from jobs.json
+# with randomised stacks, locations and thread months.
+#
+#   python benchmarks/bench_facet_index.py [num_postings] [num_queries]
+
+STACK = ['Python', 'Go', 'Golang', 'Rust', 'Java', 'TypeScript', 'Node.js', 'React', 'Postgres',
+         'PostgreSQL', 'AWS', 'GCP', 'Kubernetes', 'Django', 'Rails', 'Kafka', 'Spark', 'C++', 'Swift']
+LOCATIONS = ['Remote (US)', 'Remote (US or Canada)', 'San Francisco, CA', 'SF Bay Area | Hybrid',
+             'New York, NY', 'NYC | ONSITE', 'Berlin, Germany', 'London, UK | Hybrid', 'Remote (EU)',
+             'Tokyo, JP or San Francisco, CA', 'Remote', 'Toronto, Canada | Remote']
+QUERIES = [
+    {'filters': {'tech': 'python', 'work': 'remote'}},
+    {'filters': {'tech': ['go', 'rust'], 'city': ['san francisco', 'new york']}},
+    {'require': ['tech:postgresql', 'tech:kubernetes'], 'exclude': ['work:onsite']},
+    {'filters': {'work': 'hybrid', 'month': '2024-06'}, 'keywords': 'engineer'},
+    {'filters': {'region': 'europe'}, 'keywords': 'python engineer'},
+]
+
+
+def synthetic_postings(num_postings: int):
+    with open(os.path.join(ROOT, 'jobs.json'), 'r', encoding='utf-8') as f:
+        templates = json.load(f)
+    vocabulary = ' '.join(job['job_description'] for job in templates).split()
+    rng = random.Random(0)
+    for i in range(num_postings):
+        job = dict(rng.choice(templates))
+        company = job['company_name_and_location'].split('|')[0].strip()
+        job['company_name_and_location'] = f"{company} {i % 5000} | {rng.choice(LOCATIONS)}"
+        job['technology_stack'] = ' / '.join(rng.sample(STACK, rng.randint(2, 6)))
+        job['job_description'] = ' '.join(rng.choices(vocabulary, k=40))
+        job['thread_month'] = f"{2015 + i * 10 // num_postings}-{i % 12 + 1:02d}"
+        yield job
+
+
+def scan(facets, query):
+    """Reference answer: test every job's facets"""
+    filters = {kind: [values] if isinstance(values, str) else values for kind, values in query.get('filters', {}).items()}
+    hits = 0
+    for job_facet_set, words in facets:
+        if any(not any(f"{kind}:{value}" in job_facet_set for value in values) for kind, values in filters.items()):
+            continue
+        if any(facet not in job_facet_set for facet in query.get('require', [])):
+            continue
+        if any(facet in job_facet_set for facet in query.get('exclude', [])):
+            continue
+        if any(word not in words for word in keyword_terms(query.get('keywords', ''))):
+            continue
+        hits += 1
+    return hits
+
+
+def percentile(latencies, q):
+    return latencies[max(int(len(latencies) * q) - 1, 0)]
+
+
+def main():
+    num_postings = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    jobs = list(synthetic_postings(num_postings))
+    with tempfile.TemporaryDirectory() as index_dir:
+        start = time.perf_counter()
+        build_facet_index(index_dir, jobs)
+        print(f"Build: {time.perf_counter() - start:.1f} s for {num_postings:,} postings, "
+              f"postings file {os.path.getsize(os.path.join(index_dir, 'postings.bin')) / 1e6:.1f} MB")
+
+        # The linear scan gets its facets precomputed, so only matching is timed
+        facets = [
+            (set(job_facets(job)), set(keyword_terms(' '.join(str(job.get(field, '')) for field in KEYWORD_FIELDS))))
+            for job in jobs
+        ]
+        del jobs
+
+        with FacetIndex(index_dir) as index:
+            for query in QUERIES:
+                latencies = []
+                for i in range(num_queries):
+                    # Cold posting lists each time: the cache would hide the decoding cost
+                    index._cache.clear()
+                    start = time.perf_counter()
+                    hits = len(index.match(**query))
+                    latencies.append((time.perf_counter() - start) * 1000)
+                latencies.sort()
+
+                start = time.perf_counter()
+                expected = scan(facets, query)
+                scan_ms = (time.perf_counter() - start) * 1000
+                print(f"{json.dumps(query)}\n    {hits:,} hits (scan {expected:,})  "
+                      f"p50={statistics.median(latencies):.2f} ms  p99={percentile(latencies, 0.99):.2f} ms  "
+                      f"linear scan {scan_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from near_duplicates import collapse_near_duplicates
+
+# Scaling of MinHash/LSH near-duplicate detection. A linear algorithm keeps
+# the time per post flat as the corpus grows.
+#
+#   python benchmarks/bench_near_duplicates.py [largest_corpus]
+
+
+def synthetic_posts(num_posts: int, repost_rate: float = 0.3, seed: int = 0):
+    """Random posts over the jobs.json vocabulary, a share of them lightly edited reposts"""
+    with open(os.path.join(ROOT, 'jobs.json'), 'r', encoding='utf-8') as f:
+        vocabulary = ' '.join(job['job_description'] for job in json.load(f)).split()
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(num_posts):
+        if posts and rng.random() < repost_rate:
+            words = rng.choice(posts).split()
+            # Change a couple of words, like a new month's repost
+            for _ in range(2):
+                words[rng.randrange(len(words))] = rng.choice(vocabulary)
+            posts.append(' '.join(words))
+        else:
+            posts.append(' '.join(rng.choices(vocabulary, k=120)))
+    return posts
+
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 80_000
+    size = largest // 8
+    while size <= largest:
+        posts = synthetic_posts(size)
+        start = time.perf_counter()
+        unique, reposts = collapse_near_duplicates(posts)
+        elapsed = time.perf_counter() - start
+        print(f"{size:>8,} posts: {elapsed:6.2f} s  {elapsed / size * 1e6:7.1f} us/post  "
+              f"{len(unique):,} unique, {sum(len(d) for d in reposts.values()):,} reposts")
+        size *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import json
+import multiprocessing
+import os
+import random
+import re
+import resource
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'preprocessing'))
+
+# Throughput and peak RSS of preprocess_job_data versus the streaming
+# iter_job_documents on a synthetic corpus built from jobs.json. Every
+# variant runs in a fresh process so peak RSS is not shared between them.
+# 'parallel' is iter_job_documents spread over every core.
+#
+#   python benchmarks/bench_preprocess.py [num_posts]   (default 1,000,000)
+
+PRIORITY = ['job_description', 'technology_stack', 'company_location']
+
+
+def legacy_preprocess_job_data(file_path, field_priority):
+    """The original implementation: whole-file json.load and uncompiled re.sub passes"""
+    def clean_text(text):
+        if not text or text.strip() == "":
+            return ""
+        text = re.sub(r'https?://[^\s]+', '', text)
+        text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '', text)
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'[^\w\s\-\.,/()]', '', text)
+        return text.strip()
+
+    def create_document(job):
+        field_mapping = {
+            'job_description': 'job_description',
+            'technology_stack': 'technology_stack',
+            'company_location': 'company_name_and_location'
+        }
+        cleaned_parts = []
+        for field in field_priority:
+            cleaned_text = clean_text(job.get(field_mapping[field], '') or '')
+            if cleaned_text:
+                cleaned_parts.append(cleaned_text)
+        return ' '.join(cleaned_parts)
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        jobs_data = json.load(f)
+    valid_jobs = [job for job in jobs_data if not job.get('error', False)]
+    return [doc for doc in (create_document(job) for job in valid_jobs) if doc]
+
+
+def write_corpus(path: str, num_posts: int):
+    """Synthetic jobs.json-style array, written incrementally"""
+    with open(os.path.join(ROOT, 'jobs.json'), 'r', encoding='utf-8') as f:
+        templates = json.load(f)
+    rng = random.Random(0)
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write('[\n')
+        for i in range(num_posts):
+            job = dict(rng.choice(templates))
+            job['company_name_and_location'] = f"{job['company_name_and_location']} #{i}"
+            job['error'] = rng.random() < 0.02
+            out.write(json.dumps(job, ensure_ascii=False))
+            out.write(',\n' if i < num_posts - 1 else '\n')
+        out.write(']\n')
+
+
+def run_variant(name: str, path: str, results):
+    import preprocess_data
+
+    start = time.perf_counter()
+    if name == 'legacy':
+        count = len(legacy_preprocess_job_data(path, PRIORITY))
+    elif name == 'preprocess_job_data':
+        # Silence the progress prints
+        sys.stdout = open(os.devnull, 'w')
+        count = len(preprocess_data.preprocess_job_data(path, PRIORITY))
+    elif name == 'iter_job_documents':
+        count = sum(1 for _ in preprocess_data.iter_job_documents(path, PRIORITY))
+    else:
+        # Parallel mode on every core. Peak RSS here is the parent only
+        count = sum(1 for _ in preprocess_data.iter_job_documents(path, PRIORITY, workers=None))
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((name, count, elapsed, peak_kb))
+
+
+def main():
+    num_posts = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    ctx = multiprocessing.get_context('spawn')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'corpus.json')
+        write_corpus(path, num_posts)
+        print(f"Corpus: {num_posts:,} posts, {os.path.getsize(path) / 1e6:,.1f} MB")
+
+        for name in ('legacy', 'preprocess_job_data', 'iter_job_documents', 'parallel'):
+            results = ctx.Queue()
+            process = ctx.Process(target=run_variant, args=(name, path, results))
+            process.start()
+            name, count, elapsed, peak_kb = results.get()
+            process.join()
+            print(f"{name:>20}: {count / elapsed:>10,.0f} docs/sec  "
+                  f"{elapsed:7.2f} s  peak RSS {peak_kb / 1024:8.1f} MB  ({count:,} docs)")
+
+
+if __name__ == "__main__":
+    main()
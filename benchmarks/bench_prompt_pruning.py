@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scraper'))
+
+from http_fetcher import html_to_markdown
+from post_chunker import estimate_tokens, split_posts
+from prompt_pruner import prune_page, prune_post
+
+# Prompt tokens saved by prompt_pruner on two kinds of crawled page: the
+# hnhiring.com layout of jobs.html, and an HN thread page of the jobs.json
+# posts with the comment chrome (bylines, toggles, reply links, navigation)
+# that the browser's markdown carries. Also times the pruning itself.
+#
+#   python benchmarks/bench_prompt_pruning.py [copies]
+
+HN_THREAD_URL = 'https://news.ycombinator.com/item?id=43243024'
+HN_HEADER = (
+    '[![](https://news.ycombinator.com/y18.svg)](https://news.ycombinator.com) '
+    '[**Hacker News**](https://news.ycombinator.com/news) [new](https://news.ycombinator.com/newest) | '
+    '[past](https://news.ycombinator.com/front) | [comments](https://news.ycombinator.com/newcomments) | '
+    '[ask](https://news.ycombinator.com/ask) | [show](https://news.ycombinator.com/show) | '
+    '[jobs](https://news.ycombinator.com/jobs) | [submit](https://news.ycombinator.com/submit)\n'
+    '[login](https://news.ycombinator.com/login?goto=item%3Fid%3D43243024)\n\n'
+    'Ask HN: Who is hiring? (March 2025)\n'
+)
+HN_FOOTER = (
+    '[Guidelines](https://news.ycombinator.com/newsguidelines.html) | [FAQ](https://news.ycombinator.com/newsfaq.html) | '
+    '[Lists](https://news.ycombinator.com/lists) | [API](https://github.com/HackerNews/API) | '
+    '[Security](https://news.ycombinator.com/security.html) | [Legal](https://www.ycombinator.com/legal/) | '
+    '[Contact](mailto:hn@ycombinator.com)\n'
+)
+
+
+def hn_thread_markdown(jobs) -> str:
+    """An HN "Who is hiring" thread as the browser renders it to markdown"""
+    comments = []
+    for i, job in enumerate(jobs):
+        item = 43243100 + i
+        comments.append(
+            f"[user{i}](https://news.ycombinator.com/user?id=user{i}) "
+            f"[{i % 23 + 1} hours ago](https://news.ycombinator.com/item?id={item}) | "
+            f"[next](https://news.ycombinator.com/item?id={item + 1}) [[–]](javascript:void(0))\n\n"
+            f"{job['company_name_and_location']} | Software Engineer | Full-time\n\n"
+            f"{job['job_description']}\n\n**Stack:** {job['technology_stack']}\n\n"
+            f"{job['application_details']}\n\n"
+            f"[reply](https://news.ycombinator.com/reply?id={item}&goto=item%3Fid%3D43243024%23{item})"
+        )
+    return HN_HEADER + '\n\n---\n\n'.join(comments) + '\n\n' + HN_FOOTER
+
+
+def measure(name: str, url: str, markdown: str):
+    start = time.perf_counter()
+    page = prune_page(markdown, url)
+    posts = split_posts(page)
+    pruned = [prune_post(post) for post in posts]
+    elapsed = time.perf_counter() - start
+
+    before = sum(estimate_tokens(post) for post in split_posts(markdown))
+    after_page = sum(estimate_tokens(post) for post in posts)
+    after = sum(estimate_tokens(text) for text, _ in pruned)
+    links = sum(len(post_links) for _, post_links in pruned)
+    print(f"{name}: {len(posts):,} posts, {len(markdown) / 1e6:.1f} MB, pruned in {elapsed * 1000:.0f} ms "
+          f"({len(markdown) / elapsed / 1e6:.1f} MB/s)")
+    print(f"    prompt tokens   {before:,} -> {after_page:,} without page chrome -> {after:,} pruned "
+          f"({1 - after / before:.1%} saved)")
+    print(f"    application links kept aside: {links:,}")
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    with open(os.path.join(ROOT, 'jobs.html'), 'r', encoding='utf-8') as f:
+        page = html_to_markdown(f.read(), 'https://hnhiring.com/march-2025')
+    sections = page.split('\n---\n')
+    measure('hnhiring.com page', 'https://hnhiring.com/march-2025', '\n---\n'.join(sections * copies))
+
+    with open(os.path.join(ROOT, 'jobs.json'), 'r', encoding='utf-8') as f:
+        jobs = json.load(f)
+    measure('HN thread page', HN_THREAD_URL, hn_thread_markdown(jobs * copies))
+
+
+if __name__ == "__main__":
+    main()
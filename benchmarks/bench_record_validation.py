@@ -0,0 +1,87 @@
+import json
+import os
+import random
+import sys
+import time
+from typing import List
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'llm_extraction'))
+
+import fast_json
+from pydantic import TypeAdapter
+from record_validation import RecordValidator
+from schema import WhoIsHiring
+
+# Validation and serialization of extracted records: the ad-hoc error
+# filter + json path the sink used, against batched RecordValidator
+# validation + fast_json, on records from jobs.json with the output slips
+# LLMs make (lists for strings, nulls, junk objects, truncated answers).
+#
+#   python benchmarks/bench_record_validation.py [num_records]
+
+
+def synthetic_records(num_records: int):
+    with open(os.path.join(ROOT, 'jobs.json'), 'r', encoding='utf-8') as f:
+        templates = [{key: value for key, value in job.items() if key != 'error'} for job in json.load(f)]
+    rng = random.Random(0)
+    records = []
+    for i in range(num_records):
+        record = dict(rng.choice(templates), index=i % 50, error=False)
+        roll = rng.random()
+        if roll < 0.10:
+            record['technology_stack'] = record['technology_stack'].split(' / ')
+        elif roll < 0.15:
+            record['application_details'] = None
+        elif roll < 0.17:
+            record = {'index': i % 50, 'error': False, 'note': 'no job posting in this chunk'}
+        elif roll < 0.18:
+            answer = json.dumps([rng.choice(templates), rng.choice(templates)])
+            record = {'index': i % 50, 'error': True, 'tags': ['error'], 'content': [answer[:len(answer) * 3 // 4]]}
+        records.append(record)
+    return records
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    num_records = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    records = synthetic_records(num_records)
+
+    # Before: only error records are dropped, everything else is written as is
+    kept, filter_time = timed(lambda: [job for job in records if not job.get('error', False)])
+    lines, dumps_time = timed(lambda: [json.dumps(job, ensure_ascii=False) for job in kept])
+    _, loads_time = timed(lambda: [json.loads(line) for line in lines])
+    before = filter_time + dumps_time + loads_time
+
+    validator = RecordValidator(WhoIsHiring)
+    valid, validate_time = timed(lambda: validator.validate(records))
+    fast_lines, fast_dumps_time = timed(lambda: [fast_json.dumps(job) for job in valid])
+    _, fast_loads_time = timed(lambda: [fast_json.loads(line) for line in fast_lines])
+    after = validate_time + fast_dumps_time + fast_loads_time
+
+    per_record = RecordValidator(WhoIsHiring)
+    _, per_record_time = timed(lambda: [per_record.validate([record]) for record in records])
+    # What validating the same records into model instances costs
+    model_adapter = TypeAdapter(List[WhoIsHiring])
+    coerced = [validator.coerce(record) for record in valid]
+    _, model_time = timed(lambda: model_adapter.dump_python(model_adapter.validate_python(coerced)))
+    _, typed_dict_time = timed(lambda: validator.adapter.validate_python(coerced))
+
+    print(f"Records:                     {num_records:,} ({len(kept):,} without the error flag)")
+    print(f"json path:                   {before:.2f} s (filter {filter_time:.2f}, dumps {dumps_time:.2f}, "
+          f"loads {loads_time:.2f})")
+    print(f"validated + fast_json path:  {after:.2f} s (validate {validate_time:.2f}, dumps {fast_dumps_time:.2f}, "
+          f"loads {fast_loads_time:.2f}), json backend: {'orjson' if fast_json.orjson else 'json'}")
+    print(f"validation one per call:     {per_record_time:.2f} s")
+    print(f"TypeAdapter on the model:    {model_time:.2f} s, on its TypedDict {typed_dict_time:.2f} s")
+    print(f"Validator: {validator.stats()}, {len(valid):,} valid records")
+
+
+if __name__ == "__main__":
+    main()
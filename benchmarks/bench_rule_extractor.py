@@ -0,0 +1,93 @@
+import html
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'llm_extraction'))
+
+from post_chunker import split_posts, pack_posts
+from rule_extractor import split_by_rules
+
+# Throughput of the rule-based pre-extractor, and how many LLM calls it saves
+# compared to sending every post to the model. The posts of jobs.html are real
+# (but few). The synthetic posts built from jobs.json are reported on their
+# own: their pipe headers are written in exactly the format the rules expect,
+# so those numbers are an upper bound, not what a real thread gets, while
+# their free-form variants should all be left to the model.
+#
+#   python benchmarks/bench_rule_extractor.py [copies]
+
+
+def jobs_html_to_markdown(path: str) -> str:
+    """Just enough HTML to markdown conversion for the sample page"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return html_to_markdown(f.read())
+
+
+def html_to_markdown(text: str) -> str:
+    """Markdown for pages laid out like jobs.html"""
+    text = re.sub(r'<h2>(.*?)</h2>', r'\n## \1\n', text)
+    text = re.sub(r'<hr\s*/?>', '\n---\n', text)
+    text = re.sub(r'<strong>(.*?)</strong>', r'**\1**', text)
+    text = re.sub(r'<li>', '\n- ', text)
+    text = re.sub(r'<a href="(.*?)">(.*?)</a>', r'[\2](\1)', text)
+    text = re.sub(r'<(title|h1)>.*?</\1>', '', text, flags=re.S)
+    text = re.sub(r'<[^>]+>', '\n', text)
+    return html.unescape(re.sub(r'\n\s*\n+', '\n\n', text))
+
+
+def hn_style_posts(path: str) -> list:
+    """
+    Pipe-header posts in the classic HN format built from jobs.json, plus a
+    free-form variant of each that the rules should hand to the LLM. Every
+    header is well formed, which overstates what real posts get parsed.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        jobs = json.load(f)
+    posts = []
+    for job in jobs:
+        company, _, location = job['company_name_and_location'].partition(' | ')
+        posts.append(
+            f"{company} | Software Engineer | {location or 'Remote'} | Full-time\n\n"
+            f"{job['job_description']}\n\nStack: {job['technology_stack']}\n\n{job['application_details']}"
+        )
+        posts.append(f"{job['job_description']}\n\n{job['application_details']}")
+    return posts
+
+
+def report(title: str, sample: list, copies: int):
+    posts = sample * copies
+
+    start = time.perf_counter()
+    parsed, ambiguous = split_by_rules(posts)
+    elapsed = time.perf_counter() - start
+
+    calls_before = len(pack_posts(posts))
+    calls_after = len(pack_posts([posts[i] for i in ambiguous]))
+
+    print(title)
+    print(f"Posts:              {len(posts)} ({len(sample)} distinct)")
+    print(f"Parsed by rules:    {len(parsed)} ({len(parsed) / len(posts):.1%})")
+    print(f"Throughput:         {len(posts) / elapsed:,.0f} posts/sec")
+    print(f"LLM calls before:   {calls_before}")
+    print(f"LLM calls after:    {calls_after} ({1 - calls_after / calls_before:.1%} fewer)")
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    page_posts = split_posts(jobs_html_to_markdown(os.path.join(ROOT, 'jobs.html')))
+    synthetic = hn_style_posts(os.path.join(ROOT, 'jobs.json'))
+
+    report("jobs.html posts", page_posts, copies)
+    print()
+    report("Synthetic pipe-header posts (upper bound)", synthetic[0::2], copies)
+    print()
+    report("Synthetic free-form posts (rules should parse none)", synthetic[1::2], copies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'search'))
+sys.path.insert(0, os.path.join(ROOT, 'preprocessing'))
+
+from embedders import HashedTfidfEmbedder
+from preprocess_data import clean_text
+from vector_index import VectorIndex, build_index
+
+# Build time and query latency of the vector index on a synthetic corpus
+# made by shuffling words from jobs.json descriptions.
+#
+#   python benchmarks/bench_vector_search.py [num_postings] [num_queries]
+
+QUERIES = [
+    "remote python backend engineer", "data scientist credit models", "founding AI research engineer",
+    "full stack typescript react", "game developer tokyo", "senior data engineer sql dbt"
+]
+
+
+def synthetic_postings(num_postings: int):
+    with open(os.path.join(ROOT, 'jobs.json'), 'r', encoding='utf-8') as f:
+        templates = json.load(f)
+    vocabulary = ' '.join(job['job_description'] + ' ' + job['technology_stack'] for job in templates).split()
+    rng = random.Random(0)
+    for i in range(num_postings):
+        job = dict(rng.choice(templates))
+        job['job_description'] = ' '.join(rng.choices(vocabulary, k=60))
+        job['company_name_and_location'] = f"{job['company_name_and_location']} #{i}"
+        yield job
+
+
+def main():
+    num_postings = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    jobs = list(synthetic_postings(num_postings))
+    documents = [clean_text(job['job_description'] + ' ' + job['technology_stack']) for job in jobs]
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        start = time.perf_counter()
+        build_index(index_dir, documents, jobs, HashedTfidfEmbedder())
+        print(f"Build: {time.perf_counter() - start:.1f} s for {num_postings:,} postings")
+        del jobs, documents
+
+        with VectorIndex(index_dir) as index:
+            latencies = []
+            for i in range(num_queries):
+                start = time.perf_counter()
+                index.search(QUERIES[i % len(QUERIES)], k=10)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    print(f"Query latency: p50={statistics.median(latencies):.2f} ms  "
+          f"p99={latencies[int(len(latencies) * 0.99) - 1]:.2f} ms  max={latencies[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+import gzip
+import hashlib
+import html
+import json
+import random
+import re
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# Local stand-ins for hnhiring.com and the LLM provider, so benchmarks run
+# without the network or a model:
+#
+#   SyntheticSite   "who is hiring" month pages built from jobs.html, any size
+#   FakeLLMServer   OpenAI (/v1/chat/completions) and Ollama (/api/chat,
+#                   /api/generate) compatible endpoint with configurable latency
+#
+# Both run in a background thread and are used as context managers:
+#
+#   with SyntheticSite(posts_per_page=300) as site, FakeLLMServer(latency=0.2) as llm:
+#       ... site.url ... llm.openai_base_url ...
+
+MONTHS = [
+    'january', 'february', 'march', 'april', 'may', 'june',
+    'july', 'august', 'september', 'october', 'november', 'december'
+]
+
+SECTION_RE = re.compile(r'<h2>.*?(?=<hr>|</body>)', re.S)
+H2_RE = re.compile(r'<h2>(.*?)</h2>')
+
+# Where crawl4ai's extraction prompt puts the page content
+URL_CONTENT_RE = re.compile(r'<url_content>(.*?)</url_content>', re.S)
+# How BatchLLMExtractor wraps each post of a batch
+BATCH_POST_RE = re.compile(r'<post index="(\d+)">\n(.*?)\n</post>', re.S)
+POST_SPLIT_RE = re.compile(r'\n\s*(?:-{3,}|\*{3,}|_{3,})\s*\n|\n(?=#{1,3} )')
+MARKDOWN_DECORATION_RE = re.compile(r'^[#*\s>-]+|[*]+$')
+
+
+def load_sections(jobs_html_path: str) -> List[str]:
+    """The per-company <h2>...</h2> blocks of jobs.html"""
+    with open(jobs_html_path, 'r', encoding='utf-8') as f:
+        return [section.strip() for section in SECTION_RE.findall(f.read())]
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _BackgroundServer:
+    """Runs a handler class on 127.0.0.1 in a daemon thread"""
+
+    handler_class = BaseHTTPRequestHandler
+
+    def __init__(self, port: int = 0):
+        self.port = port
+        self._server: Optional[_QuietServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        owner = self
+
+        class Handler(self.handler_class):
+            server_owner = owner
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = _QuietServer(('127.0.0.1', self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self.do_GET(send_body=False)
+
+    def do_GET(self, send_body: bool = True):
+        site = self.server_owner
+        site.requests += 1
+        if site.latency:
+            time.sleep(site.latency)
+
+        page = site.page(self.path)
+        if page is None:
+            body = b"Not found"
+            self.send_response(404)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+            return
+
+        body, etag = page
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        encoding = None
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body, compresslevel=5)
+            encoding = "gzip"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", site.last_modified)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+class SyntheticSite(_BackgroundServer):
+    """
+    Serves an hnhiring.com lookalike: `/` links to `months` monthly threads
+    (newest first, ending at end_year/end_month) and each thread page holds
+    `posts_per_page` company posts cycled from jobs.html with numbered
+    company names. Pages are deterministic and carry an ETag, so
+    conditional requests get 304s. `latency` seconds are added per request.
+    """
+
+    handler_class = _SiteHandler
+
+    def __init__(
+        self,
+        jobs_html_path: str,
+        posts_per_page: int = 100,
+        months: int = 12,
+        end_year: int = 2025,
+        end_month: int = 3,
+        latency: float = 0.0,
+        port: int = 0
+    ):
+        super().__init__(port)
+        self.sections = load_sections(jobs_html_path)
+        self.posts_per_page = posts_per_page
+        self.latency = latency
+        self.last_modified = formatdate(usegmt=True)
+        self.month_paths = []
+        year, month = end_year, end_month
+        for _ in range(months):
+            self.month_paths.append(f"/{MONTHS[month - 1]}-{year}")
+            year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+        self._pages: Dict[str, Tuple[bytes, str]] = {}
+
+    @property
+    def month_urls(self) -> List[str]:
+        return [self.url + path for path in self.month_paths]
+
+    def _render(self, path: str) -> Optional[bytes]:
+        if path in ('/', ''):
+            links = '\n'.join(
+                f'<li><a href="{month}">{month.strip("/").replace("-", " ").title()}</a></li>'
+                for month in self.month_paths
+            )
+            return f"<!DOCTYPE html><html><head><title>HN Hiring</title></head><body><ul>{links}</ul></body></html>".encode()
+        if path.rstrip('/') not in self.month_paths:
+            return None
+
+        rng = random.Random(path)
+        sections = []
+        for i in range(self.posts_per_page):
+            section = self.sections[i % len(self.sections)]
+            # Unique company names so the posts are not collapsed as reposts
+            section = H2_RE.sub(lambda m: f"<h2>{m.group(1)} {rng.randrange(10**6)}-{i}</h2>", section, count=1)
+            sections.append(section)
+        title = html.escape(path.strip('/'))
+        body = "\n<hr>\n".join(sections)
+        return (f"<!DOCTYPE html><html><head><title>{title}</title></head>"
+                f"<body><h1>Job Postings</h1>\n{body}\n</body></html>").encode()
+
+    def page(self, path: str) -> Optional[Tuple[bytes, str]]:
+        path = path.split('?', 1)[0]
+        if path not in self._pages:
+            body = self._render(path)
+            if body is None:
+                return None
+            self._pages[path] = (body, '"' + hashlib.sha1(body).hexdigest()[:16] + '"')
+        return self._pages[path]
+
+
+def fake_job_records(prompt: str) -> List[Dict[str, str]]:
+    """WhoIsHiring records for the posts in a prompt: the first line of each post is the company"""
+    match = URL_CONTENT_RE.search(prompt)
+    content = match.group(1) if match else prompt
+    records = []
+    for post in POST_SPLIT_RE.split(content):
+        lines = [line.strip() for line in post.strip().splitlines() if line.strip()]
+        if len(lines) < 2:
+            continue
+        records.append({
+            "company_name_and_location": MARKDOWN_DECORATION_RE.sub('', lines[0]),
+            "technology_stack": "",
+            "job_description": ' '.join(lines[1:])[:500],
+            "application_details": "",
+            "error": False
+        })
+    return records
+
+
+class _LLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        llm = self.server_owner
+        llm.requests += 1
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b'{}')
+        if 'messages' in request:
+            prompt = '\n'.join(str(message.get('content', '')) for message in request['messages'])
+        else:
+            prompt = str(request.get('prompt', ''))
+
+        time.sleep(llm.sample_latency())
+        if llm.failure_rate and llm.rng.random() < llm.failure_rate:
+            self._send(500, {"error": {"message": "fake provider failure", "type": "server_error"}})
+            return
+
+        batch = BATCH_POST_RE.findall(prompt)
+        if batch:
+            content = json.dumps([{"index": int(index), "records": fake_job_records(post)} for index, post in batch])
+        else:
+            content = f"<blocks>{json.dumps(fake_job_records(prompt))}</blocks>"
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        llm.prompt_tokens += prompt_tokens
+        model = request.get('model', 'fake')
+        path = self.path.split('?', 1)[0]
+        if path.endswith('/chat/completions'):
+            self._send(200, {
+                "id": f"chatcmpl-{llm.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }
+            })
+        elif path == '/api/chat':
+            self._send(200, {
+                "model": model, "created_at": formatdate(usegmt=True), "done": True,
+                "message": {"role": "assistant", "content": content},
+                "prompt_eval_count": prompt_tokens, "eval_count": completion_tokens
+            })
+        elif path == '/api/generate':
+            self._send(200, {
+                "model": model, "created_at": formatdate(usegmt=True), "done": True,
+                "response": content, "prompt_eval_count": prompt_tokens, "eval_count": completion_tokens
+            })
+        else:
+            self._send(404, {"error": f"unknown endpoint {path}"})
+
+    def _send(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeLLMServer(_BackgroundServer):
+    """
+    OpenAI- and Ollama-compatible chat endpoint that answers instantly
+    apart from `latency` (+/- `jitter`) seconds per request, optionally
+    failing `failure_rate` of requests with a 500. Every post in the prompt
+    comes back as one WhoIsHiring record wrapped in <blocks>, as
+    LLMExtractionStrategy expects, or as the per-post JSON array
+    BatchLLMExtractor asks for when the prompt is a batch.
+    """
+
+    handler_class = _LLMHandler
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.0, failure_rate: float = 0.0, port: int = 0, seed: int = 0):
+        super().__init__(port)
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.prompt_tokens = 0
+
+    def sample_latency(self) -> float:
+        return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    @property
+    def openai_base_url(self) -> str:
+        return self.url + "/v1"
+
+    @property
+    def ollama_base_url(self) -> str:
+        return self.url
@@ -0,0 +1,381 @@
+import argparse
+import asyncio
+import functools
+import hashlib
+import os
+import socket
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(PROJECT_DIR, 'scraper'))
+
+from newllmextraction import (
+    JOB_INSTRUCTION, create_batch_extractor, create_extraction_strategy, create_provider_client,
+    create_record_validator, extract_posts_concurrently, extraction_error, record_client_usage, record_llm_usage,
+    record_validator_usage, split_page_into_posts, thread_defaults
+)
+from schema import WhoIsHiring
+from llm_extraction.extraction_cache import ExtractionCache
+from job_sink import write_jobs_json
+from job_store import iter_store_jobs, write_store_jobs
+from queue_service import QueueClient, QueueService, RemoteExtractionCache
+from work_queue import FAILED, Task, WorkQueue
+from hn_scraper import HackerNewsJobScraper, hnhiring_month_urls
+from scraper_config import ScraperConfig
+from logger import ScraperLogger
+
+# Distributed crawl and extraction. A coordinator puts thread URLs into a
+# WorkQueue; any number of worker processes lease tasks from it:
+#   page  - scrape a thread, split it into posts and enqueue them as chunks
+#   posts - extract a chunk of posts and upsert the jobs into the job store
+# Task ids are derived from their content and jobs are upserted by stable
+# id, so a task that runs twice (its worker crashed or stalled past the
+# lease) enqueues and writes nothing new. A thread is crawled once per
+# queue; --recrawl crawls it again, and only posts that changed since are
+# extracted again.
+#
+# Workers on the coordinator's host open the queue, job store and
+# extraction cache files directly. With --serve the coordinator also serves
+# them over HTTP (queue_service.py) and workers on any other host join with
+# --coordinator http://<host>:<port>; the SQLite files never leave the
+# coordinator's disk.
+#
+#   python distributed.py coordinator [urls ...] [--months 2025-01:2025-03] [--wait] [--serve]
+#                                     [--retry-failed] [--recrawl]
+#   python distributed.py worker [--id NAME] [--coordinator URL] [--keep-running]
+#   python distributed.py status
+
+PAGE_TASK = 'page'
+POSTS_TASK = 'posts'
+# Post chunks go before more pages, so extraction keeps up with scraping
+TASK_PRIORITIES = {POSTS_TASK: 0, PAGE_TASK: 1}
+
+# Settings of the `distributed` section in extract_llm.yml
+DISTRIBUTED_DEFAULTS = {
+    'queue': '.work_queue.sqlite',
+    'lease_seconds': 120,
+    'max_attempts': 5,
+    'retry_seconds': 10,  # Backoff after a failed attempt, doubling per attempt
+    'posts_per_task': 24,  # A multiple of batching.max_batch_size avoids part-filled batches
+    'tasks_per_worker': 2,
+    'poll_seconds': 1.0,
+    'server': {'host': '0.0.0.0', 'port': 8765},  # Where coordinator --serve listens
+    'coordinator_url': None,  # Workers with this set use the coordinator's service, not local files
+    'token': None,  # Shared secret of the service (or the WORK_QUEUE_TOKEN environment variable)
+    'scraper': {}  # ScraperConfig keyword arguments for the workers
+}
+
+logger = ScraperLogger("distributed")
+
+
+def distributed_settings(config: Dict) -> Dict[str, Any]:
+    return dict(DISTRIBUTED_DEFAULTS, **(config.get('distributed') or {}))
+
+
+def open_queue(settings: Dict[str, Any]) -> WorkQueue:
+    return WorkQueue(settings['queue'], lease_seconds=settings['lease_seconds'], max_attempts=settings['max_attempts'])
+
+
+def open_extraction_cache(config: Dict) -> ExtractionCache:
+    cache_settings = config.get("extraction_cache", {})
+    return ExtractionCache(
+        path=cache_settings.get("path", ".extraction_cache.sqlite"),
+        max_entries=cache_settings.get("max_entries", 200000)
+    )
+
+
+def service_token(settings: Dict[str, Any]) -> Optional[str]:
+    return settings['token'] or os.environ.get('WORK_QUEUE_TOKEN')
+
+
+def page_task(url: str) -> Tuple[str, str, Dict]:
+    return f"{PAGE_TASK}:{url}", PAGE_TASK, {'url': url}
+
+
+def post_tasks(url: str, posts: List[str], posts_per_task: int) -> List[Tuple[str, str, Dict]]:
+    """Chunks of a page's posts, with ids that come out the same when the page is split again"""
+    tasks = []
+    for start in range(0, len(posts), posts_per_task):
+        chunk = posts[start:start + posts_per_task]
+        digest = hashlib.sha256('\0'.join([url] + chunk).encode('utf-8')).hexdigest()[:32]
+        tasks.append((f"{POSTS_TASK}:{digest}", POSTS_TASK, {'url': url, 'posts': chunk}))
+    return tasks
+
+
+def month_range_urls(months: str) -> List[str]:
+    """hnhiring.com thread URLs for a 'YYYY-MM:YYYY-MM' range"""
+    start, _, end = months.partition(':')
+    start_year, start_month = (int(part) for part in start.split('-'))
+    end_year, end_month = (int(part) for part in (end or start).split('-'))
+    return hnhiring_month_urls(start_year, start_month, end_year, end_month)
+
+
+class DistributedWorker:
+    """
+    A worker process of a distributed run.
+
+    Leases up to `tasks_per_worker` tasks at a time and renews each lease
+    every third of lease_seconds while working on it. If a renewal finds
+    the lease gone, the task is abandoned: another worker holds it now.
+    Failed tasks go back to the queue with a growing delay. Posts already
+    extracted are in the extraction cache, so retrying a partly failed
+    chunk only sends the posts that failed.
+
+    With a `coordinator_url` the queue, job store and extraction cache are
+    the coordinator's, reached through its QueueService; otherwise the
+    worker opens their files itself and must run on the same host.
+
+    The extraction settings are those of extract_llm.yml. Provider limits
+    and scraper rate limits apply per worker, so N workers send up to N
+    times the requests; the adaptive provider client backs each of them
+    off when a shared provider slows down.
+    """
+
+    def __init__(
+        self,
+        config: Dict,
+        worker_id: Optional[str] = None,
+        scraper_config: Optional[ScraperConfig] = None,
+        coordinator_url: Optional[str] = None
+    ):
+        self.config = config
+        self.settings = distributed_settings(config)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        coordinator_url = coordinator_url or self.settings['coordinator_url']
+        if coordinator_url:
+            self.queue = QueueClient(coordinator_url, token=service_token(self.settings))
+            self.cache = RemoteExtractionCache(self.queue)
+            self.write_jobs = self.queue.write_jobs
+            self.queue_location = coordinator_url
+        else:
+            self.queue = open_queue(self.settings)
+            self.cache = open_extraction_cache(config)
+            store_path = config.get("output", {}).get("store", ".jobs.sqlite")
+            self.write_jobs = functools.partial(write_store_jobs, store_path)
+            self.queue_location = self.settings['queue']
+
+        schema = WhoIsHiring.model_json_schema()
+        self.strategy = create_extraction_strategy(config, schema, JOB_INSTRUCTION)
+        self.client = create_provider_client(config)
+        self.batcher = create_batch_extractor(config, schema, JOB_INSTRUCTION, self.client)
+        self.validator = create_record_validator(config, schema)
+        self.scraper = HackerNewsJobScraper(config=scraper_config or ScraperConfig(**self.settings['scraper']))
+
+    async def run(self, keep_running: bool = False):
+        """Work until the queue has nothing pending or leased left, or forever with `keep_running`"""
+        print(f"Worker {self.worker_id} started on {self.queue_location}")
+        try:
+            async with self.scraper:
+                await asyncio.gather(*(self._slot(keep_running) for _ in range(self.settings['tasks_per_worker'])))
+        finally:
+            self.cache.close()
+            self.queue.close()
+            record_llm_usage(self.strategy)
+            record_client_usage(self.client)
+            record_validator_usage(self.validator)
+            print(logger.metrics.summary())
+            metrics_path = self.config.get("metrics", {}).get("path")
+            if metrics_path:
+                logger.export_metrics(metrics_path)
+
+    async def _slot(self, keep_running: bool):
+        while True:
+            task = await asyncio.to_thread(self.queue.lease, self.worker_id)
+            if task is not None:
+                await self._run_task(task)
+                continue
+            # Leased tasks may still add chunks, or come back when their worker dies
+            if not keep_running and await asyncio.to_thread(self.queue.unfinished) == 0:
+                return
+            await asyncio.sleep(self.settings['poll_seconds'])
+
+    async def _run_task(self, task: Task):
+        logger.count("tasks_leased")
+        handler = self._scrape_page if task.kind == PAGE_TASK else self._extract_posts
+        work = asyncio.create_task(handler(task.payload))
+        keep_lease = asyncio.create_task(self._keep_lease(task))
+        try:
+            done, _ = await asyncio.wait({work, keep_lease}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            # Shutting down: hand the task to another worker right away
+            work.cancel()
+            keep_lease.cancel()
+            self.queue.release(task)
+            raise
+        if work not in done:
+            work.cancel()
+            await asyncio.gather(work, return_exceptions=True)
+            logger.count("leases_lost")
+            print(f"Lost the lease on {task}, abandoned it")
+            return
+        keep_lease.cancel()
+
+        try:
+            children = work.result()
+        except Exception as e:
+            shed_for = self.client.breaker.retry_after()
+            if task.kind == POSTS_TASK and shed_for > 0:
+                # The provider is down, not the task's fault: no attempt is used up
+                await asyncio.to_thread(self.queue.release, task, shed_for)
+                logger.count("tasks_deferred")
+                print(f"Provider circuit open, deferred {task} and pausing for {shed_for:.0f}s")
+                await asyncio.sleep(shed_for)
+                return
+            delay = self.settings['retry_seconds'] * 2 ** (task.attempts - 1)
+            state = await asyncio.to_thread(self.queue.fail, task, f"{type(e).__name__}: {e}", delay)
+            logger.count("tasks_failed" if state == FAILED else "tasks_retried")
+            logger.error(f"{task} failed, now {state}: {e}")
+            return
+        if await asyncio.to_thread(self.queue.complete, task, children, TASK_PRIORITIES[POSTS_TASK]):
+            logger.count("tasks_completed")
+        else:
+            logger.count("leases_lost")
+
+    async def _keep_lease(self, task: Task):
+        """Renew the lease on a task until it is lost"""
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await asyncio.to_thread(self.queue.heartbeat, task):
+                return
+
+    async def _scrape_page(self, payload: Dict) -> List[Tuple[str, str, Dict]]:
+        url = payload['url']
+        page = await self.scraper.scrape_url(url)
+        if not page['success']:
+            raise RuntimeError(page.get('error') or 'scraping failed')
+        posts = await split_page_into_posts(
+            url, str(page['content']), dedup_threshold=self.config.get("dedup", {}).get("threshold", 0.8),
+            prune=self.config.get("pruning", {}).get("enabled", False)
+        )
+        tasks = post_tasks(url, posts, self.settings['posts_per_task'])
+        logger.count("post_tasks_created", len(tasks))
+        return tasks
+
+    async def _extract_posts(self, payload: Dict) -> List[Tuple[str, str, Dict]]:
+        url, posts = payload['url'], payload['posts']
+        chunking = self.config.get("chunking", {})
+        records = await extract_posts_concurrently(
+            self.strategy, url, posts, chunk_tokens=chunking.get("chunk_tokens", 1500),
+            workers=chunking.get("workers", 4), cache=self.cache,
+            rule_extraction=self.config.get("rule_extraction", True), batcher=self.batcher, client=self.client,
+            prune=self.config.get("pruning", {}).get("enabled", False), validator=self.validator
+        )
+        defaults = thread_defaults(url)
+        jobs = [dict(defaults, **record) for record in records if not record.get('error')]
+        # Upserted by stable id: jobs a previous attempt already wrote are skipped
+        logger.count("jobs_written", await asyncio.to_thread(self.write_jobs, jobs))
+        error = extraction_error(records)
+        if error:
+            raise RuntimeError(f"extraction failed for some posts: {error[:200]}")
+        return []
+
+
+def enqueue_urls(queue: WorkQueue, urls: List[str], recrawl: bool = False) -> int:
+    """Enqueue thread URLs. Threads crawled before are skipped unless `recrawl`"""
+    return queue.enqueue((page_task(url) for url in urls), TASK_PRIORITIES[PAGE_TASK], redo_done=recrawl)
+
+
+def queue_status(queue: WorkQueue) -> str:
+    lines = []
+    for kind, states in sorted(queue.counts().items()):
+        lines.append(f"{kind:<6} " + "  ".join(f"{state}={count}" for state, count in sorted(states.items())))
+    for worker, done, alive in queue.workers():
+        lines.append(f"worker {worker}: {done} tasks done{'' if alive else ' (not seen lately)'}")
+    return '\n'.join(lines) or "Queue is empty"
+
+
+def wait_until_drained(queue: WorkQueue, report_every: float = 10.0):
+    """Block until no task is pending or leased, printing the queue status now and then"""
+    next_report = time.monotonic() + report_every
+    while queue.unfinished():
+        time.sleep(1.0)
+        if time.monotonic() >= next_report:
+            print(queue_status(queue))
+            next_report += report_every
+
+
+def run_coordinator(config: Dict, urls: List[str], wait: bool = False, retry_failed: bool = False,
+                    recrawl: bool = False, serve: bool = False):
+    """
+    Enqueue `urls`. With `wait`, block until the workers are done and write
+    jobs.json. `serve` implies waiting, while serving the queue, job store
+    and extraction cache to workers on other hosts.
+    """
+    settings = distributed_settings(config)
+    output = config.get("output", {})
+    store_path = output.get("store", ".jobs.sqlite")
+    with open_queue(settings) as queue:
+        if retry_failed:
+            print(f"Put {queue.retry_failed()} failed tasks back in the queue")
+        print(f"Enqueued {enqueue_urls(queue, urls, recrawl)} of {len(urls)} thread URLs into {settings['queue']}")
+        if not (wait or serve):
+            return
+        if serve:
+            server = settings['server'] or {}
+            cache = open_extraction_cache(config)
+            service = QueueService(
+                queue, store_path, cache, host=server.get('host', '0.0.0.0'), port=server.get('port', 8765),
+                token=service_token(settings)
+            )
+            service.start()
+            print(f"Serving the queue to remote workers on port {service.port}")
+        try:
+            wait_until_drained(queue)
+            if serve:
+                # Workers polling an empty queue should see it drained, not a closed port
+                time.sleep(settings['poll_seconds'] * 3)
+        finally:
+            if serve:
+                service.stop()
+                cache.close()
+        print(queue_status(queue))
+        failed = queue.failed_tasks()
+        if failed:
+            print(f"{len(failed)} tasks failed, rerun with --retry-failed to try them again:")
+            for task_id, error in failed:
+                print(f"  {task_id}: {error}")
+
+    if os.path.exists(store_path):
+        json_path = output.get("json", "jobs.json")
+        count = write_jobs_json(iter_store_jobs(store_path), json_path)
+        print(f"Wrote {count} jobs from {store_path} to {json_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl and extract hiring threads with many worker processes")
+    parser.add_argument('--config', default='extract_llm.yml')
+    commands = parser.add_subparsers(dest='command', required=True)
+    coordinator = commands.add_parser('coordinator', help="Enqueue thread URLs")
+    coordinator.add_argument('urls', nargs='*', help="Thread URLs (default: the --months range)")
+    coordinator.add_argument('--months', default='2025-01:2025-03', help="hnhiring.com threads, YYYY-MM:YYYY-MM")
+    coordinator.add_argument('--wait', action='store_true', help="Wait for the workers, then write jobs.json")
+    coordinator.add_argument('--retry-failed', action='store_true', help="Retry tasks that ran out of attempts")
+    coordinator.add_argument('--recrawl', action='store_true', help="Crawl threads that were already crawled again")
+    coordinator.add_argument('--serve', action='store_true', help="Serve the queue to workers on other hosts, then wait")
+    worker = commands.add_parser('worker', help="Lease and run tasks")
+    worker.add_argument('--id', help="Worker name (default: host-pid)")
+    worker.add_argument('--coordinator', help="URL of a coordinator started with --serve (default: local files)")
+    worker.add_argument('--keep-running', action='store_true', help="Keep polling when the queue is empty")
+    commands.add_parser('status', help="Print task counts and workers")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        config = yaml.safe_load(f)
+
+    if args.command == 'coordinator':
+        run_coordinator(
+            config, args.urls or month_range_urls(args.months), args.wait, args.retry_failed, args.recrawl, args.serve
+        )
+    elif args.command == 'worker':
+        asyncio.run(DistributedWorker(config, args.id, coordinator_url=args.coordinator).run(args.keep_running))
+    else:
+        with open_queue(distributed_settings(config)) as queue:
+            print(queue_status(queue))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSON for the hot paths (JSONL job files, LLM answers). orjson is several
+# times faster than the json module at both ends; without it the same calls
+# fall back to json with the equivalent options. Output is compact and keeps
+# non-ASCII text as is, like json.dumps(..., ensure_ascii=False).
+
+
+def dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON text; raises ValueError on invalid input with either backend"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
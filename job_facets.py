@@ -0,0 +1,250 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Set, Tuple
+
+from job_identity import job_company
+
+# Canonical facets of an extracted job, as "type:value" strings:
+#
+#   tech:postgresql   from technology_stack ("Node.js / Python / Firebase / Postgres")
+#   work:remote       remote / hybrid / onsite, from the location part of
+#                     company_name_and_location ("Pave | Remote (US or Canada)")
+#   city:berlin       cities named in the location
+#   region:us         countries and regions named in the location
+#   company:pave
+#   month:2025-03     the hiring thread the job was posted in
+FACET_TYPES = ('tech', 'work', 'city', 'region', 'company', 'month')
+
+TECH_SEPARATOR_RE = re.compile(r'\s*(?:[/,;|•·()\[\]\n]|\s\+\s|\s-\s|&|\band\b|\bor\b)\s*', re.IGNORECASE)
+LOCATION_SEPARATOR_RE = re.compile(r'\s*(?:[|,;/()\[\]\n]|\s-\s|&|\band\b|\bor\b)\s*', re.IGNORECASE)
+VERSION_RE = re.compile(r'\s*v?\d+(?:\.\d+)*\+?$')
+EDGE_PUNCTUATION_RE = re.compile(r'^[\W_]+|[^\w+#]+$')
+
+REMOTE_RE = re.compile(r'\bremote\b', re.IGNORECASE)
+HYBRID_RE = re.compile(r'\bhybrid\b', re.IGNORECASE)
+ONSITE_RE = re.compile(r'\b(?:on-?site|in[- ]office|in[- ]person|office[- ]based)\b', re.IGNORECASE)
+# Words in a location segment that are not a place
+NOT_PLACE_RE = re.compile(
+    r'\b(?:remote|hybrid|on-?site|in[- ]office|in[- ]person|only|preferred|ok|okay|friendly|first|'
+    r'full[- ]?time|part[- ]?time|contract(?:or)?|freelance|intern(?:ship)?|visa|sponsorship|'
+    r'relocation|based|timezones?|tz|hours?|within|from|in|near|anywhere in)\b',
+    re.IGNORECASE
+)
+
+# Longest technology names worth indexing; longer fragments are prose
+MAX_TECH_WORDS = 3
+MAX_TECH_CHARS = 30
+
+TECH_ALIASES = {
+    'node': 'node.js', 'nodejs': 'node.js', 'node js': 'node.js',
+    'postgres': 'postgresql', 'psql': 'postgresql', 'postgre': 'postgresql', 'postgressql': 'postgresql',
+    'golang': 'go', 'js': 'javascript', 'es6': 'javascript', 'ts': 'typescript',
+    'reactjs': 'react', 'react.js': 'react', 'react js': 'react',
+    'vuejs': 'vue', 'vue.js': 'vue', 'nextjs': 'next.js', 'angularjs': 'angular',
+    'k8s': 'kubernetes', 'gcp': 'google cloud', 'google cloud platform': 'google cloud',
+    'amazon web services': 'aws', 'py': 'python', 'python3': 'python',
+    'ror': 'rails', 'ruby on rails': 'rails', 'c sharp': 'c#', 'dotnet': '.net', '.net core': '.net',
+    'mongo': 'mongodb', 'elastic': 'elasticsearch', 'objective c': 'objective-c', 'objc': 'objective-c',
+    'torch': 'pytorch', 'springboot': 'spring boot', 'llms': 'llm', 'ml': 'machine learning',
+    'ai/ml': 'machine learning', 'react-native': 'react native', 'tailwindcss': 'tailwind',
+    'cpp': 'c++', 'html5': 'html', 'css3': 'css', 'sql server': 'mssql', 'ms sql': 'mssql',
+}
+KNOWN_TECHNOLOGIES = set(TECH_ALIASES.values()) | {
+    'python', 'java', 'kotlin', 'scala', 'swift', 'rust', 'ruby', 'php', 'elixir', 'erlang', 'haskell',
+    'ocaml', 'clojure', 'c', 'c++', 'c#', 'typescript', 'javascript', 'react', 'vue', 'angular', 'svelte',
+    'django', 'flask', 'fastapi', 'spring', 'graphql', 'sql', 'mysql', 'sqlite', 'redis', 'kafka', 'spark',
+    'airflow', 'dbt', 'snowflake', 'bigquery', 'firebase', 'supabase', 'aws', 'azure', 'docker', 'terraform',
+    'linux', 'tensorflow', 'jax', 'cuda', 'flutter', 'ios', 'android', 'unity', 'unreal', 'llm', 'go',
+}
+# Fragments naming a role ("Senior Python Engineer") only contribute the known technologies in them
+ROLE_WORD_RE = re.compile(
+    r'\b(?:engineers?|developers?|devs?|programmers?|scientists?|researchers?|designers?|architects?|'
+    r'managers?|leads?|analysts?|interns?|founding|staff|senior|junior|principal|mid-level)\b',
+    re.IGNORECASE
+)
+# Stack fragments that are not technologies
+TECH_STOPWORDS = {'etc', 'more', 'other', 'others', 'misc', 'various', 'n/a', 'na', 'none', 'not specified', 'tbd'}
+
+CITY_ALIASES = {
+    'sf': 'san francisco', 'sfba': 'san francisco', 'bay area': 'san francisco',
+    'san francisco bay area': 'san francisco', 'sf bay area': 'san francisco',
+    'nyc': 'new york', 'new york city': 'new york', 'ny city': 'new york', 'manhattan': 'new york',
+    'la': 'los angeles', 'dc': 'washington', 'washington dc': 'washington', 'washington d.c.': 'washington',
+    'bengaluru': 'bangalore', 'münchen': 'munich', 'muenchen': 'munich', 'köln': 'cologne',
+    'zürich': 'zurich', 'tel-aviv': 'tel aviv', 'são paulo': 'sao paulo',
+}
+# Cities a location segment is matched against. Other leftovers, capitalised
+# or not, are too often prose ("Visa Sponsorship Available") to be trusted
+KNOWN_CITIES = set(CITY_ALIASES.values()) | {
+    # North America
+    'seattle', 'portland', 'oakland', 'berkeley', 'palo alto', 'mountain view', 'menlo park', 'sunnyvale',
+    'san jose', 'san mateo', 'redwood city', 'santa clara', 'cupertino', 'san diego', 'irvine', 'santa monica',
+    'boston', 'cambridge', 'somerville', 'chicago', 'austin', 'dallas', 'houston', 'denver', 'boulder',
+    'atlanta', 'miami', 'philadelphia', 'pittsburgh', 'baltimore', 'raleigh', 'durham', 'nashville',
+    'minneapolis', 'detroit', 'salt lake city', 'phoenix', 'las vegas', 'brooklyn', 'jersey city',
+    'toronto', 'vancouver', 'montreal', 'ottawa', 'waterloo', 'calgary', 'mexico city', 'guadalajara',
+    # Europe
+    'london', 'manchester', 'edinburgh', 'bristol', 'oxford', 'dublin', 'paris', 'lyon', 'berlin', 'hamburg',
+    'munich', 'cologne', 'frankfurt', 'amsterdam', 'rotterdam', 'utrecht', 'brussels', 'zurich', 'geneva',
+    'vienna', 'prague', 'warsaw', 'krakow', 'budapest', 'bucharest', 'copenhagen', 'stockholm', 'oslo',
+    'helsinki', 'tallinn', 'riga', 'vilnius', 'madrid', 'barcelona', 'lisbon', 'porto', 'milan', 'rome',
+    'athens', 'kyiv', 'belgrade', 'zagreb',
+    # Elsewhere
+    'tel aviv', 'jerusalem', 'haifa', 'dubai', 'tokyo', 'osaka', 'seoul', 'beijing', 'shanghai', 'shenzhen',
+    'hong kong', 'taipei', 'singapore', 'bangalore', 'mumbai', 'delhi', 'new delhi', 'hyderabad', 'pune',
+    'chennai', 'sydney', 'melbourne', 'brisbane', 'auckland', 'wellington', 'sao paulo', 'rio de janeiro',
+    'buenos aires', 'bogota', 'santiago', 'lagos', 'nairobi', 'cape town',
+}
+REGION_ALIASES = {
+    'us': 'us', 'usa': 'us', 'u.s.': 'us', 'u.s': 'us', 'u.s.a.': 'us', 'united states': 'us', 'america': 'us',
+    'uk': 'uk', 'u.k.': 'uk', 'united kingdom': 'uk', 'england': 'uk', 'britain': 'uk', 'great britain': 'uk',
+    'eu': 'europe', 'europe': 'europe', 'european union': 'europe', 'emea': 'emea',
+    'north america': 'north america', 'americas': 'americas', 'latam': 'latin america',
+    'latin america': 'latin america', 'south america': 'latin america', 'apac': 'apac', 'asia': 'asia',
+    'worldwide': 'worldwide', 'global': 'worldwide', 'anywhere': 'worldwide', 'international': 'worldwide',
+    'canada': 'canada', 'germany': 'germany', 'france': 'france', 'spain': 'spain', 'italy': 'italy',
+    'netherlands': 'netherlands', 'the netherlands': 'netherlands', 'ireland': 'ireland', 'poland': 'poland',
+    'portugal': 'portugal', 'sweden': 'sweden', 'norway': 'norway', 'denmark': 'denmark', 'finland': 'finland',
+    'switzerland': 'switzerland', 'austria': 'austria', 'belgium': 'belgium', 'israel': 'israel',
+    'india': 'india', 'japan': 'japan', 'australia': 'australia', 'new zealand': 'new zealand',
+    'brazil': 'brazil', 'mexico': 'mexico', 'argentina': 'argentina', 'china': 'china', 'korea': 'korea',
+    'south korea': 'korea', 'estonia': 'estonia', 'czech republic': 'czechia', 'czechia': 'czechia',
+}
+US_STATES = {
+    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY',
+    'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY', 'NC', 'ND',
+    'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY', 'DC'
+}
+# Two-letter country codes seen after a city ("Tokyo, JP"); US states take precedence
+COUNTRY_CODES = {
+    'JP': 'japan', 'DE': 'germany', 'FR': 'france', 'ES': 'spain', 'NL': 'netherlands', 'IE': 'ireland',
+    'PL': 'poland', 'PT': 'portugal', 'SE': 'sweden', 'NO': 'norway', 'DK': 'denmark', 'FI': 'finland',
+    'CH': 'switzerland', 'AT': 'austria', 'BE': 'belgium', 'IL': 'israel', 'AU': 'australia',
+    'NZ': 'new zealand', 'BR': 'brazil', 'MX': 'mexico', 'SG': 'singapore', 'KR': 'korea', 'CN': 'china',
+    'EE': 'estonia', 'CZ': 'czechia', 'GB': 'uk', 'UK': 'uk', 'US': 'us', 'EU': 'europe',
+}
+
+
+def _field_text(value: Any) -> str:
+    # Some extractions return a list where the schema asks for a string
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(item) for item in value if item)
+    return str(value or '')
+
+
+def normalise_technology(fragment: str) -> str:
+    """'Postgres' -> 'postgresql', 'Python 3' -> 'python', '' for prose fragments"""
+    name = EDGE_PUNCTUATION_RE.sub('', ' '.join(fragment.split()).lower())
+    name = VERSION_RE.sub('', name) if not name.endswith(('c++', 'c#')) else name
+    name = TECH_ALIASES.get(name, name)
+    if not name or name in TECH_STOPWORDS or len(name) > MAX_TECH_CHARS or len(name.split()) > MAX_TECH_WORDS:
+        return ''
+    return name
+
+
+def technology_facets(technology_stack: Any) -> List[str]:
+    """Canonical technologies of a technology_stack field, in order of appearance"""
+    return list(_technologies(_field_text(technology_stack)))
+
+
+# Stacks and locations repeat a lot across postings (reposts, same company
+# every month), so their normalisation is memoized
+@lru_cache(maxsize=65536)
+def _technologies(text: str) -> Tuple[str, ...]:
+    seen = {}
+    for fragment in TECH_SEPARATOR_RE.split(text):
+        if ROLE_WORD_RE.search(fragment):
+            names = [normalise_technology(word) for word in fragment.split()]
+            names = [name for name in names if name in KNOWN_TECHNOLOGIES]
+        else:
+            names = [normalise_technology(fragment)]
+        for name in names:
+            if name:
+                seen.setdefault(name, None)
+    return tuple(seen)
+
+
+def work_modes(location: str) -> Set[str]:
+    """remote / hybrid / onsite. A location naming only places counts as onsite"""
+    modes = set()
+    if REMOTE_RE.search(location):
+        modes.add('remote')
+    if HYBRID_RE.search(location):
+        modes.add('hybrid')
+    if ONSITE_RE.search(location):
+        modes.add('onsite')
+    return modes
+
+
+def place_facets(location: str) -> Dict[str, Set[str]]:
+    """Cities and regions named in a location string. Unknown places are left out"""
+    places: Dict[str, Set[str]] = {'city': set(), 'region': set()}
+    for segment in LOCATION_SEPARATOR_RE.split(location):
+        raw = segment.strip()
+        if len(raw) == 2 and raw.isupper():
+            if raw in US_STATES:
+                places['region'].add('us')
+            elif raw in COUNTRY_CODES:
+                places['region'].add(COUNTRY_CODES[raw])
+            continue
+        name = ' '.join(NOT_PLACE_RE.sub(' ', raw.lower()).split()).strip(' .-')
+        if not name:
+            continue
+        if name in REGION_ALIASES:
+            places['region'].add(REGION_ALIASES[name])
+        elif name in CITY_ALIASES:
+            places['city'].add(CITY_ALIASES[name])
+        elif name in KNOWN_CITIES:
+            places['city'].add(name)
+    return places
+
+
+@lru_cache(maxsize=65536)
+def _location_facets(location: str) -> Tuple[str, ...]:
+    places = place_facets(location)
+    modes = work_modes(location)
+    # Only a city from the gazetteer is evidence of an office
+    if not modes and places['city']:
+        modes.add('onsite')
+    return tuple(
+        [f"work:{mode}" for mode in sorted(modes)]
+        + [f"city:{city}" for city in sorted(places['city'])]
+        + [f"region:{region}" for region in sorted(places['region'])]
+    )
+
+
+def job_facets(job: Dict[str, Any]) -> List[str]:
+    """Every canonical "type:value" facet of a job"""
+    facets = [f"tech:{tech}" for tech in technology_facets(job.get('technology_stack', job.get('technologies')))]
+
+    # The original casing tells place names apart from other words
+    location = str(job.get('location') or '')
+    if not location:
+        parts = str(job.get('company_name_and_location', '')).split('|', 1)
+        location = parts[1] if len(parts) > 1 else ''
+    facets.extend(_location_facets(location))
+
+    company = job_company(job)
+    if company:
+        facets.append(f"company:{company}")
+    if job.get('thread_month'):
+        facets.append(f"month:{job['thread_month']}")
+    return facets
+
+
+def parse_facet(facet: str) -> str:
+    """Canonical form of a user-typed "type:value" facet, e.g. 'tech:Postgres' -> 'tech:postgresql'"""
+    kind, _, value = facet.partition(':')
+    kind = kind.strip().lower()
+    if kind not in FACET_TYPES or not value.strip():
+        raise ValueError(f"Invalid facet {facet!r}. Expected type:value with type one of {list(FACET_TYPES)}")
+    value = ' '.join(value.split()).lower()
+    if kind == 'tech':
+        value = normalise_technology(value) or value
+    elif kind == 'city':
+        value = CITY_ALIASES.get(value, value)
+    elif kind == 'region':
+        value = REGION_ALIASES.get(value, value)
+    elif kind == 'work':
+        value = 'onsite' if ONSITE_RE.fullmatch(value) else value
+    return f"{kind}:{value}"
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, Optional
+
+MONTHS = [
+    'january', 'february', 'march', 'april', 'may', 'june',
+    'july', 'august', 'september', 'october', 'november', 'december'
+]
+
+# hnhiring.com/march-2025 style thread URLs
+THREAD_URL_RE = re.compile(r'/([a-z]+)-(\d{4})/?$')
+
+# "senior backend engineer", "founding research engineer (ai)", "data scientists"...
+# matched on normalised (lowercased, single-spaced) text
+ROLE_PHRASE_RE = re.compile(
+    r"((?:[\w/+.-]+ ){0,3}"
+    r"(?:engineer|developer|programmer|scientist|researcher|designer|architect|manager|lead|analyst|sre|intern))s?\b"
+)
+# Words that can precede a role without being part of it ("we are hiring a data engineer")
+ROLE_STOP_WORDS = {
+    'a', 'an', 'the', 'we', 'we\'re', 'are', 'is', 'am', 'our', 'your', 'to', 'for', 'of', 'and', 'or', 'as',
+    'with', 'in', 'on', 'at', 'hiring', 'looking', 'seeking', 'need', 'needs', 'join', 'want', 'several', 'multiple'
+}
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def thread_month_from_url(url: str) -> Optional[str]:
+    """'https://hnhiring.com/march-2025' -> '2025-03', None for other URLs"""
+    match = THREAD_URL_RE.search(url.lower())
+    if not match or match.group(1) not in MONTHS:
+        return None
+    return f"{match.group(2)}-{MONTHS.index(match.group(1)) + 1:02d}"
+
+
+def _normalise(value: Any) -> str:
+    return WHITESPACE_RE.sub(' ', str(value or '')).strip().lower()
+
+
+def job_company(job: Dict[str, Any]) -> str:
+    """Company name without the location part of company_name_and_location"""
+    if job.get('company'):
+        return _normalise(job['company'])
+    return _normalise(str(job.get('company_name_and_location', '')).split('|')[0])
+
+
+def job_location(job: Dict[str, Any]) -> str:
+    """Location part of company_name_and_location ('Adyen | San Francisco, CA' -> 'san francisco, ca')"""
+    if job.get('location'):
+        return _normalise(job['location'])
+    parts = str(job.get('company_name_and_location', '')).split('|', 1)
+    return _normalise(parts[1]) if len(parts) > 1 else ''
+
+
+def job_role(job: Dict[str, Any]) -> str:
+    """
+    Role of a posting: the explicit position if present, else the first
+    role phrase in its text, singular and lowercased. Empty when the text
+    names no role.
+    """
+    if job.get('position'):
+        return _normalise(job['position'])
+    for field in ('job_description', 'technology_stack'):
+        match = ROLE_PHRASE_RE.search(_normalise(job.get(field)))
+        if match:
+            words = match.group(1).split(' ')
+            # Keep only the words after the last one that cannot be part of a role
+            for i in range(len(words) - 1, -1, -1):
+                if words[i] in ROLE_STOP_WORDS:
+                    words = words[i + 1:]
+                    break
+            return ' '.join(words)
+    return ''
+
+
+def stable_job_id(job: Dict[str, Any]) -> str:
+    """
+    Identifier that survives re-extraction: company + role + location +
+    thread month.
+
+    Unlike a content hash it does not change when the LLM words a
+    description slightly differently, so an edited post keeps its id. The
+    location tells apart postings of one company whose descriptions start
+    with the same role ("Software Engineer" in San Francisco and in Dublin).
+    Free-form description text never goes into the id, so a posting
+    without a recognisable role is identified by company, location and
+    month alone.
+    """
+    key = '|'.join([job_company(job), job_role(job), job_location(job), str(job.get('thread_month') or '')])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def content_hash(job: Dict[str, Any]) -> str:
+    """Hash of a job's fields, used to tell an edited posting from an unchanged one"""
+    fields = {k: v for k, v in job.items() if k not in ('id', 'error')}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
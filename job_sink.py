@@ -0,0 +1,188 @@
+import json
+import os
+from typing import Any, Collection, Dict, Iterable, Iterator, Optional, Set
+
+from fast_json import dumps, loads
+from job_identity import content_hash, stable_job_id
+
+# What output.scope puts in jobs.json: the jobs of this run, or every job the sink file holds
+OUTPUT_SCOPES = ('run', 'all')
+
+
+class JsonlJobSink:
+    """
+    Append-only JSONL output for extracted jobs.
+
+    Each valid job is written as one line the moment it is extracted, so a
+    crashed run keeps everything written before the crash. Writes are
+    fsynced every `fsync_every` jobs. Reopening an existing file resumes it:
+    jobs already in the file with the same id and content are skipped, an
+    edited job is appended as a newer version of its id. `defaults` are
+    added to every job that lacks them (e.g. the thread month).
+
+    The file therefore keeps growing across runs. `run_ids` holds the ids
+    of the jobs given to this sink since it was opened, written or not, so
+    the output of one run can be told apart from the rest.
+    """
+
+    def __init__(self, path: str, fsync_every: int = 50, defaults: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.defaults = defaults or {}
+        # id -> content hash of the latest version written
+        self.written_ids: Dict[str, str] = {}
+        self.run_ids: Set[str] = set()
+        self._unsynced = 0
+        self._recover()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _recover(self):
+        """
+        Load ids already written and drop a partially written last line.
+        Unreadable lines before it were not left by a crash; they are
+        skipped and kept, rather than cutting off every job after them. A
+        last line that parses but lost its newline gets it back, so the
+        next job is not appended to it.
+        """
+        if not os.path.exists(self.path):
+            return
+        offset = 0
+        torn_offset = None  # Start of the last line, if it does not parse
+        line = b''
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = loads(line)
+                    torn_offset = None
+                except ValueError:
+                    record, torn_offset = None, offset
+                offset += len(line)
+                if isinstance(record, dict):
+                    self.written_ids[record.get('id') or stable_job_id(record)] = content_hash(record)
+        if torn_offset is not None:
+            with open(self.path, 'r+b') as f:
+                f.truncate(torn_offset)
+        elif line and not line.endswith(b'\n'):
+            with open(self.path, 'ab') as f:
+                f.write(b'\n')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, job: Dict[str, Any], defaults: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Append a job unless it has an error or is already written unchanged.
+        `defaults` override the sink's own for this job. Returns True if written
+        """
+        if not isinstance(job, dict) or job.get('error', False):
+            return False
+        record = dict(self.defaults, **(defaults or {}))
+        record.update(job)
+        identifier = record.get('id') or stable_job_id(record)
+        version = content_hash(record)
+        self.run_ids.add(identifier)
+        if self.written_ids.get(identifier) == version:
+            return False
+
+        record['id'] = identifier
+        self._file.write(dumps(record) + '\n')
+        self.written_ids[identifier] = version
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.flush()
+        return True
+
+    def write_many(self, jobs: Iterable[Dict[str, Any]], defaults: Optional[Dict[str, Any]] = None) -> int:
+        return sum(self.write(job, defaults) for job in jobs)
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __len__(self):
+        return len(self.written_ids)
+
+
+def read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the records of a JSONL file one at a time, skipping lines that are not JSON objects"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = _parse_line(line)
+            if record is not None:
+                yield record
+
+
+def _parse_line(line) -> Optional[Dict[str, Any]]:
+    if not line.strip():
+        return None
+    try:
+        record = loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def read_latest_jsonl(path: str, ids: Optional[Collection[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the latest version of every job in a sink file (only those in
+    `ids`, if given), in the order the ids first appeared. Only an
+    id -> offset map is kept in memory.
+    """
+    latest: Dict[str, int] = {}
+    with open(path, 'rb') as f:
+        offset = 0
+        for line in f:
+            record = _parse_line(line)
+            if record is not None:
+                identifier = record.get('id') or stable_job_id(record)
+                if ids is None or identifier in ids:
+                    latest[identifier] = offset
+            offset += len(line)
+
+        for offset in latest.values():
+            f.seek(offset)
+            yield loads(f.readline())
+
+
+def write_jobs_json(jobs: Iterable[Dict[str, Any]], json_path: str, keep_ids: bool = False) -> int:
+    """
+    Write jobs as the JSON array format of jobs.json, one at a time, so the
+    whole set is never held in memory. The file is replaced atomically.
+    """
+    count = 0
+    tmp_path = f"{json_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        out.write('[')
+        for record in jobs:
+            if not keep_ids:
+                record.pop('id', None)
+            body = json.dumps(record, ensure_ascii=False, indent=4)
+            out.write(',\n    ' if count else '\n    ')
+            out.write(body.replace('\n', '\n    '))
+            count += 1
+        out.write('\n]' if count else ']')
+    os.replace(tmp_path, json_path)
+    return count
+
+
+def compact_jsonl_to_json(
+    jsonl_path: str,
+    json_path: str,
+    keep_ids: bool = False,
+    ids: Optional[Collection[str]] = None
+) -> int:
+    """
+    Rewrite a JSONL job file as the JSON array format of jobs.json, keeping
+    the latest version of each job (of the jobs in `ids`, if given). Records
+    are streamed one at a time so the whole file is never held in memory.
+    """
+    return write_jobs_json(read_latest_jsonl(jsonl_path, ids), json_path, keep_ids)
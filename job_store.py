@@ -0,0 +1,192 @@
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from job_identity import content_hash, job_company, job_location, stable_job_id
+
+# The WhoIsHiring fields, each stored in its own column
+JOB_FIELDS = ['company_name_and_location', 'technology_stack', 'job_description', 'application_details']
+
+# Derived, indexed columns used to filter scans
+INDEX_COLUMNS = ['id', 'company', 'location', 'thread_month']
+
+# Paths with these extensions are read and written as a JobStore
+STORE_EXTENSIONS = ('.sqlite', '.sqlite3', '.db')
+
+WRITE_BATCH_SIZE = 1000
+
+# Seconds a write waits for another process's transaction, e.g. distributed workers sharing a store
+BUSY_TIMEOUT = 60
+
+
+def is_job_store_path(path: str) -> bool:
+    return str(path).lower().endswith(STORE_EXTENSIONS)
+
+
+class JobStore:
+    """
+    SQLite table of extracted jobs, the compact alternative to jobs.json.
+
+    Every schema field is its own column and anything else a job carries
+    goes into a JSON `extra` column, so reading only `technology_stack`
+    never touches a job description. Company, location and thread month
+    are indexed for filtered scans. Jobs are upserted by stable id: an
+    unchanged job is skipped, an edited one replaced in place, and scans
+    return jobs in the order their ids were first written.
+    """
+
+    def __init__(self, path: str = ".jobs.sqlite"):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+        self._conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT * 1000}")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS jobs (
+                   id TEXT PRIMARY KEY,
+                   company TEXT NOT NULL,
+                   location TEXT NOT NULL COLLATE NOCASE,
+                   thread_month TEXT,
+                   {', '.join(f'{field} TEXT' for field in JOB_FIELDS)},
+                   extra TEXT,
+                   content_hash TEXT NOT NULL
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs(location)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_thread_month ON jobs(thread_month)")
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    @staticmethod
+    def _row(job: Dict[str, Any]) -> Tuple:
+        identifier = job.get('id') or stable_job_id(job)
+        extra = {k: v for k, v in job.items() if k not in JOB_FIELDS and k not in ('id', 'error', 'thread_month')}
+        return (
+            identifier,
+            job_company(job),
+            job_location(job),
+            job.get('thread_month'),
+            *(job.get(field) for field in JOB_FIELDS),
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+            content_hash(dict(job, id=identifier))
+        )
+
+    def write_many(self, jobs: Iterable[Dict[str, Any]]) -> int:
+        """Upsert valid jobs in batched transactions. Returns how many were inserted or changed"""
+        columns = INDEX_COLUMNS + JOB_FIELDS + ['extra', 'content_hash']
+        sql = (
+            f"INSERT INTO jobs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in columns[1:])} "
+            "WHERE jobs.content_hash != excluded.content_hash"
+        )
+        written = 0
+        batch: List[Tuple] = []
+        with self._conn:
+            for job in jobs:
+                if not isinstance(job, dict) or job.get('error', False):
+                    continue
+                batch.append(self._row(job))
+                if len(batch) >= WRITE_BATCH_SIZE:
+                    written += self._execute_batch(sql, batch)
+                    batch = []
+            if batch:
+                written += self._execute_batch(sql, batch)
+        return written
+
+    def _execute_batch(self, sql: str, batch: List[Tuple]) -> int:
+        before = self._conn.total_changes
+        self._conn.executemany(sql, batch)
+        return self._conn.total_changes - before
+
+    def write(self, job: Dict[str, Any]) -> bool:
+        return self.write_many([job]) == 1
+
+    @staticmethod
+    def _where(company: Optional[str], location: Optional[str], thread_month: Optional[str]) -> Tuple[str, List[str]]:
+        clauses, params = [], []
+        if company is not None:
+            clauses.append("company = ?")
+            params.append(job_company({'company': company}))
+        if location is not None:
+            # Prefix match, so 'remote' finds 'remote (us or canada)'. NOCASE lets it use the index
+            clauses.append("location LIKE ?")
+            params.append(location.replace('%', '').replace('_', '') + '%')
+        if thread_month is not None:
+            clauses.append("thread_month = ?")
+            params.append(thread_month)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def iter_jobs(
+        self,
+        columns: Optional[List[str]] = None,
+        company: Optional[str] = None,
+        location: Optional[str] = None,
+        thread_month: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield jobs, optionally filtered by company, location prefix and
+        thread month. With `columns` only those keys are read and returned;
+        without, each job comes back as the dict it was written as.
+        """
+        where, params = self._where(company, location, thread_month)
+        if columns is None:
+            select = ', '.join(['id', 'thread_month'] + JOB_FIELDS + ['extra'])
+            for row in self._conn.execute(f"SELECT {select} FROM jobs{where} ORDER BY rowid", params):
+                identifier, month, *fields, extra = row
+                job = {field: value for field, value in zip(JOB_FIELDS, fields) if value is not None}
+                if extra:
+                    job.update(json.loads(extra))
+                if month is not None:
+                    job['thread_month'] = month
+                job['id'] = identifier
+                yield job
+            return
+
+        # Fields outside the fixed columns come from the small extra JSON, never the descriptions
+        fixed = [column for column in columns if column in JOB_FIELDS or column in INDEX_COLUMNS]
+        select = ', '.join(fixed + ['extra'])
+        for row in self._conn.execute(f"SELECT {select} FROM jobs{where} ORDER BY rowid", params):
+            job = {column: value for column, value in zip(fixed, row) if value is not None}
+            if len(fixed) < len(columns) and row[-1]:
+                extra = json.loads(row[-1])
+                job.update((column, extra[column]) for column in columns if column in extra)
+            yield {column: job[column] for column in columns if column in job}
+
+    def count(self, company: Optional[str] = None, location: Optional[str] = None, thread_month: Optional[str] = None) -> int:
+        where, params = self._where(company, location, thread_month)
+        return self._conn.execute(f"SELECT COUNT(*) FROM jobs{where}", params).fetchone()[0]
+
+
+def iter_store_jobs(path: str, columns: Optional[List[str]] = None, **filters) -> Iterator[Dict[str, Any]]:
+    """Read adapter: stream the jobs of a store file, closing it when done"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Could not find file: {path}")
+    with JobStore(path) as store:
+        yield from store.iter_jobs(columns, **filters)
+
+
+def write_store_jobs(path: str, jobs: Iterable[Dict[str, Any]]) -> int:
+    """Write adapter: upsert jobs into a store file. Returns how many were inserted or changed"""
+    with JobStore(path) as store:
+        return store.write_many(jobs)
+
+
+# Example usage: convert jobs.json and read just the tech stacks of remote jobs
+if __name__ == "__main__":
+    with open("jobs.json", 'r', encoding='utf-8') as f:
+        jobs = json.load(f)
+    print(f"Stored {write_store_jobs('.jobs.sqlite', jobs)} jobs in .jobs.sqlite")
+    for job in iter_store_jobs('.jobs.sqlite', columns=['company', 'technology_stack'], location='remote'):
+        print(job)
@@ -0,0 +1,261 @@
+import asyncio
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from crawl4ai.utils import perform_completion_with_backoff
+from llm_config import LLMExtractionConfig
+from provider_client import ProviderClient, RateLimitedError
+from record_validation import repair_json
+
+# Same rough chars-per-token ratio as post_chunker.estimate_tokens
+CHARS_PER_TOKEN = 4
+
+BATCH_PROMPT = """{instruction}
+
+The content below holds {count} separate posts, each wrapped in <post index="N"> tags.
+Extract the records of every post on its own, using only that post's text.
+
+Answer with only a JSON array containing one object per post, in this form:
+[{{"index": 0, "records": [...]}}, {{"index": 1, "records": [...]}}]
+Every record must follow this JSON schema:
+{schema}
+Use an empty "records" list for a post that holds no job posting.
+
+{posts}"""
+
+# Callback for posts as they finish: (post index, records)
+ResultCallback = Callable[[int, List[Dict[str, Any]]], None]
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def parse_batch_response(text: str, count: int) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Split a batch answer back into records per post position (0..count-1).
+
+    Accepts the requested [{"index": N, "records": [...]}] array as well as
+    the shapes models tend to return instead: the array wrapped in an
+    object, or an object keyed by index. An answer cut off mid-way keeps
+    the posts it completed. Positions the answer does not cover are left
+    out, so the caller can retry just those posts.
+    """
+    data = repair_json(text)
+    if isinstance(data, dict):
+        lists = [value for value in data.values() if isinstance(value, list)]
+        if all(str(key).strip().isdigit() for key in data):
+            data = [{"index": key, "records": value} for key, value in data.items()]
+        elif len(lists) == 1:
+            data = lists[0]
+        else:
+            raise ValueError("unexpected JSON object in the response")
+    if not isinstance(data, list):
+        raise ValueError("expected a JSON array in the response")
+
+    results: Dict[int, List[Dict[str, Any]]] = {}
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        try:
+            position = int(item.get("index"))
+        except (TypeError, ValueError):
+            continue
+        records = item.get("records", [])
+        if isinstance(records, dict):
+            records = [records]
+        if 0 <= position < count and isinstance(records, list):
+            results.setdefault(position, []).extend(record for record in records if isinstance(record, dict))
+    return results
+
+
+class BatchLLMExtractor:
+    """
+    Extracts many short posts per LLM request.
+
+    Posts are packed into batches of at most config.max_batch_size posts and
+    config.batch_tokens prompt tokens. The model answers with a JSON array
+    keyed by post index, which is split back into records per post, so
+    nothing has to be guessed about which post a record came from. Posts
+    missing from an answer (or whose whole request failed) are retried in
+    smaller batches; only those posts are sent again.
+    """
+
+    def __init__(
+        self,
+        config: LLMExtractionConfig,
+        schema: Dict[str, Any],
+        instruction: str,
+        cache=None,
+        client: Optional[ProviderClient] = None
+    ):
+        self.config = config
+        self.schema = schema
+        self.instruction = instruction
+        self.cache = cache  # ExtractionCache, looked up and filled per post
+        self.client = client  # Adaptive concurrency, retries and circuit breaker, if given
+        self._schema_json = json.dumps(schema)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failed_requests = 0
+        self.retried_posts = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def build_prompt(self, posts: List[str]) -> str:
+        return BATCH_PROMPT.format(
+            instruction=self.instruction.strip(),
+            count=len(posts),
+            schema=self._schema_json,
+            posts='\n\n'.join(f'<post index="{i}">\n{post}\n</post>' for i, post in enumerate(posts))
+        )
+
+    def plan_batches(self, items: List[Tuple[int, str]], max_batch_size: int) -> List[List[Tuple[int, str]]]:
+        """Greedily group consecutive (index, post) pairs within the size and token limits"""
+        batches: List[List[Tuple[int, str]]] = []
+        current: List[Tuple[int, str]] = []
+        current_tokens = 0
+        for item in items:
+            tokens = _estimate_tokens(item[1])
+            if current and (len(current) >= max_batch_size or current_tokens + tokens > self.config.batch_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            # A post over the token budget still gets a batch of its own
+            current.append(item)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _complete(self, prompt: str) -> str:
+        response = perform_completion_with_backoff(
+            self.config.provider,
+            prompt,
+            self.config.api_token,
+            base_url=self.config.base_url,
+            extra_args=self.config.get_extra_args()
+        )
+        usage = getattr(response, "usage", None)
+        with self._lock:
+            if usage is not None:
+                self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+                self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+        # Exhausted rate-limit retries come back as a list rather than a response
+        if not hasattr(response, "choices"):
+            raise RateLimitedError(f"provider returned no completion: {response}")
+        return response.choices[0].message.content or ""
+
+    def _split_answer(self, batch: List[Tuple[int, str]], answer: str) -> Tuple[Dict[int, List[Dict]], Dict[int, str]]:
+        try:
+            parsed = parse_batch_response(answer, len(batch))
+        except ValueError as e:
+            return {}, {index: str(e) for index, _ in batch}
+        done = {index: parsed[position] for position, (index, _) in enumerate(batch) if position in parsed}
+        failed = {index: "missing from the batch response" for index, _ in batch if index not in done}
+        return done, failed
+
+    def _request_failed(self, batch: List[Tuple[int, str]], error: Exception) -> Tuple[Dict, Dict[int, str]]:
+        with self._lock:
+            self.failed_requests += 1
+        return {}, {index: str(error) for index, _ in batch}
+
+    def extract_batch(self, batch: List[Tuple[int, str]]) -> Tuple[Dict[int, List[Dict]], Dict[int, str]]:
+        """
+        Run one batch (blocking). Returns the records of the posts the
+        answer covered and an error message for each post it did not.
+        """
+        with self._lock:
+            self.requests += 1
+        try:
+            answer = self._complete(self.build_prompt([post for _, post in batch]))
+        except Exception as e:
+            return self._request_failed(batch, e)
+        return self._split_answer(batch, answer)
+
+    async def extract_batch_async(self, batch: List[Tuple[int, str]]) -> Tuple[Dict[int, List[Dict]], Dict[int, str]]:
+        """extract_batch without blocking the event loop, through the provider client if there is one"""
+        if self.client is None:
+            return await asyncio.to_thread(self.extract_batch, batch)
+        with self._lock:
+            self.requests += 1
+        try:
+            answer = await self.client.call(self._complete, self.build_prompt([post for _, post in batch]))
+        except Exception as e:
+            return self._request_failed(batch, e)
+        return self._split_answer(batch, answer)
+
+    async def extract(
+        self,
+        posts: List[str],
+        workers: int = 4,
+        on_result: Optional[ResultCallback] = None
+    ) -> Dict[int, List[Dict]]:
+        """
+        Extract every post, running at most `workers` requests at a time.
+
+        Returns records per post index. Posts that still fail after
+        config.batch_retries retries get a single error record, in the same
+        shape LLMExtractionStrategy uses. `on_result` is called for each post
+        as soon as its records are known.
+        """
+        results: Dict[int, List[Dict]] = {}
+        keys: Dict[int, str] = {}
+
+        def finish(index: int, records: List[Dict]):
+            results[index] = records
+            if self.cache is not None and not any(record.get('error') for record in records):
+                self.cache.put(keys[index], records)
+            if on_result is not None:
+                on_result(index, records)
+
+        pending = []
+        for i, post in enumerate(posts):
+            if self.cache is not None:
+                keys[i] = self.cache.make_key(
+                    post, self.schema, self.instruction, self.config.provider, self.config.get_extra_args()
+                )
+                cached = self.cache.get(keys[i])
+                if cached is not None:
+                    results[i] = cached
+                    if on_result is not None:
+                        on_result(i, cached)
+                    continue
+            pending.append(i)
+
+        # With a client `workers` only caps what its adaptive limit may reach
+        semaphore = asyncio.Semaphore(workers)
+
+        async def run(batch: List[Tuple[int, str]]):
+            async with semaphore:
+                return await self.extract_batch_async(batch)
+
+        errors: Dict[int, str] = {}
+        max_batch_size = self.config.max_batch_size
+        for attempt in range(self.config.batch_retries + 1):
+            if attempt:
+                self.retried_posts += len(pending)
+                # Long batches are the usual cause of cut-off answers, retry smaller
+                max_batch_size = max(1, max_batch_size // 2)
+            batches = self.plan_batches([(i, posts[i]) for i in pending], max_batch_size)
+            pending = []
+            for done, failed in await asyncio.gather(*(run(batch) for batch in batches)):
+                for index, records in done.items():
+                    finish(index, records)
+                errors.update(failed)
+                pending.extend(failed)
+            if not pending:
+                break
+
+        for index in sorted(pending):
+            finish(index, [{"index": index, "error": True, "content": errors[index]}])
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'requests': self.requests,
+            'failed_requests': self.failed_requests,
+            'retried_posts': self.retried_posts,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens
+        }
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from crawl4ai.extraction_strategy import LLMExtractionStrategy
+
+# Seconds a write waits for another process's transaction, e.g. distributed workers sharing the cache
+BUSY_TIMEOUT = 60
+# Hits whose last_access update is held back and written in one transaction
+TOUCH_BATCH = 256
+# Puts between eviction passes, so the entry count is not taken on every write
+EVICT_BATCH = 1024
+
+
+class ExtractionCache:
+    """
+    Persistent SQLite cache of LLM extraction results.
+
+    Entries are keyed by a hash of the post text together with everything
+    that influences the model output (schema, instruction, provider and
+    sampling params), so changing any of them is a cache miss rather than a
+    stale hit. The least recently used entries are evicted past `max_entries`,
+    checked every EVICT_BATCH puts, so the cache can briefly hold up to
+    EVICT_BATCH entries more.
+    Hits do not write: their access times are written in batches, so a read
+    never waits on another process's write lock.
+    """
+
+    def __init__(self, path: str = ".extraction_cache.sqlite", max_entries: int = 200000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> access time of hits not written yet
+        self._touched: Dict[str, float] = {}
+        self._puts_since_evict = 0
+        # Extraction runs in worker threads, access is serialised by _lock
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT * 1000}")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Entries can always be extracted again, so commits are not fsynced one by one
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS extractions (
+                   key TEXT PRIMARY KEY,
+                   records TEXT NOT NULL,
+                   created_at REAL NOT NULL,
+                   last_access REAL NOT NULL
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON extractions(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(text: str, schema: Any, instruction: str, provider: str, params: Optional[Dict[str, Any]]) -> str:
+        payload = json.dumps(
+            {
+                'text': text,
+                'schema': schema,
+                'instruction': instruction,
+                'provider': provider,
+                'params': params or {}
+            },
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            row = self._conn.execute("SELECT records FROM extractions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH:
+                self._flush_touched()
+        return json.loads(row[0])
+
+    def _flush_touched(self):
+        self._conn.executemany(
+            "UPDATE extractions SET last_access = ? WHERE key = ?",
+            [(accessed, key) for key, accessed in self._touched.items()]
+        )
+        self._conn.commit()
+        self._touched.clear()
+
+    def put(self, key: str, records: List[Dict[str, Any]]):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, records, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(records, ensure_ascii=False), now, now)
+            )
+            self._touched.pop(key, None)
+            # Pending access times go in the same commit, before eviction looks at them
+            if self._touched:
+                self._flush_touched()
+            else:
+                self._conn.commit()
+            self._puts_since_evict += 1
+            if self._puts_since_evict >= EVICT_BATCH:
+                self._evict()
+
+    def _evict(self):
+        self._puts_since_evict = 0
+        count = self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM extractions WHERE key IN "
+                "(SELECT key FROM extractions ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            if self._touched:
+                self._flush_touched()
+            self._conn.close()
+
+    def __str__(self):
+        stats = self.stats()
+        return f"ExtractionCache(hits={stats['hits']}, misses={stats['misses']}, hit_rate={stats['hit_rate']:.1%})"
+
+
+def strategy_cache_key(strategy: LLMExtractionStrategy, text: str) -> str:
+    """Cache key for running `strategy` over `text`"""
+    return ExtractionCache.make_key(
+        text,
+        strategy.schema,
+        strategy.instruction,
+        strategy.llm_config.provider,
+        strategy.extra_args
+    )
+
+
+class CachedLLMExtractionStrategy(LLMExtractionStrategy):
+    """LLMExtractionStrategy that consults an ExtractionCache before calling the model"""
+
+    def __init__(self, cache: ExtractionCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def extract(self, url: str, ix: int, html: str) -> List[Dict[str, Any]]:
+        key = strategy_cache_key(self, html)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        records = super().extract(url, ix, html)
+        # Never memoize failures, they should be retried on the next run
+        if not any(record.get('error') for record in records if isinstance(record, dict)):
+            self.cache.put(key, records)
+        return records
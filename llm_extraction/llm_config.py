@@ -10,7 +10,22 @@ class LLMExtractionConfig:
         api_token: Optional[str] = None,
         temperature: float = 0.1,
         max_tokens: int = 8000,
-        top_p: float = 0.9
+        top_p: float = 0.9,
+        base_url: Optional[str] = None,
+        max_batch_size: int = 8,
+        batch_tokens: int = 3000,
+        batch_retries: int = 2,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        initial_concurrency: int = 2,
+        target_latency: Optional[float] = None,
+        request_timeout: float = 120.0,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        breaker_error_rate: float = 0.5,
+        breaker_window: int = 20,
+        breaker_open_seconds: float = 30.0
     ):
         """
         Initialize basic LLM configuration
@@ -20,6 +35,32 @@ class LLMExtractionConfig:
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.top_p = top_p
+        self.base_url = base_url  # e.g. a local Ollama server
+
+        # Batching: up to max_batch_size posts (and batch_tokens prompt tokens)
+        # share one request. Posts missing from a batch answer are retried in
+        # smaller batches, at most batch_retries times
+        self.max_batch_size = max_batch_size
+        self.batch_tokens = batch_tokens
+        self.batch_retries = batch_retries
+
+        # Provider client: in-flight requests adapt between min_concurrency and
+        # max_concurrency (halved on timeouts, overload errors or answers
+        # slower than target_latency). Transient failures are retried
+        # max_retries times with jittered backoff. When breaker_error_rate of
+        # the last breaker_window calls failed, calls are refused for
+        # breaker_open_seconds
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.initial_concurrency = initial_concurrency
+        self.target_latency = target_latency
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_error_rate = breaker_error_rate
+        self.breaker_window = breaker_window
+        self.breaker_open_seconds = breaker_open_seconds
     
     def get_extra_args(self) -> Dict[str, Any]:
         """Get extra arguments for LLM configuration"""
@@ -30,7 +71,8 @@ class LLMExtractionConfig:
         }
     
     def __str__(self):
-        return f"LLMExtractionConfig(provider={self.provider}, max_tokens={self.max_tokens})"
+        return (f"LLMExtractionConfig(provider={self.provider}, max_tokens={self.max_tokens}, "
+                f"max_batch_size={self.max_batch_size}, max_concurrency={self.max_concurrency})")
 
 
 # Simple preset configurations
@@ -43,7 +85,12 @@ class LLMConfigPresets:
         return LLMExtractionConfig(
             provider="openai/gpt-4o-mini",
             temperature=0.1,
-            max_tokens=8000
+            max_tokens=8000,
+            # Hosted APIs take plenty of parallel requests and answer quickly
+            max_concurrency=16,
+            initial_concurrency=4,
+            request_timeout=60.0,
+            max_retries=4
         )
     
     @staticmethod
@@ -53,5 +100,24 @@ class LLMConfigPresets:
             provider="ollama/llama3.2",
             api_token=None,
             temperature=0.1,
-            max_tokens=8000
+            max_tokens=8000,
+            base_url="http://localhost:11434",
+            # Ollama's default context window is small, keep batches short
+            max_batch_size=4,
+            batch_tokens=1200,
+            # One GPU serves a few requests at a time and long generations are
+            # normal; a dead server is noticed by the breaker, not by timeouts
+            max_concurrency=4,
+            initial_concurrency=1,
+            request_timeout=300.0,
+            max_retries=2,
+            backoff_base=2.0,
+            breaker_open_seconds=60.0
         )
+
+    @staticmethod
+    def for_provider(provider: str) -> LLMExtractionConfig:
+        """Preset matching a provider string, with that provider set"""
+        config = LLMConfigPresets.ollama_local() if provider.startswith("ollama/") else LLMConfigPresets.openai_fast()
+        config.provider = provider
+        return config
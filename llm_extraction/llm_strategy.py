@@ -1,13 +1,19 @@
+from typing import Dict, List, Optional, Tuple
 from crawl4ai import LLMExtractionStrategy, LLMConfig
 from llm_config import LLMExtractionConfig
-from jobs_schema import JobPostings
+from jobs_schema import JobPosting, JobPostings
+from extraction_cache import ExtractionCache, CachedLLMExtractionStrategy
+from batch_extractor import BatchLLMExtractor
+from provider_client import ProviderClient
+from rule_extractor import split_by_rules
 
 
 class BasicLLMExtractor:
     """Basic LLM extraction strategy creator"""
     
-    def __init__(self, config: LLMExtractionConfig):
+    def __init__(self, config: LLMExtractionConfig, cache: Optional[ExtractionCache] = None):
         self.config = config
+        self.cache = cache  # Reuse results for posts extracted on earlier runs
         self.instruction = """
         Extract job postings from HackerNews hiring content.
         
@@ -28,11 +34,41 @@ class BasicLLMExtractor:
             api_token=self.config.api_token
         )
         
-        # Create and return extraction strategy
-        return LLMExtractionStrategy(
+        strategy_args = dict(
             llm_config=llm_config,
             schema=JobPostings.model_json_schema(),
             extraction_type="schema",
             instruction=self.instruction,
             extra_args=self.config.get_extra_args()
-        )
\ No newline at end of file
+        )
+        
+        # Create and return extraction strategy
+        if self.cache is not None:
+            return CachedLLMExtractionStrategy(cache=self.cache, **strategy_args)
+        return LLMExtractionStrategy(**strategy_args)
+
+    def create_batch_extractor(self) -> BatchLLMExtractor:
+        """
+        Extractor that sends up to config.max_batch_size posts per request
+        and returns JobPosting records per post. Better suited than
+        create_strategy() for many short posts, e.g. against a local Ollama.
+        Requests go through a ProviderClient with the config's concurrency,
+        retry and circuit breaker settings
+        """
+        return BatchLLMExtractor(
+            self.config,
+            schema=JobPosting.model_json_schema(),
+            instruction=self.instruction,
+            cache=self.cache,
+            client=ProviderClient(self.config)
+        )
+    
+    def pre_extract(self, posts: List[str]) -> Tuple[List[Dict], List[str]]:
+        """
+        Parse well-formed posts with the rule-based extractor.
+
+        Returns JobPosting records for the posts that parsed and the
+        remaining ambiguous posts, which should go through create_strategy().
+        """
+        parsed, ambiguous = split_by_rules(posts, output='job_posting')
+        return [parsed[i] for i in sorted(parsed)], [posts[i] for i in ambiguous]
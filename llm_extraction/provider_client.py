@@ -0,0 +1,322 @@
+import asyncio
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from llm_config import LLMExtractionConfig
+
+# HTTP statuses worth retrying: timeouts, rate limits and server trouble
+TRANSIENT_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+# Exception class name fragments of transient litellm / openai / httpx errors
+TRANSIENT_NAMES = ('timeout', 'ratelimit', 'connection', 'unavailable', 'overloaded', 'internalserver')
+# The same for errors only known by their message, like those in extraction error records
+TRANSIENT_MESSAGE = re.compile(
+    r'time[ds]? ?out|rate ?limit|too many requests|connection|unavailable|overloaded|internal ?server', re.I
+)
+# An HTTP status quoted in an error message ("Error code: 429", "status 503")
+MESSAGE_STATUS = re.compile(r'\b(?:status|code|http)\b\D{0,8}(\d{3})\b', re.I)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the provider while the circuit breaker is open"""
+
+
+class RateLimitedError(RuntimeError):
+    """The provider kept refusing a request with a rate limit after its own retries"""
+
+    status_code = 429
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether a failed provider call is worth retrying"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, 'status_code', None) or getattr(error, 'status', None)
+    if isinstance(status, int):
+        return status in TRANSIENT_STATUSES
+    name = type(error).__name__.lower()
+    return any(fragment in name for fragment in TRANSIENT_NAMES)
+
+
+def is_transient_message(message: str) -> bool:
+    """is_transient for a failure only known by its message"""
+    status = MESSAGE_STATUS.search(message)
+    if status:
+        return int(status.group(1)) in TRANSIENT_STATUSES
+    return TRANSIENT_MESSAGE.search(message) is not None
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on in-flight requests, the way TCP sizes its window.
+
+    Every request that succeeds within `target_latency` grows the limit by
+    about one per `limit` requests (additive increase); a timeout,
+    overload error or slow answer multiplies it by `decrease` (multiplicative
+    decrease), at most once per `cooldown` seconds so one burst of failures
+    does not collapse it to the minimum.
+    """
+
+    def __init__(
+        self,
+        initial: int = 2,
+        minimum: int = 1,
+        maximum: int = 8,
+        target_latency: Optional[float] = None,
+        decrease: float = 0.5,
+        cooldown: float = 1.0
+    ):
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.target_latency = target_latency
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        # One condition per event loop, so the limiter survives repeated asyncio.run calls
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+        return self._condition
+
+    async def acquire(self):
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, overloaded: bool, latency: float):
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            slow = self.target_latency is not None and latency > self.target_latency
+            now = time.monotonic()
+            if overloaded or slow:
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(float(self.minimum), self.limit * self.decrease)
+                    self._last_decrease = now
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+            condition.notify_all()
+
+    async def abandon(self):
+        """Free the slot of a cancelled request, leaving the limit as it is"""
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a provider that keeps failing.
+
+    Closed: calls go through and results are tracked over the last `window`
+    calls. Once at least `min_requests` were seen and `error_rate` of them
+    failed, the breaker opens and every call is refused for `open_seconds`.
+    Then one trial call is let through (half-open): success closes the
+    breaker, failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, error_rate: float = 0.5, window: int = 20, min_requests: int = 5, open_seconds: float = 30.0):
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self.opened = 0
+        self._results = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record(self, ok: bool):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                if ok:
+                    self.state = self.CLOSED
+                    self._results.clear()
+                else:
+                    self._open()
+                return
+            self._results.append(ok)
+            failures = self._results.count(False)
+            if (self.state == self.CLOSED and len(self._results) >= self.min_requests
+                    and failures / len(self._results) >= self.error_rate):
+                self._open()
+
+    def abandon(self):
+        """A call allow() let through was cancelled before it had a result. Lets another trial through"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trial_running = False
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened += 1
+        self._opened_at = time.monotonic()
+        self._trial_running = False
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a trial call through"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+
+class ProviderClient:
+    """
+    Calls a blocking LLM provider function with adaptive concurrency,
+    per-request timeouts, jittered exponential backoff and a circuit breaker.
+
+    One client should be shared by everything that talks to the same
+    endpoint, so the limit and breaker see all of its traffic. Latency and
+    error counts are kept for stats().
+    """
+
+    def __init__(self, config: LLMExtractionConfig):
+        self.config = config
+        self.limiter = AdaptiveConcurrency(
+            initial=config.initial_concurrency,
+            minimum=config.min_concurrency,
+            maximum=config.max_concurrency,
+            target_latency=config.target_latency
+        )
+        self.breaker = CircuitBreaker(
+            error_rate=config.breaker_error_rate,
+            window=config.breaker_window,
+            open_seconds=config.breaker_open_seconds
+        )
+        # Calls run on threads of their own, at most max_concurrency of them
+        self._executor = ThreadPoolExecutor(max_workers=config.max_concurrency, thread_name_prefix='provider')
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.rejected = 0
+        self.latency_ewma = 0.0
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(backoff_max, backoff_base * 2**attempt)]"""
+        return self._rng.uniform(0, min(self.config.backoff_max, self.config.backoff_base * 2 ** attempt))
+
+    def _observe(self, ok: bool, latency: float):
+        with self._lock:
+            self.requests += 1
+            if not ok:
+                self.failures += 1
+            self.latency_ewma = latency if self.requests == 1 else 0.8 * self.latency_ewma + 0.2 * latency
+
+    async def call(self, fn: Callable[..., Any], *args, failed: Optional[Callable[[Any], Optional[str]]] = None) -> Any:
+        """
+        Run fn(*args) on one of the client's threads and return its result.
+
+        `failed` inspects a result and returns a reason when it should count
+        as a failure (for functions that report errors in their result, like
+        LLMExtractionStrategy.extract). Transient failures are retried up to
+        config.max_retries times; the last failing result is returned, or
+        the last exception raised. Raises CircuitOpenError while the
+        provider is being shed.
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                with self._lock:
+                    self.rejected += 1
+                raise CircuitOpenError(
+                    f"{self.config.provider} circuit open, retry in {self.breaker.retry_after():.0f}s"
+                )
+
+            try:
+                await self.limiter.acquire()
+            except asyncio.CancelledError:
+                self.breaker.abandon()
+                raise
+            start = time.perf_counter()
+            result, error, reason = None, None, None
+            try:
+                # A timed out call frees its slot but keeps its thread until the provider
+                # answers, so calls past the executor's bound wait for a thread (within
+                # their timeout) instead of piling more threads onto a stuck provider
+                call = asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+                result = await asyncio.wait_for(call, self.config.request_timeout)
+                reason = failed(result) if failed is not None else None
+            except asyncio.CancelledError:
+                # The caller gave up (e.g. a distributed worker lost its task), not the provider
+                await self.limiter.abandon()
+                self.breaker.abandon()
+                raise
+            except asyncio.TimeoutError as e:
+                error = e
+                with self._lock:
+                    self.timeouts += 1
+            except Exception as e:
+                error = e
+            latency = time.perf_counter() - start
+
+            ok = error is None and reason is None
+            if error is not None:
+                transient = is_transient(error)
+            else:
+                # Bad JSON or a rejected API key in the records will not go away on a retry
+                transient = reason is not None and is_transient_message(reason)
+            await self.limiter.release(overloaded=transient, latency=latency)
+            self.breaker.record(ok)
+            self._observe(ok, latency)
+
+            if ok:
+                return result
+            if not transient or attempt >= self.config.max_retries:
+                if error is not None:
+                    raise error
+                return result
+            with self._lock:
+                self.retries += 1
+            await asyncio.sleep(self.backoff(attempt))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'failures': self.failures,
+            'timeouts': self.timeouts,
+            'retries': self.retries,
+            'rejected': self.rejected,
+            'breaker_state': self.breaker.state,
+            'breaker_opened': self.breaker.opened,
+            'concurrency_limit': round(self.limiter.limit, 2),
+            'latency_ewma': round(self.latency_ewma, 3)
+        }
+
+    def __str__(self):
+        stats = self.stats()
+        return (f"ProviderClient({self.config.provider}, limit={stats['concurrency_limit']}, "
+                f"requests={stats['requests']}, failures={stats['failures']}, retries={stats['retries']}, "
+                f"breaker={stats['breaker_state']})")
@@ -0,0 +1,310 @@
+import os
+import re
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing_extensions import TypedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fast_json import loads
+
+CODE_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$')
+# The only characters that matter when finding where JSON values end
+JSON_STRUCTURE_RE = re.compile(r'[\[\]{}"\\]')
+# How models run a list together when a string is asked for a list
+LIST_SPLIT_RE = re.compile(r'\s*(?:[,;|\n]|\s/\s)\s*')
+# Joins a list the model returned where the schema asks for a string
+LIST_JOINER = ', '
+
+
+def close_truncated_json(text: str) -> str:
+    """
+    Cut JSON text back to what parses: after the first complete top-level
+    value, or, for an answer cut off mid-way (the model ran out of tokens),
+    after the last complete element of the outermost container that has
+    one, with the still open brackets closed. A half-written element is
+    dropped whole rather than kept with part of its content. Raises
+    ValueError when not even one nested value is complete.
+    """
+    closers: List[str] = []
+    in_string = False
+    escaped_at = -1
+    cut: Optional[Tuple[int, str]] = None
+    for match in JSON_STRUCTURE_RE.finditer(text):
+        i = match.start()
+        char = text[i]
+        if in_string:
+            if i == escaped_at:
+                continue
+            if char == '\\':
+                escaped_at = i + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '[':
+            closers.append(']')
+        elif char == '{':
+            closers.append('}')
+        elif char in ']}':
+            if not closers or closers[-1] != char:
+                break
+            closers.pop()
+            if not closers:
+                return text[:i + 1]
+            if cut is None or len(closers) <= len(cut[1]):
+                cut = (i + 1, ''.join(reversed(closers)))
+    if cut is None:
+        raise ValueError("no complete JSON value to recover")
+    return text[:cut[0]] + cut[1]
+
+
+def repair_json(text: str) -> Any:
+    """
+    JSON from a model answer: code fences and text around the JSON are
+    dropped, and a truncated array or object keeps its complete elements.
+    Raises ValueError when nothing can be recovered.
+    """
+    text = CODE_FENCE_RE.sub('', text.strip())
+    try:
+        return loads(text)
+    except ValueError:
+        pass
+    starts = [i for i in (text.find('['), text.find('{')) if i != -1]
+    if not starts:
+        raise ValueError("no JSON in the response")
+    try:
+        return loads(close_truncated_json(text[min(starts):]))
+    except ValueError as e:
+        raise ValueError(f"invalid JSON in the response: {e}") from e
+
+
+def _record_type(model: Type[BaseModel]) -> Any:
+    """
+    A TypedDict with the model's fields when the model declares nothing but
+    annotated, required fields. It validates the same values several times
+    faster than the model (no model instances are built) and yields plain
+    dicts. Models with validators, constraints or defaults are used as is.
+    """
+    decorators = model.__pydantic_decorators__
+    if (decorators.field_validators or decorators.model_validators
+            or any(field.metadata or not field.is_required() for field in model.model_fields.values())):
+        return model
+    return TypedDict(model.__name__, {name: field.annotation for name, field in model.model_fields.items()})
+
+
+def _field_kind(annotation: Any) -> Tuple[str, bool]:
+    """('str' | 'list' | 'other', optional) for a model field annotation"""
+    optional = False
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        optional = len(args) < len(get_args(annotation))
+        annotation = args[0] if len(args) == 1 else annotation
+    if annotation is str:
+        return 'str', optional
+    if get_origin(annotation) in (list, List):
+        return 'list', optional
+    return 'other', optional
+
+
+class RecordValidator:
+    """
+    Validates and normalises extracted records against a pydantic model,
+    many records per TypeAdapter call.
+
+    Before validation, the usual LLM slips are repaired: a list where the
+    schema has a string (technology_stack: ["Go", "Rust"]), a string where
+    it has a list (technologies: "Go, Rust"), numbers for strings and null
+    or left out string fields. Error records whose raw answer still holds
+    JSON (a truncated or chatty response) are parsed again. Records that
+    then fail validation, or carry none of the model's fields, are dropped
+    and counted.
+
+    A container model with a single list-of-models field (JobPostings) is
+    validated per item, unwrapping {"jobs": [...]} records. Fields outside
+    the model, like the thread month or index, are kept as they are.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.container_field = None
+        fields = model.model_fields
+        if len(fields) == 1:
+            name, field = next(iter(fields.items()))
+            item = get_args(field.annotation)[0] if get_origin(field.annotation) in (list, List) else None
+            if isinstance(item, type) and issubclass(item, BaseModel):
+                self.container_field = name
+                model = item
+        self.model = model
+        self.fields = [(name, *_field_kind(field.annotation)) for name, field in model.model_fields.items()]
+        self.record_type = _record_type(model)
+        self.adapter = TypeAdapter(List[self.record_type])
+        self._lock = threading.Lock()
+        self.validated = 0
+        self.rejected = 0
+        self.coerced = 0
+        self.repaired = 0
+        self.last_error: Optional[str] = None
+
+    def _recover(self, record: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Records still parseable from the raw answer of an error record"""
+        content = record.get('content')
+        fragments = content if isinstance(content, list) else [content]
+        recovered: List[Dict[str, Any]] = []
+        for fragment in fragments:
+            if not isinstance(fragment, str) or ('{' not in fragment and '[' not in fragment):
+                continue
+            try:
+                data = repair_json(fragment)
+            except ValueError:
+                continue
+            items = data if isinstance(data, list) else [data]
+            recovered.extend(item for item in items if isinstance(item, dict) and 'error' not in item)
+        return recovered
+
+    def _unwrap(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        unwrapped = []
+        for record in records:
+            items = record.get(self.container_field)
+            if isinstance(items, list):
+                extras = {key: value for key, value in record.items() if key != self.container_field}
+                unwrapped.extend(dict(extras, **item) for item in items if isinstance(item, dict))
+            else:
+                unwrapped.append(record)
+        return unwrapped
+
+    def coerce(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        The record with the types of its fields repaired, or None when it
+        holds none of the model's fields. Missing fields are not filled in,
+        so a record without a required field still fails validation.
+        """
+        fixed = None
+        present = False
+        for name, kind, optional in self.fields:
+            value = record.get(name)
+            # Fast path: most records already have the right types
+            if kind == 'str' and type(value) is str:
+                present = True
+                continue
+            if kind == 'list' and type(value) is list and all(type(item) is str for item in value):
+                present = True
+                continue
+            if name not in record:
+                continue
+            present = True
+            if kind == 'str':
+                if value is None:
+                    value = None if optional else ''
+                elif isinstance(value, (list, tuple)):
+                    value = LIST_JOINER.join(str(item).strip() for item in value if item not in (None, ''))
+                elif isinstance(value, (int, float)):
+                    value = str(value)
+            elif kind == 'list':
+                if value is None:
+                    value = None if optional else []
+                elif isinstance(value, str):
+                    value = [part for part in LIST_SPLIT_RE.split(value.strip()) if part]
+                elif isinstance(value, list):
+                    if not all(isinstance(item, str) for item in value):
+                        value = [item if isinstance(item, str) else str(item) for item in value if item is not None]
+                else:
+                    value = [str(value)]
+            else:
+                continue
+            if value is not record[name]:
+                if fixed is None:
+                    fixed = dict(record)
+                fixed[name] = value
+        if not present:
+            return None
+        if fixed is None:
+            return record
+        with self._lock:
+            self.coerced += 1
+        return fixed
+
+    def validate(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Normalised copies of the valid records, in order. Error records
+        that cannot be recovered are passed through unchanged, so callers
+        still see which posts failed.
+        """
+        output: List[Optional[Dict[str, Any]]] = []
+        candidates: List[Dict[str, Any]] = []
+        positions: List[int] = []
+        rejected = repaired = 0
+        if self.container_field is not None:
+            records = self._unwrap([record for record in records if isinstance(record, dict)])
+        for record in records:
+            if not isinstance(record, dict):
+                rejected += 1
+                continue
+            batch = [record]
+            if record.get('error'):
+                batch = self._recover(record)
+                if not batch:
+                    output.append(record)
+                    continue
+                repaired += len(batch)
+                extras = {key: record[key] for key in ('index',) if key in record}
+                batch = [dict(extras, **item, error=False) for item in batch]
+            for item in batch:
+                fixed = self.coerce(item)
+                if fixed is None:
+                    rejected += 1
+                    continue
+                positions.append(len(output))
+                output.append(None)
+                candidates.append(fixed)
+
+        valid, failures = self._validate_batch(candidates)
+        # The TypedDict gives back the values coerce() already typed, a model may change them
+        merge = self.record_type is self.model
+        for position, record, model_fields in zip(positions, candidates, valid):
+            if model_fields is not None:
+                output[position] = {**record, **model_fields} if merge else record
+        with self._lock:
+            self.validated += len(candidates) - failures
+            self.rejected += rejected + failures
+            self.repaired += repaired
+        return [record for record in output if record is not None]
+
+    def _validate_batch(self, records: List[Dict[str, Any]]) -> Tuple[List[Optional[Dict[str, Any]]], int]:
+        """Model fields per record (None where invalid) and the number of invalid records"""
+        if not records:
+            return [], 0
+        try:
+            return self._run(records), 0
+        except ValidationError as e:
+            bad = {error['loc'][0] for error in e.errors() if error['loc']}
+            with self._lock:
+                self.last_error = str(e.errors()[0]['msg']) if e.errors() else str(e)
+        # One pass again over the rest, so a bad record does not sink its batch
+        good = [i for i in range(len(records)) if i not in bad]
+        try:
+            dumped = iter(self._run([records[i] for i in good]))
+        except ValidationError:
+            results = [self._validate_one(record) for record in records]
+            return results, sum(1 for result in results if result is None)
+        return [None if i in bad else next(dumped) for i in range(len(records))], len(bad)
+
+    def _run(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        validated = self.adapter.validate_python(records)
+        return self.adapter.dump_python(validated) if self.record_type is self.model else validated
+
+    def _validate_one(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            return self._run([record])[0]
+        except ValidationError:
+            return None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'validated': self.validated,
+            'rejected': self.rejected,
+            'coerced': self.coerced,
+            'repaired': self.repaired
+        }
@@ -0,0 +1,197 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Deterministic extraction for posts that follow the usual HN hiring layouts:
+#
+#   Company | Role | Location | REMOTE | Full-time | https://company.com/jobs
+#
+# or the labelled layout used on hnhiring.com style pages:
+#
+#   ## Company
+#   **Location:** US Fully Remote | Full-time
+#   **Positions:** Senior Web, Backend, and Data Engineers
+#
+# Only posts where both the company and the role are found are returned,
+# everything else is left for the LLM.
+
+TECHNOLOGIES = [
+    'Python', 'Go', 'Golang', 'Rust', 'Java', 'Kotlin', 'Scala', 'Swift', 'Objective-C',
+    'C\\+\\+', 'C#', '\\.NET', 'Ruby', 'Rails', 'PHP', 'Elixir', 'Erlang', 'Haskell', 'OCaml',
+    'Clojure', 'JavaScript', 'TypeScript', 'Node\\.js', 'Node', 'Deno', 'React', 'React Native',
+    'Next\\.js', 'Vue\\.js', 'Vue', 'Angular', 'Svelte', 'Django', 'Flask', 'FastAPI', 'Spring',
+    'GraphQL', 'SQL', 'PostgreSQL', 'Postgres', 'MySQL', 'SQLite', 'MongoDB', 'Redis',
+    'Elasticsearch', 'Kafka', 'NiFi', 'Spark', 'Airflow', 'dbt', 'Snowflake', 'BigQuery',
+    'Firebase', 'Supabase', 'AWS', 'GCP', 'Azure', 'Kubernetes', 'Docker', 'Terraform',
+    'CloudFormation', 'Linux', 'PyTorch', 'TensorFlow', 'JAX', 'CUDA', 'LLM', 'Flutter',
+    'iOS', 'Android', 'Unity', 'Unreal'
+]
+# Names that are also everyday words only count when capitalised
+AMBIGUOUS_TECHNOLOGIES = {'Go', 'Node', 'Spring', 'Unity', 'Swift', 'Spark', 'Rust', 'Unreal'}
+TECHNOLOGY_RE = re.compile(
+    r'(?<![\w.+#])(' + '|'.join(t for t in TECHNOLOGIES if t not in AMBIGUOUS_TECHNOLOGIES) + r')(?![\w+#]|\.\w)',
+    re.IGNORECASE
+)
+AMBIGUOUS_TECHNOLOGY_RE = re.compile(r'(?<![\w.+#])(' + '|'.join(AMBIGUOUS_TECHNOLOGIES) + r')(?![\w+#]|\.\w)')
+CANONICAL_TECHNOLOGIES = {re.sub(r'\\', '', tech).lower(): re.sub(r'\\', '', tech) for tech in TECHNOLOGIES}
+
+ROLE_RE = re.compile(
+    r'\b(engineers?|developers?|programmers?|scientists?|researchers?|designers?|architects?|'
+    r'managers?|leads?|analysts?|sre|devops|cto|vp|head of|founding|intern(ship)?s?|'
+    r'full[- ]?stack|front[- ]?end|back[- ]?end|ml|data|staff|principal|senior|junior)\b',
+    re.IGNORECASE
+)
+LOCATION_RE = re.compile(
+    r'\b(remote|onsite|on-site|hybrid|in[- ]office|relocation|visa|'
+    r'usa?|uk|eu|europe|canada|germany|london|berlin|paris|amsterdam|new york|nyc|'
+    r'san francisco|sf|bay area|seattle|austin|boston|chicago|los angeles|toronto|tokyo|'
+    r'singapore|bangalore|sydney|[A-Z][a-z]+,\s*[A-Z]{2})\b',
+    re.IGNORECASE
+)
+EMPLOYMENT_RE = re.compile(r'\b(full[- ]?time|part[- ]?time|contract(or)?|freelance|permanent|ft|pt)\b', re.IGNORECASE)
+URL_RE = re.compile(r'(https?://[^\s<>\])]+|\b[\w-]+(\.[\w-]+)*\.(com|io|ai|dev|co|org|net|app|tech|jobs)(/[^\s<>\])]*)?\b)')
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+HEADER_SEPARATOR_RE = re.compile(r'\s+\|\s+|\s*\|\s*')
+MARKDOWN_DECORATION_RE = re.compile(r'^\s*(?:[#>]+\s*|[-*]\s+)|\*\*|__')
+LABEL_RE = re.compile(
+    r'^\W*(location|locations|positions?|roles?|title|contact|apply|email|'
+    r'skills(?: needed)?|tech(?:nolog(?:y|ies))?(?: stack)?|stack)\W*:\W*(.*)$',
+    re.IGNORECASE
+)
+APPLY_LINE_RE = re.compile(r'\b(apply|email|contact|reach out|send|ping)\b', re.IGNORECASE)
+
+
+def _strip_markdown(line: str) -> str:
+    return MARKDOWN_DECORATION_RE.sub('', line).strip()
+
+
+def _technologies(text: str) -> List[str]:
+    matches = sorted(
+        list(TECHNOLOGY_RE.finditer(text)) + list(AMBIGUOUS_TECHNOLOGY_RE.finditer(text)),
+        key=lambda match: match.start()
+    )
+    seen = {}
+    for match in matches:
+        canonical = CANONICAL_TECHNOLOGIES.get(match.group(1).lower(), match.group(1))
+        seen.setdefault(canonical.lower(), canonical)
+    return list(seen.values())
+
+
+def _contact(text: str) -> Optional[str]:
+    emails = EMAIL_RE.findall(text)
+    if emails:
+        return ', '.join(dict.fromkeys(emails))
+    for line in text.splitlines():
+        if APPLY_LINE_RE.search(line) and URL_RE.search(line):
+            return _strip_markdown(line)
+    urls = URL_RE.findall(text)
+    return urls[0][0] if urls else None
+
+
+def _parse_pipe_header(header: str) -> Optional[Dict[str, Any]]:
+    segments = [s.strip() for s in HEADER_SEPARATOR_RE.split(header) if s.strip()]
+    if len(segments) < 3:
+        return None
+
+    company = segments[0]
+    roles, locations = [], []
+    for segment in segments[1:]:
+        if URL_RE.fullmatch(segment) or EMPLOYMENT_RE.fullmatch(segment):
+            continue
+        if LOCATION_RE.search(segment) and not ROLE_RE.search(segment):
+            locations.append(segment)
+        elif ROLE_RE.search(segment):
+            roles.append(segment)
+        elif EMPLOYMENT_RE.search(segment):
+            continue
+        else:
+            locations.append(segment)
+
+    if not roles or LOCATION_RE.fullmatch(company) or ROLE_RE.fullmatch(company):
+        return None
+    return {
+        'company': company,
+        'position': ', '.join(roles),
+        'location': ' | '.join(locations) or None
+    }
+
+
+def _parse_labelled(lines: List[str]) -> Optional[Dict[str, Any]]:
+    company = _strip_markdown(lines[0])
+    fields: Dict[str, str] = {}
+    for line in lines[1:]:
+        match = LABEL_RE.match(line)
+        if match:
+            fields.setdefault(match.group(1).lower(), _strip_markdown(match.group(2)))
+
+    position = next((fields[k] for k in ('positions', 'position', 'roles', 'role', 'title') if fields.get(k)), None)
+    if not company or not position or '|' in company or len(company) > 60:
+        return None
+    location = fields.get('location') or fields.get('locations')
+    return {'company': company, 'position': position, 'location': location or None}
+
+
+def parse_post(post: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse a well-formed post into JobPosting fields
+    (company, position, location, technologies, contact_info).
+
+    Returns None when the post is ambiguous and should go to the LLM.
+    """
+    lines = [line for line in post.splitlines() if line.strip()]
+    if not lines:
+        return None
+
+    header = _strip_markdown(lines[0])
+    parsed = _parse_pipe_header(header) if '|' in header else _parse_labelled(lines)
+    if parsed is None:
+        return None
+
+    parsed['technologies'] = _technologies(post)
+    parsed['contact_info'] = _contact(post)
+    parsed['description'] = ' '.join(_strip_markdown(line) for line in lines[1:]).strip()
+    return parsed
+
+
+def to_job_posting(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of llm_extraction/jobs_schema.py JobPosting"""
+    return {
+        'company': parsed['company'],
+        'position': parsed['position'],
+        'location': parsed['location'],
+        'technologies': parsed['technologies'],
+        'contact_info': parsed['contact_info']
+    }
+
+
+def to_who_is_hiring(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of schema.py WhoIsHiring, plus the error flag the LLM output carries"""
+    company_and_location = parsed['company']
+    if parsed['location']:
+        company_and_location = f"{company_and_location} | {parsed['location']}"
+    return {
+        'company_name_and_location': company_and_location,
+        'technology_stack': ' / '.join(parsed['technologies']) or parsed['position'],
+        'job_description': f"{parsed['position']}. {parsed['description']}".strip(),
+        'application_details': parsed['contact_info'] or '',
+        'error': False
+    }
+
+
+def split_by_rules(posts: List[str], output: str = 'who_is_hiring') -> Tuple[Dict[int, Dict[str, Any]], List[int]]:
+    """
+    Run the rule-based parser over posts.
+
+    Returns the records for posts that parsed (keyed by post index, shaped
+    for `output`: 'who_is_hiring' or 'job_posting') and the indices of the
+    posts that still need the LLM.
+    """
+    convert = to_who_is_hiring if output == 'who_is_hiring' else to_job_posting
+    parsed: Dict[int, Dict[str, Any]] = {}
+    ambiguous: List[int] = []
+    for i, post in enumerate(posts):
+        result = parse_post(post)
+        if result is None:
+            ambiguous.append(i)
+        else:
+            parsed[i] = convert(result)
+    return parsed, ambiguous
@@ -0,0 +1,119 @@
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Near-duplicate detection for job posts: word shingles -> MinHash
+# signatures -> LSH banding. Each post is only compared with the posts that
+# share at least one band bucket with it, so the cost grows linearly with
+# the number of posts instead of quadratically.
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Universal hashing h(x) = (a * x + b) mod p over 32-bit shingle hashes.
+# With a, b < 2**32 the products stay below 2**64, so uint64 never overflows.
+MERSENNE_PRIME = np.uint64(4294967311)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def shingles(text: str, size: int = 5) -> np.ndarray:
+    """crc32 hashes of the word `size`-grams of a text"""
+    tokens = TOKEN_RE.findall(text.lower())
+    if len(tokens) < size:
+        grams = [' '.join(tokens)] if tokens else ['']
+    else:
+        grams = [' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+    return np.fromiter((zlib.crc32(gram.encode('utf-8')) for gram in set(grams)), dtype=np.uint64)
+
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) whose LSH S-curve midpoint (1/b)^(1/r) is the highest
+    one not above `threshold`. Erring low favours recall, and candidates are
+    verified against the threshold afterwards anyway.
+    """
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    below = [option for option in options if (1 / option[0]) ** (1 / option[1]) <= threshold]
+    return max(below or options, key=lambda option: (1 / option[0]) ** (1 / option[1]))
+
+
+class MinHashLSH:
+    """Streaming MinHash LSH index over post texts"""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2**32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2**32, size=num_perm, dtype=np.uint64)
+
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self._signatures: List[np.ndarray] = []
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingles(text, self.shingle_size)
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def similarity(self, a: np.ndarray, b: np.ndarray) -> float:
+        """Jaccard similarity estimated from two signatures"""
+        return float(np.count_nonzero(a == b)) / self.num_perm
+
+    def query(self, signature: np.ndarray) -> Optional[Tuple[int, float]]:
+        """Most similar indexed post at or above the threshold, as (key, similarity)"""
+        candidates = set()
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(band.get(key, ()))
+        best = None
+        for candidate in candidates:
+            score = self.similarity(signature, self._signatures[candidate])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (candidate, score)
+        return best
+
+    def insert(self, signature: np.ndarray) -> int:
+        key = len(self._signatures)
+        self._signatures.append(signature)
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            band.setdefault(band_key, []).append(key)
+        return key
+
+    def __len__(self):
+        return len(self._signatures)
+
+
+def collapse_near_duplicates(posts: List[str], threshold: float = 0.8, lsh: Optional[MinHashLSH] = None) -> Tuple[List[str], Dict[int, List[int]]]:
+    """
+    Drop posts that are near-duplicates of an earlier post.
+
+    Returns the unique posts (first occurrence kept, order preserved) and a
+    map from each kept post's index in `posts` to the indices of its reposts.
+    Pass an existing `lsh` to also match against posts seen in earlier calls,
+    e.g. previous months' threads.
+    """
+    if lsh is None:
+        lsh = MinHashLSH(threshold=threshold)
+    first_key = len(lsh)
+    unique: List[str] = []
+    reposts: Dict[int, List[int]] = {}
+    key_to_post: Dict[int, int] = {}
+
+    for i, post in enumerate(posts):
+        signature = lsh.signature(post)
+        match = lsh.query(signature)
+        if match is None:
+            key_to_post[lsh.insert(signature)] = i
+            unique.append(post)
+            reposts[i] = []
+        elif match[0] >= first_key:
+            reposts[key_to_post[match[0]]].append(i)
+        # else: a repost of something indexed in an earlier call, just drop it
+
+    return unique, {i: dupes for i, dupes in reposts.items() if dupes}
@@ -6,11 +6,141 @@ from dotenv import load_dotenv
 import sys
 import yaml
 from schema import WhoIsHiring, OpenAIModelFee
-from typing import Dict, Optional, List
+from post_chunker import split_posts, pack_posts, attribute_records, dedupe_records, estimate_tokens
+from near_duplicates import collapse_near_duplicates
+from prompt_pruner import prune_page, prune_post, restore_application_links
+from llm_extraction.extraction_cache import ExtractionCache, strategy_cache_key
+from llm_extraction.rule_extractor import split_by_rules
+from job_sink import OUTPUT_SCOPES, JsonlJobSink, compact_jsonl_to_json, read_latest_jsonl
+from job_store import is_job_store_path, write_store_jobs
+from job_identity import thread_month_from_url
+from typing import Callable, Dict, Optional, List, Set, Tuple
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scraper'))
+from deep_crawl import crawl_hnhiring_archive
+from logger import ScraperLogger
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'llm_extraction'))
+from batch_extractor import BatchLLMExtractor
+from llm_config import LLMConfigPresets, LLMExtractionConfig
+from provider_client import ProviderClient
+from record_validation import RecordValidator
+from jobs_schema import JobPostings
 import json
 
 load_dotenv()
 
+# Timings and counters land in the same registry as the scraper's
+logger = ScraperLogger("extraction")
+
+# Maps the cache_policy setting in extract_llm.yml onto crawl4ai's own cache.
+# Same policy names as scraper/page_cache.py CachePolicy. crawl4ai's cache has
+# no ETag/Last-Modified check and no TTL, so it cannot revalidate: a cached
+# copy of the current month's thread would be served forever. "revalidate"
+# therefore fetches fresh here; the scraper's PageCache does the real check.
+CACHE_POLICIES = {
+    "always_fresh": CacheMode.WRITE_ONLY,  # Always fetch, keep a copy for later runs
+    "revalidate": CacheMode.BYPASS,  # Always fetch
+    "offline_only": CacheMode.READ_ONLY,  # Never fetch, only use cached pages
+}
+
+# Instruction for the WhoIsHiring schema. Part of the extraction cache key,
+# so any edit re-extracts every post
+JOB_INSTRUCTION = """From the crawled content, extract job posting information including:
+            - company_name_and_location: Name of the company that is hiring along with the location
+            - job_description: Description of the job role and requirements
+            - technology_stack: Technology stack of the desired candidate the company is looking for
+            - application_details: How to apply for the job
+            Return the data in the exact JSON schema format specified."""
+
+def create_extraction_strategy(config: Dict, schema: Dict, instruction: str) -> LLMExtractionStrategy:
+    """LLMExtractionStrategy for the provider and params in extract_llm.yml"""
+    if "provider" not in config:
+        raise ValueError("Provider not specified in config")
+
+    # Create LLM config with proper provider format
+    llm_config = LLMConfig(provider=config["provider"], api_token=config.get("api_token"), base_url=config.get("base_url"))
+    print(f"Using LLM config: provider={llm_config.provider}, model={getattr(llm_config, 'model', 'default')}")
+
+    return LLMExtractionStrategy(
+        llm_config=llm_config,
+        schema=schema,
+        extraction_type="schema",
+        extra_args=config.get("params", {}),
+        instruction=instruction,
+        apply_chunking=False,  # We chunk at post boundaries ourselves
+    )
+
+# Keys of the `provider_client` section of extract_llm.yml
+PROVIDER_CLIENT_KEYS = (
+    "max_concurrency", "min_concurrency", "initial_concurrency", "target_latency", "request_timeout",
+    "max_retries", "backoff_base", "backoff_max", "breaker_error_rate", "breaker_window", "breaker_open_seconds"
+)
+
+def create_llm_config(config: Dict) -> LLMExtractionConfig:
+    """LLMExtractionConfig for extract_llm.yml: the provider's preset, overridden by the file"""
+    llm_config = LLMConfigPresets.for_provider(config["provider"])
+    llm_config.api_token = config.get("api_token")
+    llm_config.base_url = config.get("base_url") or llm_config.base_url
+    params = config.get("params", {})
+    llm_config.temperature = params.get("temperature", llm_config.temperature)
+    llm_config.max_tokens = params.get("max_tokens", llm_config.max_tokens)
+    llm_config.top_p = params.get("top_p", llm_config.top_p)
+
+    batching = config.get("batching", {})
+    llm_config.max_batch_size = batching.get("max_batch_size", llm_config.max_batch_size)
+    llm_config.batch_tokens = batching.get("batch_tokens", llm_config.batch_tokens)
+    llm_config.batch_retries = batching.get("retries", llm_config.batch_retries)
+
+    for key, value in config.get("provider_client", {}).items():
+        if key not in PROVIDER_CLIENT_KEYS:
+            raise ValueError(f"Unknown provider_client setting {key!r}. Valid settings: {list(PROVIDER_CLIENT_KEYS)}")
+        setattr(llm_config, key, value)
+    return llm_config
+
+def create_provider_client(config: Dict) -> ProviderClient:
+    """Shared client for every request to the configured provider"""
+    return ProviderClient(create_llm_config(config))
+
+def create_batch_extractor(
+    config: Dict, schema: Dict, instruction: str, client: Optional[ProviderClient] = None
+) -> Optional[BatchLLMExtractor]:
+    """BatchLLMExtractor for the `batching` section of extract_llm.yml, None when batching is off"""
+    if not config.get("batching", {}).get("enabled", False):
+        return None
+    llm_config = client.config if client is not None else create_llm_config(config)
+    return BatchLLMExtractor(llm_config, schema, instruction, client=client)
+
+# Models extraction output can be validated against, matched by JSON schema
+VALIDATION_MODELS = (WhoIsHiring, OpenAIModelFee, JobPostings)
+
+def create_record_validator(config: Dict, schema: Dict) -> Optional[RecordValidator]:
+    """RecordValidator for the model behind `schema`, None when validation is off or the schema is unknown"""
+    if not config.get("validation", {}).get("enabled", False):
+        return None
+    model = next((model for model in VALIDATION_MODELS if model.model_json_schema() == schema), None)
+    return RecordValidator(model) if model is not None else None
+
+def record_validator_usage(validator: Optional[RecordValidator]):
+    """Add the validator's rejected, coerced and repaired record counts to the metrics"""
+    if validator is None:
+        return
+    stats = validator.stats()
+    logger.count("records_validated", stats['validated'])
+    logger.count("records_rejected", stats['rejected'])
+    logger.count("records_coerced", stats['coerced'])
+    logger.count("records_repaired", stats['repaired'])
+    if stats['rejected']:
+        print(f"Validation rejected {stats['rejected']} records, last error: {validator.last_error}")
+
+def record_client_usage(client: ProviderClient):
+    """Add the provider client's retry and circuit breaker counts to the metrics"""
+    stats = client.stats()
+    logger.count("llm_client_retries", stats['retries'])
+    logger.count("llm_client_timeouts", stats['timeouts'])
+    logger.count("llm_client_rejected", stats['rejected'])
+    logger.count("llm_circuit_opened", stats['breaker_opened'])
+    logger.gauge("llm_concurrency_limit", stats['concurrency_limit'])
+    print(client)
+
 def write_valid_jobs_to_json(jobs_data, filename):
     try:
         # If jobs_data is a string, try to parse it as JSON
@@ -30,9 +160,13 @@ def write_valid_jobs_to_json(jobs_data, filename):
             # If it's already a list, filter it
             filtered_jobs = [job for job in jobs_data if not job.get('error', False)]
         
-        # Write filtered jobs to the specified JSON file
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(filtered_jobs, f, ensure_ascii=False, indent=4)
+        # A .sqlite filename goes to the job store instead of a JSON file
+        if is_job_store_path(filename):
+            write_store_jobs(filename, filtered_jobs)
+        else:
+            # Write filtered jobs to the specified JSON file
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(filtered_jobs, f, ensure_ascii=False, indent=4)
         
         print(f"Successfully wrote {len(filtered_jobs)} jobs to {filename}")
         
@@ -42,6 +176,277 @@ def write_valid_jobs_to_json(jobs_data, filename):
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(str(jobs_data))
 
+def extraction_error(records: List[Dict]) -> Optional[str]:
+    """The error LLMExtractionStrategy.extract reported in its records, if any"""
+    for record in records:
+        if isinstance(record, dict) and record.get('error'):
+            return str(record.get('content') or 'extraction failed')
+    return None
+
+async def _extract_chunked(
+    strategy: LLMExtractionStrategy,
+    url: str,
+    posts: List[str],
+    pending: List[int],
+    chunk_tokens: int,
+    workers: int,
+    on_result: Callable[[int, List[Dict]], None],
+    client: Optional[ProviderClient] = None
+) -> Tuple[Dict[int, List[Dict]], Set[int], Set[int]]:
+    """
+    Records per pending post, the posts that failed and the posts whose
+    records may be cached, one strategy call per chunk. Records of a chunk
+    with several posts are matched back to posts by word overlap and cached
+    per post; a post that was matched no record is not cached, so a miss
+    of the matching costs a new request rather than the post's jobs.
+    """
+    chunks = pack_posts([posts[i] for i in pending], max_tokens=chunk_tokens)
+    print(f"Extracting {len(pending)} posts in {len(chunks)} chunks with {workers} workers")
+
+    semaphore = asyncio.Semaphore(workers)
+    per_post: Dict[int, List[Dict]] = {i: [] for i in pending}
+    failed = set()
+    cacheable = set()
+
+    async def extract_chunk(ix: int, chunk: str, local_indices: List[int]):
+        async with semaphore:
+            # LLMExtractionStrategy.extract is blocking, keep it off the event loop
+            logger.count("llm_requests")
+            logger.count("llm_prompt_tokens_estimated", estimate_tokens(chunk))
+            try:
+                with logger.timer("extraction"):
+                    if client is not None:
+                        records = await client.call(strategy.extract, url, ix, chunk, failed=extraction_error)
+                    else:
+                        records = await asyncio.to_thread(strategy.extract, url, ix, chunk)
+            except Exception as e:
+                logger.count("llm_failures")
+                print(f"Chunk {ix} failed: {e}")
+                records = [{"index": ix, "error": True, "content": str(e)}]
+
+        # Map chunk output back onto the posts the chunk was built from
+        post_ids = [pending[j] for j in local_indices]
+        if any(record.get('error') for record in records):
+            failed.update(post_ids)
+        if len(post_ids) == 1:
+            attributed = {0: records}
+        else:
+            attributed = attribute_records([posts[i] for i in post_ids], records)
+        for j, post_records in attributed.items():
+            per_post[post_ids[j]].extend(post_records)
+            on_result(post_ids[j], post_records)
+            if post_records or len(post_ids) == 1:
+                cacheable.add(post_ids[j])
+
+    await asyncio.gather(*(extract_chunk(ix, text, indices) for ix, (text, indices) in enumerate(chunks)))
+    return per_post, failed, cacheable - failed
+
+async def _extract_batched(
+    batcher: BatchLLMExtractor,
+    posts: List[str],
+    pending: List[int],
+    workers: int,
+    on_result: Callable[[int, List[Dict]], None]
+) -> Tuple[Dict[int, List[Dict]], Set[int], Set[int]]:
+    """
+    Records per pending post, the posts that failed and the posts whose
+    records may be cached, several posts per request. Answers are keyed by
+    post, so every post that did not fail is cacheable.
+    """
+    if not pending:
+        return {}, set(), set()
+    print(f"Extracting {len(pending)} posts in batches of up to {batcher.config.max_batch_size} with {workers} workers")
+
+    before = batcher.stats()
+    logger.count("llm_prompt_tokens_estimated", sum(estimate_tokens(posts[i]) for i in pending))
+    with logger.timer("extraction"):
+        batched = await batcher.extract(
+            [posts[i] for i in pending], workers=workers, on_result=lambda j, records: on_result(pending[j], records)
+        )
+    after = batcher.stats()
+    logger.count("llm_requests", after['requests'] - before['requests'])
+    logger.count("llm_failures", after['failed_requests'] - before['failed_requests'])
+    logger.count("llm_batch_retried_posts", after['retried_posts'] - before['retried_posts'])
+    logger.count("llm_prompt_tokens", after['prompt_tokens'] - before['prompt_tokens'])
+    logger.count("llm_completion_tokens", after['completion_tokens'] - before['completion_tokens'])
+
+    per_post = {pending[j]: records for j, records in batched.items()}
+    failed = {i for i, records in per_post.items() if any(record.get('error') for record in records)}
+    return per_post, failed, set(per_post) - failed
+
+async def extract_posts_concurrently(
+    strategy: LLMExtractionStrategy,
+    url: str,
+    posts: List[str],
+    chunk_tokens: int = 1500,
+    workers: int = 4,
+    cache: Optional[ExtractionCache] = None,
+    rule_extraction: bool = False,
+    sink: Optional[JsonlJobSink] = None,
+    defaults: Optional[Dict] = None,
+    batcher: Optional[BatchLLMExtractor] = None,
+    client: Optional[ProviderClient] = None,
+    prune: bool = False,
+    validator: Optional[RecordValidator] = None
+) -> List[Dict]:
+    """
+    Extract records from every post, packing posts into token-budgeted chunks
+    that run at most `workers` requests to the provider at a time. With a
+    `batcher`, posts are batched by it instead, which answers per post and
+    retries only the posts that failed. With a `client`, chunk requests go
+    through its adaptive concurrency, retries and circuit breaker; `workers`
+    is then only the ceiling.
+
+    With `rule_extraction`, well-formed posts are parsed deterministically
+    and never reach the model. Posts already in `cache` are not sent to the
+    model again, and results of new posts are memoized per post once their
+    chunk succeeds. Valid records are appended to `sink` as soon as they
+    are available instead of after the whole page is done, with `defaults`
+    (e.g. the thread month) added to those that lack them.
+
+    With `prune`, posts are compressed with prompt_pruner.prune_post before
+    they are cached or sent, and the application links taken out of them
+    are added back to their records. With a `validator`, every post's
+    records are validated and normalised before they are written or
+    returned; invalid ones are dropped.
+    """
+    results: Dict[int, List[Dict]] = {}
+    # Application links pruning took out of each post
+    links: Dict[int, List[Tuple[str, str]]] = {}
+
+    def on_result(i: int, records: List[Dict]):
+        """Finish records of post i as they arrive: restore links, validate, write"""
+        if i in links:
+            records = restore_application_links(records, links[i])
+        if validator is not None:
+            records = validator.validate(records)
+        results.setdefault(i, []).extend(records)
+        if sink is not None:
+            sink.write_many(records, defaults)
+
+    candidates = range(len(posts))
+    if rule_extraction:
+        parsed, candidates = split_by_rules(posts, output='who_is_hiring')
+        print(f"{len(parsed)} of {len(posts)} posts parsed by rules")
+        logger.count("rule_parsed_posts", len(parsed))
+        for i, record in parsed.items():
+            on_result(i, [record])
+
+    # Prompt text per post
+    texts = posts
+    if prune and candidates:
+        texts, pruned_links = await asyncio.to_thread(_prune_posts, posts, candidates)
+        links.update(pruned_links)
+        before = sum(estimate_tokens(posts[i]) for i in candidates)
+        after = sum(estimate_tokens(texts[i]) for i in candidates)
+        saved = 1 - after / before if before else 0.0
+        print(f"Pruned posts from ~{before} to ~{after} prompt tokens ({saved:.0%} saved)")
+        logger.count("prompt_tokens_before_pruning", before)
+        logger.count("prompt_tokens_pruned", before - after)
+
+    keys: Dict[int, str] = {}
+    pending: List[int] = []
+    for i in candidates:
+        if cache is not None:
+            # Keyed and stored without the links, which are added back per post
+            keys[i] = strategy_cache_key(strategy, texts[i])
+            cached = cache.get(keys[i])
+            if cached is not None:
+                logger.count("extraction_cache_hits")
+                on_result(i, cached)
+                continue
+            logger.count("extraction_cache_misses")
+        pending.append(i)
+
+    if batcher is not None:
+        per_post, failed, cacheable = await _extract_batched(batcher, texts, pending, workers, on_result)
+    else:
+        per_post, failed, cacheable = await _extract_chunked(
+            strategy, url, texts, pending, chunk_tokens, workers, on_result, client
+        )
+    print(f"{len(candidates) - len(pending)} posts served from cache, {len(failed)} of {len(pending)} failed")
+
+    # Cached as the model answered, so changes to pruning or validation apply to hits too
+    if cache is not None:
+        for i in pending:
+            if i in cacheable:
+                cache.put(keys[i], per_post[i])
+
+    records = [record for i in range(len(posts)) for record in results.get(i, [])]
+    return dedupe_records(records)
+
+def _prune_posts(posts: List[str], indices) -> Tuple[List[str], Dict[int, List[Tuple[str, str]]]]:
+    texts = list(posts)
+    links = {}
+    for i in indices:
+        texts[i], links[i] = prune_post(posts[i])
+    return texts, links
+
+def record_llm_usage(strategy: LLMExtractionStrategy):
+    """Add the provider-reported token usage of a strategy to the metrics"""
+    usage = getattr(strategy, "total_usage", None)
+    if usage is not None:
+        logger.count("llm_prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0)
+        logger.count("llm_completion_tokens", getattr(usage, "completion_tokens", 0) or 0)
+
+def thread_defaults(url: str) -> Dict:
+    """Fields every job extracted from a page gets: the thread month, when the URL has one"""
+    thread_month = thread_month_from_url(url)
+    return {"thread_month": thread_month} if thread_month else {}
+
+async def split_page_into_posts(url: str, markdown: str, dedup_threshold: float = 0.8, prune: bool = False) -> List[str]:
+    """The posts of a crawled page, reposts collapsed and page chrome pruned with `prune`"""
+    if prune:
+        pruned = await asyncio.to_thread(prune_page, markdown, url)
+        before, after = estimate_tokens(markdown), estimate_tokens(pruned)
+        print(f"Pruned page chrome from ~{before} to ~{after} tokens")
+        # Page chrome never reaches a prompt, so it is counted apart from the posts' prompt tokens
+        logger.count("page_tokens_before_pruning", before)
+        logger.count("page_tokens_after_pruning", after)
+        markdown = pruned
+
+    # Splitting and MinHashing are CPU work, keep them off the event loop
+    posts = await asyncio.to_thread(split_posts, markdown)
+    print(f"Split page into {len(posts)} posts")
+
+    # Reposted ads are collapsed before they cost any extraction work
+    if dedup_threshold:
+        posts, reposts = await asyncio.to_thread(collapse_near_duplicates, posts, dedup_threshold)
+        print(f"Collapsed {sum(len(dupes) for dupes in reposts.values())} near-duplicate posts")
+    return posts
+
+async def extract_jobs_from_page(
+    strategy: LLMExtractionStrategy,
+    url: str,
+    markdown: str,
+    sink: Optional[JsonlJobSink] = None,
+    cache: Optional[ExtractionCache] = None,
+    chunk_tokens: int = 1500,
+    workers: int = 4,
+    dedup_threshold: float = 0.8,
+    rule_extraction: bool = False,
+    batcher: Optional[BatchLLMExtractor] = None,
+    client: Optional[ProviderClient] = None,
+    prune: bool = False,
+    validator: Optional[RecordValidator] = None
+) -> List[Dict]:
+    """
+    Split one crawled page into posts, collapse reposts and extract them into
+    `sink`. Returns the records. With `prune`, navigation and comment chrome
+    are dropped from the page and posts are compressed before extraction.
+    """
+    posts = await split_page_into_posts(url, markdown, dedup_threshold, prune)
+
+    # The thread month is part of each job's stable id. It is passed per call
+    # rather than set on the sink, so pages can be extracted concurrently
+    defaults = thread_defaults(url)
+    records = await extract_posts_concurrently(
+        strategy, url, posts, chunk_tokens=chunk_tokens, workers=workers, cache=cache,
+        rule_extraction=rule_extraction, sink=sink, defaults=defaults, batcher=batcher,
+        client=client, prune=prune, validator=validator
+    )
+    return [dict(defaults, **record) for record in records]
+
 async def extract_structured_data_using_llm(extract:str):
     print("Extracting structured data using LLM")
 
@@ -72,61 +477,128 @@ async def extract_structured_data_using_llm(extract:str):
             # Use job hiring schema
             schema = WhoIsHiring.model_json_schema()
             url = os.environ.get("TARGET_URL_JOBS")
-            instruction = """From the crawled content, extract job posting information including:
-            - company_name_and_location: Name of the company that is hiring along with the location
-            - job_description: Description of the job role and requirements
-            - technology_stack: Technology stack of the desired candidate the company is looking for
-            - application_details: How to apply for the job
-            Return the data in the exact JSON schema format specified."""
+            instruction = JOB_INSTRUCTION
         else:
             schema = WhoIsHiring.model_json_schema()
             url = os.environ.get("TARGET_URL_JOBS_LOCAL")
-            instruction = """From the crawled content, extract job posting information including:
-            - company_name_and_location: Name of the company that is hiring along with the location
-            - job_description: Description of the job role and requirements
-            - technology_stack: Technology stack of the desired candidate the company is looking for
-            - application_details: How to apply for the job
-            Return the data in the exact JSON schema format specified."""
-        
-        # Create LLM config with proper provider format
-        provider = config["provider"]
-        api_token = config.get("api_token")
-
-
-        llm_config =  LLMConfig(provider=provider,api_token=api_token)
-        print(f"Using LLM config: provider={llm_config.provider}, model={getattr(llm_config, 'model', 'default')}")
+            instruction = JOB_INSTRUCTION
         
         # Create extraction strategy
-        strategy = LLMExtractionStrategy(
-            llm_config=llm_config,
-            schema=schema,
-            extraction_type="schema",
-            extra_args=config.get("params", {}),
-            instruction=instruction,
-        )
+        strategy = create_extraction_strategy(config, schema, instruction)
+        client = create_provider_client(config)
+        batcher = create_batch_extractor(config, schema, instruction, client)
+        validator = create_record_validator(config, schema)
         
-        # Building the crawler configurations for the LLM extraction
+        cache_policy = config.get("cache_policy", "always_fresh")
+        if cache_policy not in CACHE_POLICIES:
+            raise ValueError(f"Unknown cache_policy {cache_policy!r}. Valid policies: {list(CACHE_POLICIES)}")
+        if cache_policy == "revalidate":
+            logger.warning(
+                "cache_policy 'revalidate' cannot revalidate crawl4ai's cache, every page is fetched fresh "
+                "and nothing is cached. Use the scraper's PageCache for ETag/Last-Modified checks."
+            )
+
+        # Building the crawler configurations. Extraction runs after the crawl,
+        # chunk by chunk, instead of as one request for the whole page
         crawler_config = CrawlerRunConfig(
-            cache_mode=CacheMode.BYPASS,
+            cache_mode=CACHE_POLICIES[cache_policy],
             word_count_threshold=30,
-            page_timeout=80000,
-            extraction_strategy=strategy
+            page_timeout=80000
+        )
+
+        chunking = config.get("chunking", {})
+        chunk_tokens = chunking.get("chunk_tokens", 1500)
+        workers = chunking.get("workers", 4)
+
+        cache_settings = config.get("extraction_cache", {})
+        cache = ExtractionCache(
+            path=cache_settings.get("path", ".extraction_cache.sqlite"),
+            max_entries=cache_settings.get("max_entries", 200000)
         )
 
-        async with AsyncWebCrawler() as crawler:
-            
-            if url is None:
-                raise ValueError("TARGET_URL_JOBS_LOCAL environment variable is not set.")
-            
-            print(f"Crawling URL: {url}")
-            
-            result = await crawler.arun(url=url, config=crawler_config)
-            write_valid_jobs_to_json(result.extracted_content,"jobs.json")
+        # Jobs are streamed to JSONL as they are extracted, then compacted to jobs.json
+        output = config.get("output", {})
+        jsonl_path = output.get("jsonl", "jobs.jsonl")
+        json_path = output.get("json", "jobs.json")
+        output_scope = output.get("scope", "run")
+        if output_scope not in OUTPUT_SCOPES:
+            raise ValueError(f"Unknown output scope {output_scope!r}. Valid scopes: {list(OUTPUT_SCOPES)}")
+        sink = JsonlJobSink(jsonl_path, fsync_every=output.get("fsync_every", 50))
+        already_written = len(sink)
+
+        # The deterministic parser only knows the job posting layout
+        rule_extraction = config.get("rule_extraction", True) and schema == WhoIsHiring.model_json_schema()
+
+        async def extract_page(page_url: str, markdown: str):
+            await extract_jobs_from_page(
+                strategy, page_url, markdown, sink, cache=cache, chunk_tokens=chunk_tokens, workers=workers,
+                dedup_threshold=config.get("dedup", {}).get("threshold", 0.8), rule_extraction=rule_extraction,
+                batcher=batcher, client=client, prune=config.get("pruning", {}).get("enabled", False),
+                validator=validator
+            )
+
+        failed_pages = []
+        try:
+            if "jobs archive" in extract:
+                # Each monthly thread is extracted as soon as the deep crawl fetches it
+                async for page in crawl_hnhiring_archive():
+                    if not page['success']:
+                        print(f"Crawl of {page['url']} failed: {page['error']}")
+                        continue
+                    print(f"Extracting thread {page['url']}")
+                    # One bad page must not end a crawl of the whole archive. Its
+                    # posts are not cached, so the next run retries them
+                    try:
+                        await extract_page(page['url'], str(page['content']))
+                    except Exception as e:
+                        failed_pages.append(page['url'])
+                        logger.count("extraction_failed_pages")
+                        logger.error(f"Extraction of {page['url']} failed: {e}")
+            else:
+                async with AsyncWebCrawler() as crawler:
+                    
+                    if url is None:
+                        raise ValueError("TARGET_URL_JOBS_LOCAL environment variable is not set.")
+                    
+                    print(f"Crawling URL: {url}")
+                    
+                    result = await crawler.arun(url=url, config=crawler_config)
+
+                if not result.success:
+                    raise RuntimeError(f"Crawl failed: {result.error_message}")
+
+                await extract_page(url, str(result.markdown))
+            print(cache)
+        finally:
+            cache.close()
+            sink.close()
+            record_llm_usage(strategy)
+            record_client_usage(client)
+            record_validator_usage(validator)
+            metrics_path = config.get("metrics", {}).get("path")
+            if metrics_path:
+                logger.export_metrics(metrics_path)
+
+        if failed_pages:
+            print(f"Extraction failed for {len(failed_pages)} pages, rerun to retry them: {failed_pages}")
+        print(f"Appended {len(sink) - already_written} new jobs to {jsonl_path}")
+        count = compact_jsonl_to_json(jsonl_path, json_path, ids=sink.run_ids if output_scope == "run" else None)
+        print(f"Successfully wrote {count} jobs to {json_path}")
+
+        store_path = output.get("store")
+        if store_path:
+            changed = write_store_jobs(store_path, read_latest_jsonl(jsonl_path))
+            print(f"Upserted {changed} new or changed jobs into {store_path}")
 
     except Exception as e:
         print(f"Unexpected error: {e}")
 
 if __name__ == "__main__":
+    # --archive deep crawls every monthly hnhiring.com thread instead of one URL
+    if "--archive" in sys.argv:
+        asyncio.run(extract_structured_data_using_llm("jobs archive"))
+        sys.exit(0)
+
     # Check environment variables
     url = os.environ.get("TARGET_URL_JOBS_LOCAL")
     if url is None:
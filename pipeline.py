@@ -0,0 +1,288 @@
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterable, Awaitable, Callable, Iterable, List, Optional, Tuple, Union
+
+import yaml
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(PROJECT_DIR, 'scraper'))
+sys.path.insert(0, os.path.join(PROJECT_DIR, 'preprocessing'))
+
+from newllmextraction import (
+    JOB_INSTRUCTION, create_batch_extractor, create_extraction_strategy, create_provider_client,
+    create_record_validator, extract_jobs_from_page, record_client_usage, record_llm_usage, record_validator_usage
+)
+from schema import WhoIsHiring
+from llm_extraction.extraction_cache import ExtractionCache
+from job_sink import OUTPUT_SCOPES, JsonlJobSink, compact_jsonl_to_json
+from hn_scraper import HackerNewsJobScraper, hnhiring_month_urls
+from deep_crawl import HNHIRING_HOST, DeepCrawler, is_thread_page
+from logger import ScraperLogger
+from preprocess_data import create_document, map_batch, validate_field_priority
+
+DEFAULT_PRIORITY = ['job_description', 'technology_stack', 'company_location']
+
+logger = ScraperLogger("pipeline")
+
+# Marks the end of a queue; each worker of the next stage gets one
+_DONE = object()
+
+
+class StageStats:
+    """Counters for one pipeline stage"""
+
+    def __init__(self, name: str, workers: int, queue_size: int):
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0  # time spent in the stage function
+        self.blocked_seconds = 0.0  # time spent waiting for room in the next queue
+        self.depth_total = 0
+        self.depth_max = 0
+        self.depth_samples = 0
+
+    def sample_depth(self, depth: int):
+        self.depth_total += depth
+        self.depth_max = max(self.depth_max, depth)
+        self.depth_samples += 1
+
+    def summary(self, elapsed: float) -> str:
+        capacity = max(elapsed * self.workers, 1e-9)
+        mean_depth = self.depth_total / self.depth_samples if self.depth_samples else 0.0
+        return (
+            f"{self.name:<12} workers={self.workers:<3} in={self.items_in:<6} out={self.items_out:<6} "
+            f"{self.items_out / max(elapsed, 1e-9):8.2f} items/s  busy {self.busy_seconds / capacity:4.0%}  "
+            f"blocked {self.blocked_seconds / capacity:4.0%}  "
+            f"queue avg {mean_depth:.1f} max {self.depth_max}/{self.queue_size}"
+        )
+
+
+class Pipeline:
+    """
+    Runs a source and a chain of stages concurrently.
+
+    Stages are connected by bounded asyncio queues, so a slow stage makes
+    the ones before it wait instead of piling up work in memory. Each stage
+    function takes one item and returns the list of items it hands to the
+    next stage (empty to drop the item). The last stage's outputs are what
+    run returns. Queue depth and per-stage throughput are reported every
+    `report_every` seconds and when the run ends.
+    """
+
+    def __init__(self, queue_size: int = 4, report_every: Optional[float] = 10.0, sample_every: float = 0.05):
+        self.queue_size = queue_size
+        self.report_every = report_every
+        self.sample_every = sample_every
+        self.stages: List[Tuple[Callable[[Any], Awaitable[List[Any]]], StageStats]] = []
+        self.source_stats = StageStats("source", 1, 0)
+        self._started = None
+
+    def add_stage(self, name: str, fn: Callable[[Any], Awaitable[List[Any]]], workers: int = 1) -> 'Pipeline':
+        self.stages.append((fn, StageStats(name, workers, self.queue_size)))
+        return self
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started if self._started else 0.0
+
+    def report(self) -> str:
+        elapsed = self.elapsed
+        lines = [f"Pipeline after {elapsed:.1f}s"]
+        lines.append(
+            f"{'source':<12} produced {self.source_stats.items_out} items "
+            f"({self.source_stats.items_out / max(elapsed, 1e-9):.2f} items/s, "
+            f"blocked {self.source_stats.blocked_seconds / max(elapsed, 1e-9):.0%})"
+        )
+        lines.extend(stats.summary(elapsed) for _, stats in self.stages)
+        return '\n'.join(lines)
+
+    async def _put(self, queue: asyncio.Queue, item: Any, stats: StageStats):
+        start = time.perf_counter()
+        await queue.put(item)
+        stats.blocked_seconds += time.perf_counter() - start
+
+    async def run(self, source: Union[Iterable[Any], AsyncIterable[Any]]) -> List[Any]:
+        if not self.stages:
+            raise ValueError("Pipeline has no stages")
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        running = [stats.workers for _, stats in self.stages]
+        results: List[Any] = []
+        self._started = time.perf_counter()
+
+        async def feed():
+            if hasattr(source, '__aiter__'):
+                async for item in source:
+                    self.source_stats.items_out += 1
+                    await self._put(queues[0], item, self.source_stats)
+            else:
+                for item in source:
+                    self.source_stats.items_out += 1
+                    await self._put(queues[0], item, self.source_stats)
+            for _ in range(self.stages[0][1].workers):
+                await queues[0].put(_DONE)
+
+        async def work(i: int):
+            fn, stats = self.stages[i]
+            inbox = queues[i]
+            outbox = queues[i + 1] if i + 1 < len(queues) else None
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    running[i] -= 1
+                    # The last worker out passes the end marker on
+                    if running[i] == 0 and outbox is not None:
+                        for _ in range(self.stages[i + 1][1].workers):
+                            await outbox.put(_DONE)
+                    return
+                stats.items_in += 1
+                start = time.perf_counter()
+                outputs = await fn(item)
+                stats.busy_seconds += time.perf_counter() - start
+                for output in outputs:
+                    stats.items_out += 1
+                    if outbox is None:
+                        results.append(output)
+                    else:
+                        await self._put(outbox, output, stats)
+
+        async def monitor():
+            next_report = self.report_every
+            while True:
+                await asyncio.sleep(self.sample_every)
+                for queue, (_, stats) in zip(queues, self.stages):
+                    stats.sample_depth(queue.qsize())
+                if self.report_every and self.elapsed >= next_report:
+                    print(self.report())
+                    next_report += self.report_every
+
+        tasks = [asyncio.create_task(feed())]
+        for i, (_, stats) in enumerate(self.stages):
+            tasks.extend(asyncio.create_task(work(i)) for _ in range(stats.workers))
+        monitor_task = asyncio.create_task(monitor())
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # A failing stage stops the whole pipeline
+            for task in tasks + [monitor_task]:
+                task.cancel()
+            await asyncio.gather(*tasks, monitor_task, return_exceptions=True)
+            print(self.report())
+        return results
+
+
+async def run_job_pipeline(
+    urls: Optional[List[str]] = None,
+    field_priority: List[str] = DEFAULT_PRIORITY,
+    config_path: str = "extract_llm.yml",
+    queue_size: int = 4,
+    extract_workers: int = 1,
+    preprocess_workers: Optional[int] = None,
+    report_every: Optional[float] = 10.0
+) -> List[Tuple[dict, str]]:
+    """
+    Scrape, extract and preprocess hiring threads as one overlapping run.
+
+    While page N+1 is being fetched, page N is being extracted and page N-1
+    cleaned into documents. Without `urls` the hnhiring.com archive is deep
+    crawled and every thread it finds goes through the pipeline. Jobs are
+    written to the JSONL sink and jobs.json as in newllmextraction
+    (jobs.json gets this run's jobs unless output.scope is "all");
+    returns the (job, document) pairs ready for indexing.
+    """
+    validate_field_priority(field_priority)
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+
+    schema = WhoIsHiring.model_json_schema()
+    strategy = create_extraction_strategy(config, schema, JOB_INSTRUCTION)
+    # One client for all extract workers, so they share one concurrency limit and breaker
+    client = create_provider_client(config)
+    batcher = create_batch_extractor(config, schema, JOB_INSTRUCTION, client)
+    validator = create_record_validator(config, schema)
+    chunking = config.get("chunking", {})
+    cache_settings = config.get("extraction_cache", {})
+    output = config.get("output", {})
+    jsonl_path = output.get("jsonl", "jobs.jsonl")
+    output_scope = output.get("scope", "run")
+    if output_scope not in OUTPUT_SCOPES:
+        raise ValueError(f"Unknown output scope {output_scope!r}. Valid scopes: {list(OUTPUT_SCOPES)}")
+
+    cache = ExtractionCache(
+        path=cache_settings.get("path", ".extraction_cache.sqlite"),
+        max_entries=cache_settings.get("max_entries", 200000)
+    )
+    sink = JsonlJobSink(jsonl_path, fsync_every=output.get("fsync_every", 50))
+    # Cleaning is CPU-bound and gets its own processes
+    process_pool = ProcessPoolExecutor(max_workers=preprocess_workers)
+    loop = asyncio.get_running_loop()
+
+    async def extract(page: dict) -> List[List[dict]]:
+        if not page['success']:
+            print(f"Skipping {page['url']}: {page.get('error')}")
+            return []
+        records = await extract_jobs_from_page(
+            strategy, page['url'], str(page['content']), sink, cache=cache,
+            chunk_tokens=chunking.get("chunk_tokens", 1500), workers=chunking.get("workers", 4),
+            dedup_threshold=config.get("dedup", {}).get("threshold", 0.8),
+            rule_extraction=config.get("rule_extraction", True), batcher=batcher, client=client,
+            prune=config.get("pruning", {}).get("enabled", False), validator=validator
+        )
+        return [records]
+
+    async def preprocess(records: List[dict]) -> List[Tuple[dict, str]]:
+        jobs = [record for record in records if not record.get('error', False)]
+        if not jobs:
+            return []
+        with logger.timer("preprocessing"):
+            documents = await loop.run_in_executor(
+                process_pool, map_batch, create_document, jobs, field_priority
+            )
+        logger.count("documents_created", sum(1 for document in documents if document))
+        return [(job, document) for job, document in zip(jobs, documents) if document]
+
+    pipeline = Pipeline(queue_size=queue_size, report_every=report_every)
+    try:
+        async with HackerNewsJobScraper() as scraper:
+            if urls:
+                async def scrape(url: str) -> List[dict]:
+                    return [await scraper.scrape_url(url)]
+
+                source = urls
+                pipeline.add_stage("scrape", scrape, workers=scraper.config.max_concurrency)
+            else:
+                crawler = DeepCrawler(scraper)
+                source = (
+                    page async for page in crawler.crawl([f"https://{HNHIRING_HOST}/"])
+                    if is_thread_page(page['url'])
+                )
+            pipeline.add_stage("extract", extract, workers=extract_workers)
+            pipeline.add_stage("preprocess", preprocess, workers=1)
+            pairs = await pipeline.run(source)
+    finally:
+        process_pool.shutdown()
+        cache.close()
+        sink.close()
+        record_llm_usage(strategy)
+        record_client_usage(client)
+        record_validator_usage(validator)
+        print(logger.metrics.summary())
+        metrics_path = config.get("metrics", {}).get("path")
+        if metrics_path:
+            logger.export_metrics(metrics_path)
+
+    count = compact_jsonl_to_json(
+        jsonl_path, output.get("json", "jobs.json"), ids=sink.run_ids if output_scope == "run" else None
+    )
+    print(f"Wrote {count} jobs to jobs.json, {len(pairs)} documents from this run")
+    return pairs
+
+
+if __name__ == "__main__":
+    # Default: the first three 2025 threads. --archive deep crawls every thread instead
+    month_urls = None if "--archive" in sys.argv else hnhiring_month_urls(2025, 1, 2025, 3)
+    asyncio.run(run_job_pipeline(month_urls))
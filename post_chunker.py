@@ -0,0 +1,150 @@
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+# Rough chars-per-token ratio for English text with LLaMA/GPT tokenizers.
+# Good enough for budgeting prompts without pulling in a tokenizer.
+CHARS_PER_TOKEN = 4
+
+# Lines that start a new post in crawled "Who is hiring" markdown:
+# horizontal rules (<hr>) and level 2/3 headings (one heading per company)
+POST_BOUNDARY_RE = re.compile(r'^(?:\s*(?:-{3,}|\*{3,}|_{3,})\s*|#{2,3}\s+\S.*)$')
+PARAGRAPH_RE = re.compile(r'\n\s*\n')
+WHITESPACE_RE = re.compile(r'\s+')
+WORD_RE = re.compile(r'\w{3,}')
+
+CHUNK_SEPARATOR = '\n\n---\n\n'
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_posts(markdown: str) -> List[str]:
+    """
+    Split crawled markdown into individual job posts.
+
+    Falls back to blank-line separated paragraphs when the page has no
+    rules or headings to split on.
+    """
+    posts = []
+    current: List[str] = []
+    for line in markdown.splitlines():
+        if POST_BOUNDARY_RE.match(line):
+            if current:
+                posts.append('\n'.join(current).strip())
+            # Keep headings (the company name), drop the rule itself
+            current = [] if line.strip()[0] in '-*_' else [line]
+        else:
+            current.append(line)
+    if current:
+        posts.append('\n'.join(current).strip())
+
+    posts = [post for post in posts if post]
+    if len(posts) <= 1:
+        posts = [p.strip() for p in PARAGRAPH_RE.split(markdown) if p.strip()]
+    return posts
+
+
+def _split_oversized(post: str, max_tokens: int) -> List[str]:
+    """Break a single post that exceeds the budget at paragraph, then character boundaries"""
+    pieces = []
+    current = ''
+    for paragraph in PARAGRAPH_RE.split(post):
+        candidate = f"{current}\n\n{paragraph}" if current else paragraph
+        if estimate_tokens(candidate) <= max_tokens:
+            current = candidate
+            continue
+        if current:
+            pieces.append(current)
+        # A single paragraph can still be too big
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        while estimate_tokens(paragraph) > max_tokens:
+            pieces.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        current = paragraph
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def pack_posts(posts: List[str], max_tokens: int = 1500) -> List[Tuple[str, List[int]]]:
+    """
+    Greedily pack consecutive posts into chunks of at most `max_tokens` each.
+
+    Returns (chunk_text, post_indices) pairs so results can be traced back
+    to the posts they came from. A post larger than the budget is split
+    over several chunks that all point at that one post.
+    """
+    chunks: List[Tuple[str, List[int]]] = []
+    current: List[int] = []
+    current_tokens = 0
+
+    def flush():
+        if current:
+            chunks.append((CHUNK_SEPARATOR.join(posts[i] for i in current), list(current)))
+            current.clear()
+
+    for i, post in enumerate(posts):
+        post_tokens = estimate_tokens(post)
+        if post_tokens > max_tokens:
+            flush()
+            current_tokens = 0
+            chunks.extend((piece, [i]) for piece in _split_oversized(post, max_tokens))
+            continue
+        if current and current_tokens + post_tokens > max_tokens:
+            flush()
+            current_tokens = 0
+        current.append(i)
+        current_tokens += post_tokens
+    flush()
+    return chunks
+
+
+def chunk_posts(posts: List[str], max_tokens: int = 1500) -> List[str]:
+    """Greedily pack consecutive posts into chunks of at most `max_tokens` each"""
+    return [text for text, _ in pack_posts(posts, max_tokens)]
+
+
+def attribute_records(posts: List[str], records: List[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Assign records extracted from a multi-post chunk back to the post they
+    most likely came from, by word overlap with the post text.
+    """
+    post_words = [set(WORD_RE.findall(post.lower())) for post in posts]
+    attributed: Dict[int, List[Dict[str, Any]]] = {i: [] for i in range(len(posts))}
+    for record in records:
+        words = set(WORD_RE.findall(' '.join(str(v) for v in record.values()).lower()))
+        scores = [len(words & candidate) for candidate in post_words]
+        attributed[scores.index(max(scores))].append(record)
+    return attributed
+
+
+def _normalise(value: Any) -> str:
+    return WHITESPACE_RE.sub(' ', str(value or '')).strip().lower()
+
+
+def record_key(record: Dict[str, Any]) -> str:
+    """Identity of an extracted record, used to drop duplicates from overlapping chunks"""
+    if 'company_name_and_location' in record:
+        return '|'.join([
+            _normalise(record.get('company_name_and_location')),
+            _normalise(record.get('job_description'))[:120]
+        ])
+    return json.dumps({k: _normalise(v) for k, v in record.items() if k != 'error'}, sort_keys=True)
+
+
+def dedupe_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop duplicate records, keeping the first occurrence and preferring error-free ones"""
+    seen: Dict[str, int] = {}
+    merged: List[Dict[str, Any]] = []
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        key = record_key(record)
+        if key not in seen:
+            seen[key] = len(merged)
+            merged.append(record)
+        elif merged[seen[key]].get('error') and not record.get('error'):
+            merged[seen[key]] = record
+    return merged
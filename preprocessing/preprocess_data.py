@@ -1,78 +1,285 @@
 import json
+import os
 import re
-from typing import List, Dict, Any
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
-def preprocess_job_data(file_path: str, field_priority: List[str]) -> List[str]:
+PREPROCESSING_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(PREPROCESSING_DIR, '..'))
+
+from job_store import is_job_store_path, iter_store_jobs
+
+VALID_FIELDS = {'job_description', 'technology_stack', 'company_location'}
+
+# Map field names to job dictionary keys
+FIELD_MAPPING = {
+    'job_description': 'job_description',
+    'technology_stack': 'technology_stack',
+    'company_location': 'company_name_and_location'
+}
+
+# Compiled once at import instead of on every re.sub call
+URL_RE = re.compile(r'https?://[^\s]+')
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+SPECIAL_CHARS_RE = re.compile(r'[^\w\s\-\.,/()]')
+
+# Size of the reads used when streaming a JSON array from disk
+READ_CHUNK_SIZE = 1 << 20
+
+# Jobs sent to a worker process at a time in parallel mode
+DEFAULT_BATCH_SIZE = 2000
+
+
+def validate_field_priority(field_priority: List[str]):
+    if not all(field in VALID_FIELDS for field in field_priority):
+        raise ValueError(f"Invalid field in priority list. Valid fields: {VALID_FIELDS}")
+
+
+def clean_text(text: str) -> str:
+    """
+    Strip URLs, emails, extra whitespace and special characters from a field.
+
+    Gives the same output as the original four re.sub passes, but skips the
+    URL and email passes when the text cannot contain either and collapses
+    whitespace with str.split instead of a regex.
+    """
+    if not text or text.strip() == "":
+        return ""
+
+    # Remove URLs (they add noise to embeddings)
+    if '://' in text:
+        text = URL_RE.sub('', text)
+
+    # Remove email addresses (also noise for job matching)
+    if '@' in text:
+        text = EMAIL_RE.sub('', text)
+
+    # Remove excessive whitespace and newlines
+    text = ' '.join(text.split())
+
+    # Remove special characters but keep alphanumeric and basic punctuation
+    text = SPECIAL_CHARS_RE.sub('', text)
+
+    # Strip leading/trailing whitespace
+    return text.strip()
+
+
+def create_document(job: Dict[str, Any], field_priority: List[str]) -> str:
+    """
+    Create a single text document from job fields using configurable ordering.
+    """
+    # Extract and clean fields based on priority order
+    cleaned_parts = []
+    for field in field_priority:
+        raw_text = job.get(FIELD_MAPPING[field], '') or ''
+        cleaned_text = clean_text(raw_text)
+        if cleaned_text:  # Only add non-empty fields
+            cleaned_parts.append(cleaned_text)
+
+    # Join all parts with spaces
+    return ' '.join(cleaned_parts)
+
+
+def create_documents(job: Dict[str, Any], field_priorities: List[List[str]]) -> List[str]:
+    """
+    Create one document per priority ordering, cleaning each field only once.
+
+    create_documents(job, [p])[0] == create_document(job, p) for any ordering p.
+    """
+    needed_fields = {field for priority in field_priorities for field in priority}
+    cleaned = {field: clean_text(job.get(FIELD_MAPPING[field], '') or '') for field in needed_fields}
+    return [' '.join(cleaned[field] for field in priority if cleaned[field]) for priority in field_priorities]
+
+
+def _iter_json_array(f) -> Iterator[Any]:
+    """Decode the elements of a JSON array one by one from a text file object"""
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_CHUNK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise json.JSONDecodeError("Expected a JSON array", buffer, 0)
+    pos = 1
+    eof = False
+
+    while True:
+        # Skip whitespace and separators between elements
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+
+        if pos < len(buffer):
+            if buffer[pos] == ']':
+                return
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Most likely the element continues in the next chunk
+                if eof:
+                    raise
+            else:
+                # A value ending exactly at the end of the buffer may be cut short
+                if end < len(buffer) or eof:
+                    yield value
+                    pos = end
+                    continue
+        elif eof:
+            raise json.JSONDecodeError("Unexpected end of JSON array", buffer, pos)
+
+        chunk = f.read(READ_CHUNK_SIZE)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def document_columns(*field_priorities: List[str]) -> List[str]:
+    """Job keys a document needs, so a job store only reads those columns"""
+    return list(dict.fromkeys(FIELD_MAPPING[field] for priority in field_priorities for field in priority))
+
+
+def iter_jobs(file_path: str, columns: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream job records from a JSON array file (like jobs.json), a JSONL
+    file or a job store (.sqlite) without loading the whole file into
+    memory. `columns` limits a job store read to those keys; JSON files
+    are always read whole.
+    """
+    if is_job_store_path(file_path):
+        yield from iter_store_jobs(file_path, columns)
+        return
+
+    try:
+        f = open(file_path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Could not find file: {file_path}")
+
+    with f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        try:
+            if first == '[':
+                yield from _iter_json_array(f)
+            else:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except json.JSONDecodeError:
+            raise ValueError(f"Invalid JSON format in file: {file_path}")
+
+
+def map_batch(document_fn: Callable, jobs: List[Dict[str, Any]], priority: Any) -> List[Any]:
+    """
+    Process pool entry point: document_fn(job, priority) for every job,
+    empty documents included. Top-level so pools can pickle it.
+    """
+    return [document_fn(job, priority) for job in jobs]
+
+
+def _parallel_documents(
+    jobs: Iterable[Dict[str, Any]],
+    field_priority: Any,
+    workers: Optional[int],
+    batch_size: int,
+    document_fn: Callable = create_document
+) -> Iterator[Any]:
+    """
+    Create documents in a process pool, batch by batch, yielding them in
+    input order. Only a few batches per worker are in flight at once, so a
+    streamed input stays streamed.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = iter(jobs)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        while True:
+            while len(in_flight) < workers * 2:
+                batch = list(islice(jobs, batch_size))
+                if not batch:
+                    break
+                in_flight.append(executor.submit(map_batch, document_fn, batch, field_priority))
+            if not in_flight:
+                return
+            yield from in_flight.popleft().result()
+
+
+def iter_job_documents(
+    file_path: str,
+    field_priority: List[str],
+    workers: Optional[int] = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[str]:
+    """
+    Lazily preprocess job data for vector embedding.
+
+    Streaming counterpart of preprocess_job_data: jobs are parsed and cleaned
+    one at a time, so memory stays bounded however large the corpus is.
+    Yields the same documents in the same order, skipping jobs with errors
+    and jobs that produce an empty document. With `workers` other than 1
+    the cleaning is spread over that many processes (None = all cores).
+    """
+    validate_field_priority(field_priority)
+    jobs = iter_jobs(file_path, document_columns(field_priority))
+    valid_jobs = (job for job in jobs if not job.get('error', False))
+    if workers == 1:
+        documents = (create_document(job, field_priority) for job in valid_jobs)
+    else:
+        documents = _parallel_documents(valid_jobs, field_priority, workers, batch_size)
+    for document in documents:
+        if document:
+            yield document
+
+
+def iter_jobs_with_documents(file_path: str, field_priority: List[str]) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """
+    Like iter_job_documents, but yields (job, document) pairs so the
+    document can be traced back to its jobs.json entry.
+    """
+    validate_field_priority(field_priority)
+    for job in iter_jobs(file_path):
+        if job.get('error', False):
+            continue
+        document = create_document(job, field_priority)
+        if document:
+            yield job, document
+
+
+def preprocess_job_data(
+    file_path: str,
+    field_priority: List[str],
+    workers: Optional[int] = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> List[str]:
     """
     Preprocesses job data from JSON file for vector embedding.
     
     Args:
-        file_path (str): Path to the JSON file containing job data
+        file_path (str): Path to the JSON file or job store (.sqlite) containing job data
         field_priority (List[str], optional): Order of fields by importance for embedding.
                                             Options: 'job_description', 'technology_stack', 'company_location'
                                             Default: ['job_description', 'technology_stack', 'company_location']
+        workers (int): Number of processes used to clean the text. 1 runs serially,
+                       None uses every core. Output is identical either way.
+        batch_size (int): Jobs handed to a worker process at a time
                                             
     Returns:
         List[str]: List of preprocessed text documents, one per job listing
     """
     
     # Validate field_priority
-    valid_fields = {'job_description', 'technology_stack', 'company_location'}
-    if not all(field in valid_fields for field in field_priority):
-        raise ValueError(f"Invalid field in priority list. Valid fields: {valid_fields}")
+    validate_field_priority(field_priority)
     
     print(f"Using field priority order: {field_priority}")
     print("(Earlier fields get higher weight in embedding)")
     
-    
-    def clean_text(text: str) -> str:
-        if not text or text.strip() == "":
-            return ""
-        
-        # Remove URLs (they add noise to embeddings)
-        text = re.sub(r'https?://[^\s]+', '', text)
-        
-        # Remove email addresses (also noise for job matching)
-        text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '', text)
-        
-        # Remove excessive whitespace and newlines
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove special characters but keep alphanumeric and basic punctuation
-        text = re.sub(r'[^\w\s\-\.,/()]', '', text)
-        
-        # Strip leading/trailing whitespace
-        text = text.strip()
-        
-        return text
-    
-    def create_document(job: Dict[str, Any]) -> str:
-        """
-        Create a single text document from job fields using configurable ordering.
-        """
-        # Map field names to job dictionary keys
-        field_mapping = {
-            'job_description': 'job_description',
-            'technology_stack': 'technology_stack', 
-            'company_location': 'company_name_and_location'
-        }
-        
-        # Extract and clean fields based on priority order
-        cleaned_parts = []
-        for field in field_priority:
-            raw_text = job.get(field_mapping[field], '') or ''
-            cleaned_text = clean_text(raw_text)
-            if cleaned_text:  # Only add non-empty fields
-                cleaned_parts.append(cleaned_text)
-        
-        # Join all parts with spaces
-        document = ' '.join(cleaned_parts)
-        return document
-    
-    # Load JSON data
+    # Load JSON data, or just the needed columns of a job store
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            jobs_data = json.load(f)
+        if is_job_store_path(file_path):
+            jobs_data = list(iter_store_jobs(file_path, document_columns(field_priority)))
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                jobs_data = json.load(f)
     except FileNotFoundError:
         raise FileNotFoundError(f"Could not find file: {file_path}")
     except json.JSONDecodeError:
@@ -82,9 +289,13 @@ def preprocess_job_data(file_path: str, field_priority: List[str]) -> List[str]:
     valid_jobs = [job for job in jobs_data if not job.get('error', False)]
     
     # Process each job into a document
+    if workers == 1:
+        all_documents = (create_document(job, field_priority) for job in valid_jobs)
+    else:
+        all_documents = _parallel_documents(valid_jobs, field_priority, workers, batch_size)
+
     documents = []
-    for i, job in enumerate(valid_jobs):
-        document = create_document(job)
+    for i, document in enumerate(all_documents):
         
         # Skip empty documents
         if document:
@@ -95,6 +306,53 @@ def preprocess_job_data(file_path: str, field_priority: List[str]) -> List[str]:
     print(f"Preprocessed {len(documents)} job listings from {len(jobs_data)} total entries")
     return documents
 
+def preprocess_job_data_multi(
+    file_path: str,
+    field_priorities: Dict[str, List[str]],
+    workers: Optional[int] = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Dict[str, List[str]]:
+    """
+    Preprocesses job data for several field orderings in a single pass.
+
+    The file is parsed once and every field of a job is cleaned once, then
+    shared between all orderings. Each returned list is the same as
+    preprocess_job_data(file_path, priority) would return.
+
+    Args:
+        file_path (str): Path to the JSON, JSONL or job store file containing job data
+        field_priorities (Dict[str, List[str]]): Name -> field priority order,
+                                               e.g. {'location_first': ['company_location', ...]}
+        workers (int): Number of processes used to clean the text, as in preprocess_job_data
+        batch_size (int): Jobs handed to a worker process at a time
+
+    Returns:
+        Dict[str, List[str]]: Preprocessed documents per ordering name
+    """
+    for field_priority in field_priorities.values():
+        validate_field_priority(field_priority)
+
+    names = list(field_priorities)
+    priorities = [field_priorities[name] for name in names]
+    documents: Dict[str, List[str]] = {name: [] for name in names}
+
+    jobs = iter_jobs(file_path, document_columns(*priorities))
+    valid_jobs = (job for job in jobs if not job.get('error', False))
+    if workers == 1:
+        all_documents = (create_documents(job, priorities) for job in valid_jobs)
+    else:
+        all_documents = _parallel_documents(valid_jobs, priorities, workers, batch_size, document_fn=create_documents)
+
+    for job_documents in all_documents:
+        for name, document in zip(names, job_documents):
+            if document:
+                documents[name].append(document)
+
+    print(f"Preprocessed {len(names)} orderings in one pass: "
+          + ', '.join(f"{name}={len(docs)}" for name, docs in documents.items()))
+    return documents
+
+
 # Example usage with different priorities
 if __name__ == "__main__":
     # Default priority (job content first)
@@ -115,4 +373,13 @@ if __name__ == "__main__":
     print(f"Sample: {docs_tech_first[0]}.")
     
     # Compare how the same job looks with different priorities
-    print(f"\nProcessed {len(docs_default)} documents with each priority configuration")
\ No newline at end of file
+    print(f"\nProcessed {len(docs_default)} documents with each priority configuration")
+
+    # All three orderings from a single parse of the file
+    print("\n=== ALL PRIORITIES IN ONE PASS ===")
+    docs_by_priority = preprocess_job_data_multi('../jobs.json', {
+        'default': ['job_description', 'technology_stack', 'company_location'],
+        'location_first': ['company_location', 'job_description', 'technology_stack'],
+        'tech_first': ['technology_stack', 'job_description', 'company_location']
+    })
+    print(f"Matches separate runs: {docs_by_priority['tech_first'] == docs_tech_first}")
\ No newline at end of file
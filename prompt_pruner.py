@@ -0,0 +1,200 @@
+import os
+import re
+import sys
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preprocessing'))
+
+from post_chunker import POST_BOUNDARY_RE
+from preprocess_data import EMAIL_RE, URL_RE
+
+# Pruning of crawled markdown before it is sent to the LLM. Prompt size is
+# what bounds local model throughput, so everything the model does not need
+# to fill the schema is dropped: site navigation, HN comment chrome, images,
+# link targets, emails, emphasis markers and runs of whitespace. URLs and
+# emails are the same ones preprocess_data.clean_text strips, but the ones
+# that look like ways to apply are kept aside and added back to the records
+# of their post afterwards, so application details survive.
+
+# Markdown links and images: [label](target "title"), target optionally in <>
+MARKDOWN_LINK_RE = re.compile(
+    r'(!?)\[((?:[^\[\]\n]|\[[^\]\n]*\])*)\]\(\s*<?((?:[^()\s>]|\([^()\s]*\))*)>?(?:\s+"[^"\n]*")?\s*\)'
+)
+# Links into HN itself (bylines, permalinks, reply/vote/flag actions)
+CHROME_LINK_RE = re.compile(
+    r'news\.ycombinator\.com/(?:user|item|reply|vote|hide|flag|fave|context|login|submit|threads|newest|news|ask|show|jobs)\b'
+    r'|[?&]goto=|^javascript:', re.I
+)
+# Words and phrases that make up comment chrome and navigation when nothing else is on the line
+CHROME_TEXT_RE = re.compile(
+    r'\b(?:reply|flag|hide|favorite|parent|prev|next|context|root|past|web|on|edit|delete|vouch|login|submit|'
+    r'comments?|threads|more|\d+ (?:points?|comments?)|posted:?|'
+    r'(?:about |an? )?(?:\d+ )?(?:second|minute|hour|day|week|month|year)s? ago)(?=\W|$)|\[[-–+]\]', re.I
+)
+WORD_RE = re.compile(r'\w')
+EMPHASIS_RE = re.compile(r'\*\*|__')
+# What is left of <url>, [url] and (email) once the URL or email is gone
+EMPTY_BRACKETS_RE = re.compile(r'<\s*>|\[\s*\]|\(\s*\)')
+# Links and emails on a line that mentions one of these are kept as application links
+APPLY_RE = re.compile(
+    r'\bapply|\bapplication form|\bcareers?\b|\bjobs?\b|hiring|recruit|\bjoin\b|contact|reach out|e-?mail|resume|\bcv\b|'
+    r'greenhouse|lever\.co|ashbyhq|workable|breezy|bamboohr|smartrecruiters|workday|jobvite|wellfound|'
+    r'forms\.gle|typeform|calendly', re.I
+)
+CONTEXT_WORD_RE = re.compile(r'[a-z0-9+#]{3,}')
+TRAILING_PUNCTUATION = '.,;:!?)]}>\'"'
+
+# Fields application links are added back into, per schema
+APPLICATION_FIELDS = ('application_details', 'contact_info')
+
+# A link-only line with at least this many links, mostly into the crawled site, is navigation
+NAV_MIN_LINKS = 3
+# A line with links (but no way to apply) found on at least this many posts of a page is boilerplate
+REPEAT_MIN = 3
+
+
+def _is_chrome(line: str) -> bool:
+    """Whether a line holds nothing but HN comment chrome (bylines, ages, reply/flag links)"""
+    text = MARKDOWN_LINK_RE.sub(lambda m: '' if CHROME_LINK_RE.search(m.group(3)) else m.group(2), line)
+    if text == line and not CHROME_TEXT_RE.search(line):
+        return False
+    return not WORD_RE.search(CHROME_TEXT_RE.sub('', text))
+
+
+def _site(url: str) -> str:
+    """Last two labels of a URL's host, so news.ycombinator.com and www.ycombinator.com match"""
+    return '.'.join(urlparse(url).netloc.lower().split('.')[-2:])
+
+
+def _is_navigation(line: str, site: str) -> bool:
+    """Whether a line is only links, mostly back into the crawled site, like a menu or footer"""
+    links = MARKDOWN_LINK_RE.findall(line)
+    if len(links) < NAV_MIN_LINKS or WORD_RE.search(MARKDOWN_LINK_RE.sub('', line)):
+        return False
+    internal = sum(1 for _, _, target in links if target.startswith(('/', '#')) or _site(target) == site)
+    return internal * 2 > len(links)
+
+
+def prune_page(markdown: str, url: str = '') -> str:
+    """
+    Drop the lines of a crawled page that are not part of any post: site
+    navigation, comment chrome and linked boilerplate repeated across posts.
+    Post boundaries are kept as they are, so split_posts works on the result.
+    """
+    site = _site(url)
+    lines = markdown.splitlines()
+    # Posts each linked line appears in
+    repeated: Counter = Counter()
+    post_lines = set()
+    for line in lines:
+        if POST_BOUNDARY_RE.match(line):
+            repeated.update(post_lines)
+            post_lines = set()
+        elif '](' in line and not APPLY_RE.search(line):
+            post_lines.add(line.strip())
+    repeated.update(post_lines)
+    kept = []
+    for line in lines:
+        stripped = line.strip()
+        if POST_BOUNDARY_RE.match(line) or not stripped:
+            kept.append(line)
+            continue
+        if stripped.startswith('![') and not MARKDOWN_LINK_RE.sub('', stripped).strip():
+            continue
+        if '](' in stripped and (repeated[stripped] >= REPEAT_MIN or _is_navigation(stripped, site)):
+            continue
+        if _is_chrome(stripped):
+            continue
+        kept.append(line)
+    return '\n'.join(kept)
+
+
+def prune_post(post: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Compress one post for the prompt.
+
+    Returns the pruned text and the application links taken out of it, as
+    (link, text of the line it was on) pairs. Link labels stay in the text,
+    link targets, bare URLs and emails do not.
+    """
+    links: List[Tuple[str, str]] = []
+    lines: List[str] = []
+    for line in post.splitlines():
+        if _is_chrome(line):
+            continue
+        found: List[str] = []
+
+        def replace_link(match) -> str:
+            image, label, target = match.groups()
+            if image:
+                return ''
+            if target and not target.startswith('#'):
+                found.append(target)
+            label = label.strip()
+            return '' if URL_RE.fullmatch(label) or EMAIL_RE.fullmatch(label) else label
+
+        def replace_url(match) -> str:
+            url = match.group(0).rstrip(TRAILING_PUNCTUATION)
+            found.append(url)
+            return match.group(0)[len(url):]
+
+        def replace_email(match) -> str:
+            found.append(match.group(0))
+            return ''
+
+        text = MARKDOWN_LINK_RE.sub(replace_link, line) if '](' in line else line
+        if '://' in text:
+            text = URL_RE.sub(replace_url, text)
+        if '@' in text:
+            text = EMAIL_RE.sub(replace_email, text)
+        if found:
+            text = EMPTY_BRACKETS_RE.sub('', text)
+        text = ' '.join(EMPHASIS_RE.sub('', text).split())
+
+        for link in found:
+            link = link[len('mailto:'):] if link.lower().startswith('mailto:') else link
+            if ('@' in link and '://' not in link) or APPLY_RE.search(line):
+                if all(link != kept for kept, _ in links):
+                    links.append((link, text))
+
+        if WORD_RE.search(text):
+            lines.append(text)
+        elif lines and lines[-1] and not text:
+            # Keep paragraph breaks, pack_posts splits oversized posts on them
+            lines.append('')
+    return '\n'.join(lines).strip(), links
+
+
+def _context_words(text: str) -> set:
+    return set(CONTEXT_WORD_RE.findall(text.lower()))
+
+
+def restore_application_links(records: List[Dict[str, Any]], links: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Add the application links prune_post took out of a post to its records.
+
+    A post with one role per line ("Backend engineer ... [Apply](...)") has
+    one link per role, so each record gets the links whose line shares the
+    most words with it, or all of them when none does. Links a record
+    already mentions are not added twice.
+    """
+    if not links:
+        return records
+    restored = []
+    for record in records:
+        if not isinstance(record, dict) or record.get('error'):
+            restored.append(record)
+            continue
+        field = next((name for name in APPLICATION_FIELDS if name in record), APPLICATION_FIELDS[0])
+        details = str(record.get(field) or '')
+        words = _context_words(' '.join(str(value) for key, value in record.items() if key != field))
+        scores = [len(words & _context_words(context)) for _, context in links]
+        best = max(scores)
+        chosen = [link for (link, _), score in zip(links, scores) if score == best]
+        missing = [link for link in chosen if link not in details]
+        if missing:
+            record = dict(record, **{field: ' '.join([details] + missing).strip()})
+        restored.append(record)
+    return restored
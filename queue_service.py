@@ -0,0 +1,271 @@
+import hmac
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fast_json import dumps, loads
+from job_store import write_store_jobs
+from llm_extraction.extraction_cache import ExtractionCache
+from work_queue import Task, WorkQueue
+
+# The coordinator's work queue, job store and extraction cache served over
+# HTTP, for workers on other hosts. The SQLite files stay on the
+# coordinator's disk (WAL mode needs every process on the host that has
+# them); remote workers only speak JSON to this service:
+#
+#   POST /<call>  {"params": {...}}  ->  {"result": ...}
+#
+# with the calls in QueueService.CALLS. When a token is set, every request
+# must carry it in the X-Queue-Token header.
+
+TOKEN_HEADER = 'X-Queue-Token'
+
+
+def _task_dict(task: Optional[Task]) -> Optional[Dict[str, Any]]:
+    if task is None:
+        return None
+    return {'id': task.id, 'kind': task.kind, 'payload': task.payload, 'token': task.token, 'attempts': task.attempts}
+
+
+def _task(data: Dict[str, Any]) -> Task:
+    return Task(data['id'], data['kind'], data['payload'], data['token'], data['attempts'])
+
+
+class QueueService:
+    """
+    HTTP front of a WorkQueue, a job store file and an ExtractionCache,
+    run by the coordinator in a background thread.
+
+    Requests are served concurrently; the queue and cache serialise their
+    own access and job store writes go through one lock, so the SQLite
+    files only ever see this process.
+    """
+
+    CALLS = (
+        'settings', 'lease', 'heartbeat', 'complete', 'fail', 'release', 'unfinished',
+        'write_jobs', 'cache_get', 'cache_put'
+    )
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        store_path: str,
+        cache: ExtractionCache,
+        host: str = '0.0.0.0',
+        port: int = 8765,
+        token: Optional[str] = None
+    ):
+        self.queue = queue
+        self.store_path = store_path
+        self.cache = cache
+        self.host = host
+        self.port = port
+        self.token = token
+        self._store_lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host = '127.0.0.1' if self.host in ('', '0.0.0.0') else self.host
+        return f"http://{host}:{self.port}"
+
+    def start(self):
+        service = self
+
+        class Handler(_ServiceHandler):
+            owner = service
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        # Port 0 picks a free one
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def handle(self, call: str, params: Dict[str, Any]) -> Any:
+        if call == 'settings':
+            return {'lease_seconds': self.queue.lease_seconds}
+        if call == 'lease':
+            return _task_dict(self.queue.lease(params['owner'], params.get('kinds')))
+        if call == 'heartbeat':
+            return self.queue.heartbeat(_task(params['task']))
+        if call == 'complete':
+            children = [tuple(child) for child in params.get('children', [])]
+            return self.queue.complete(_task(params['task']), children, params.get('child_priority', 0))
+        if call == 'fail':
+            return self.queue.fail(_task(params['task']), params['error'], params.get('retry_delay', 0.0))
+        if call == 'release':
+            return self.queue.release(_task(params['task']), params.get('delay', 0.0))
+        if call == 'unfinished':
+            return self.queue.unfinished()
+        if call == 'write_jobs':
+            with self._store_lock:
+                return write_store_jobs(self.store_path, params['jobs'])
+        if call == 'cache_get':
+            return self.cache.get(params['key'])
+        if call == 'cache_put':
+            self.cache.put(params['key'], params['records'])
+            return None
+        raise KeyError(call)
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    owner: QueueService
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        service = self.owner
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if service.token and not hmac.compare_digest(self.headers.get(TOKEN_HEADER, ''), service.token):
+            self._send(403, {'error': 'bad or missing queue token'})
+            return
+        call = self.path.strip('/')
+        if call not in QueueService.CALLS:
+            self._send(404, {'error': f"unknown call {call!r}"})
+            return
+        try:
+            params = loads(body or b'{}').get('params') or {}
+            result = service.handle(call, params)
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {'error': f"{type(e).__name__}: {e}"})
+            return
+        except Exception as e:
+            self._send(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+        self._send(200, {'result': result})
+
+    def _send(self, status: int, payload: Dict):
+        body = dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class QueueServiceError(RuntimeError):
+    """The queue service refused a call"""
+
+
+class QueueClient:
+    """
+    A worker's connection to a QueueService, with the WorkQueue methods
+    DistributedWorker uses plus write_jobs().
+
+    Calls block, like WorkQueue's. Connection errors and 5xx answers are
+    retried `retries` times with exponential backoff, so a coordinator
+    restart or a network blip does not kill the worker.
+    """
+
+    def __init__(self, url: str, token: Optional[str] = None, timeout: float = 60.0, retries: int = 5):
+        self.url = url.rstrip('/')
+        self.token = token
+        self.timeout = timeout
+        self.retries = retries
+        self.lease_seconds = self.call('settings')['lease_seconds']
+
+    def call(self, name: str, **params) -> Any:
+        """
+        Make one service call and return its result. Retrying is safe: a
+        repeated complete() finds its lease gone, jobs are upserted by id.
+        """
+        body = dumps({'params': params}).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers[TOKEN_HEADER] = self.token
+        attempt = 0
+        while True:
+            request = urllib.request.Request(f"{self.url}/{name}", data=body, headers=headers, method='POST')
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return loads(response.read())['result']
+            except urllib.error.HTTPError as e:
+                error = loads(e.read() or b'{}').get('error', e.reason)
+                if e.code < 500 or attempt >= self.retries:
+                    raise QueueServiceError(f"{name}: {e.code} {error}") from None
+            except (urllib.error.URLError, OSError):
+                if attempt >= self.retries:
+                    raise
+            time.sleep(min(30.0, 0.5 * 2 ** attempt))
+            attempt += 1
+
+    def close(self):
+        pass
+
+    def lease(self, owner: str, kinds: Optional[Sequence[str]] = None) -> Optional[Task]:
+        data = self.call('lease', owner=owner, kinds=list(kinds) if kinds else None)
+        return _task(data) if data is not None else None
+
+    def heartbeat(self, task: Task) -> bool:
+        return self.call('heartbeat', task=_task_dict(task))
+
+    def complete(self, task: Task, children: Iterable[Tuple[str, str, Any]] = (), child_priority: int = 0) -> bool:
+        return self.call(
+            'complete', task=_task_dict(task), children=[list(child) for child in children], child_priority=child_priority
+        )
+
+    def fail(self, task: Task, error: str, retry_delay: float = 0.0) -> Optional[str]:
+        return self.call('fail', task=_task_dict(task), error=error, retry_delay=retry_delay)
+
+    def release(self, task: Task, delay: float = 0.0) -> bool:
+        return self.call('release', task=_task_dict(task), delay=delay)
+
+    def unfinished(self) -> int:
+        return self.call('unfinished')
+
+    def write_jobs(self, jobs: List[Dict[str, Any]]) -> int:
+        """Upsert jobs into the coordinator's job store. Returns how many were inserted or changed"""
+        return self.call('write_jobs', jobs=jobs)
+
+
+class RemoteExtractionCache:
+    """ExtractionCache stand-in that reads and writes the coordinator's cache through a QueueClient"""
+
+    make_key = staticmethod(ExtractionCache.make_key)
+
+    def __init__(self, client: QueueClient):
+        self.client = client
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        records = self.client.call('cache_get', key=key)
+        if records is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return records
+
+    def put(self, key: str, records: List[Dict[str, Any]]):
+        self.client.call('cache_put', key=key, records=records)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0}
+
+    def close(self):
+        pass
+
+    def __str__(self):
+        stats = self.stats()
+        return f"RemoteExtractionCache(hits={stats['hits']}, misses={stats['misses']}, hit_rate={stats['hit_rate']:.1%})"
@@ -0,0 +1,174 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from crawl4ai import AsyncWebCrawler, BrowserConfig
+
+
+def _playwright_browser(crawler: AsyncWebCrawler) -> Optional[Any]:
+    """The playwright Browser behind a crawl4ai crawler, None if it has none (yet)"""
+    manager = getattr(getattr(crawler, 'crawler_strategy', None), 'browser_manager', None)
+    return getattr(manager, 'browser', None)
+
+
+class PooledCrawler:
+    """A warm crawler together with the bookkeeping the pool needs"""
+
+    def __init__(self, crawler: AsyncWebCrawler):
+        self.crawler = crawler
+        self.pages_served = 0
+        self.healthy = True
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class BrowserPool:
+    """
+    Size-bounded pool of long-lived AsyncWebCrawler instances.
+
+    Browsers are launched lazily, handed out one caller at a time and
+    recycled after `max_pages_per_browser` pages, after `max_idle_seconds`
+    without use, as soon as a crawl on them raises or is reported failed
+    with mark_unhealthy(), or when they fail a liveness probe. A browser
+    idle for more than `probe_after_idle` seconds has to open and close a
+    browser context within `probe_timeout` before it is handed out again;
+    one that lost its connection is never handed out.
+    """
+
+    def __init__(
+        self,
+        browser_config: Optional[BrowserConfig] = None,
+        size: int = 2,
+        max_pages_per_browser: int = 50,
+        max_idle_seconds: float = 300.0,
+        probe_after_idle: float = 30.0,
+        probe_timeout: float = 5.0
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        self.browser_config = browser_config
+        self.size = size
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_idle_seconds = max_idle_seconds
+        self.probe_after_idle = probe_after_idle
+        self.probe_timeout = probe_timeout
+
+        self._idle: List[PooledCrawler] = []
+        # id(crawler) -> entry, for the crawlers handed out right now
+        self._leased: Dict[int, PooledCrawler] = {}
+        self._slots = asyncio.Semaphore(size)
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+        # Simple counters, handy when benchmarking the pool
+        self.browsers_launched = 0
+        self.browsers_recycled = 0
+        self.probes_failed = 0
+
+    async def __aenter__(self):
+        self._closed = False
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _launch(self) -> PooledCrawler:
+        """Start a new browser"""
+        if self.browser_config is not None:
+            crawler = AsyncWebCrawler(config=self.browser_config)
+        else:
+            crawler = AsyncWebCrawler(headless=True)
+        await crawler.__aenter__()
+        self.browsers_launched += 1
+        return PooledCrawler(crawler)
+
+    async def _retire(self, entry: PooledCrawler):
+        """Close a browser, ignoring errors from an already dead process"""
+        self.browsers_recycled += 1
+        try:
+            await entry.crawler.__aexit__(None, None, None)
+        except Exception:
+            pass
+
+    def _is_usable(self, entry: PooledCrawler) -> bool:
+        """Health check run before a browser is handed out"""
+        if not entry.healthy:
+            return False
+        if entry.pages_served >= self.max_pages_per_browser:
+            return False
+        if time.monotonic() - entry.last_used > self.max_idle_seconds:
+            return False
+        return True
+
+    async def _is_alive(self, entry: PooledCrawler) -> bool:
+        """Liveness probe: the browser is connected and, after a long idle spell, answers"""
+        browser = _playwright_browser(entry.crawler)
+        if browser is None:
+            # Nothing to probe through (not a playwright strategy); failed crawls still retire it
+            return True
+        if not browser.is_connected():
+            return False
+        if time.monotonic() - entry.last_used < self.probe_after_idle:
+            return True
+        try:
+            context = await asyncio.wait_for(browser.new_context(), self.probe_timeout)
+            await asyncio.wait_for(context.close(), self.probe_timeout)
+        except Exception:
+            return False
+        return True
+
+    async def _checkout(self) -> PooledCrawler:
+        while True:
+            async with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                return await self._launch()
+            if self._is_usable(entry):
+                if await self._is_alive(entry):
+                    return entry
+                self.probes_failed += 1
+            await self._retire(entry)
+
+    async def _checkin(self, entry: PooledCrawler):
+        entry.last_used = time.monotonic()
+        if self._closed or not self._is_usable(entry):
+            await self._retire(entry)
+            return
+        async with self._lock:
+            self._idle.append(entry)
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow a warm crawler for the duration of the `async with` block"""
+        if self._closed:
+            raise RuntimeError("BrowserPool is closed")
+
+        async with self._slots:
+            entry = await self._checkout()
+            self._leased[id(entry.crawler)] = entry
+            try:
+                yield entry.crawler
+            except BaseException:
+                # The page or browser may be in a bad state, do not reuse it
+                entry.healthy = False
+                raise
+            finally:
+                del self._leased[id(entry.crawler)]
+                entry.pages_served += 1
+                await self._checkin(entry)
+
+    def mark_unhealthy(self, crawler: AsyncWebCrawler):
+        """Retire a borrowed crawler when it is returned, e.g. after a crawl on it failed"""
+        entry = self._leased.get(id(crawler))
+        if entry is not None:
+            entry.healthy = False
+
+    async def close(self):
+        """Close every idle browser; busy ones are closed when returned"""
+        self._closed = True
+        async with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            await self._retire(entry)
@@ -0,0 +1,282 @@
+import asyncio
+import base64
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit, urlunsplit
+
+from hn_scraper import HNHIRING_MONTH_RE, MONTHS, HackerNewsJobScraper
+
+# Markdown links and bare URLs in scraped content
+MARKDOWN_LINK_RE = re.compile(r'\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)')
+BARE_URL_RE = re.compile(r'https?://[^\s)\]>"\']+')
+
+HNHIRING_HOST = "hnhiring.com"
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set of strings. `in` may report a false
+    positive at about `error_rate` once `capacity` items are added, never a
+    false negative. Memory is ~1.2 bytes per item at 1% error.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01, bits: Optional[bytes] = None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def to_dict(self) -> Dict:
+        return {
+            'capacity': self.capacity,
+            'error_rate': self.error_rate,
+            'bits': base64.b64encode(bytes(self.bits)).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'BloomFilter':
+        return cls(state['capacity'], state['error_rate'], base64.b64decode(state['bits']))
+
+
+def normalise_url(url: str) -> str:
+    """Drop the fragment, lowercase scheme and host, strip a trailing slash"""
+    url, _ = urldefrag(url.strip())
+    parts = urlsplit(url)
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+
+def discover_links(content: str, base_url: str) -> List[str]:
+    """Absolute http(s) links found in a scraped page's markdown, in order of appearance"""
+    links = MARKDOWN_LINK_RE.findall(content) + BARE_URL_RE.findall(content)
+    absolute = (normalise_url(urljoin(base_url, link)) for link in links)
+    return list(dict.fromkeys(link for link in absolute if link.startswith(('http://', 'https://'))))
+
+
+def thread_sort_key(url: str) -> Optional[int]:
+    """Month number (year * 12 + month) of a monthly thread URL, None for other pages"""
+    match = HNHIRING_MONTH_RE.search(url.lower())
+    if not match or match.group(1) not in MONTHS:
+        return None
+    return int(match.group(2)) * 12 + MONTHS.index(match.group(1))
+
+
+def is_thread_page(url: str) -> bool:
+    return thread_sort_key(url) is not None
+
+
+def is_hnhiring_archive_url(url: str) -> bool:
+    """Only the hnhiring.com index and its monthly thread pages are worth following"""
+    parts = urlsplit(url)
+    if parts.netloc.lower().removeprefix('www.') != HNHIRING_HOST:
+        return False
+    return parts.path in ('', '/') or is_thread_page(url)
+
+
+def default_priority(url: str, depth: int) -> Tuple[int, int]:
+    """Monthly threads first, newest first; any other page after them, shallowest first"""
+    month = thread_sort_key(url)
+    return (0, -month) if month is not None else (1, depth)
+
+
+class CrawlFrontier:
+    """
+    Prioritised URL frontier with a Bloom filter seen-set, persisted to a
+    JSON file so an interrupted crawl resumes where it stopped. A crawl
+    that ran out of URLs resets it, so the next one starts afresh.
+
+    A URL is pushed at most once (modulo Bloom false positives, which only
+    ever skip a page, never crawl one twice). Popped URLs stay recorded as
+    in progress until mark_done, so pages in flight when the process died
+    are crawled again on resume.
+    """
+
+    def __init__(self, state_path: Optional[str] = None, bloom_capacity: int = 1_000_000, error_rate: float = 0.01):
+        self.state_path = state_path
+        self._heap: List[Tuple] = []
+        self._seq = 0
+        self.in_progress: Dict[str, int] = {}  # url -> depth
+        self.pages_done = 0
+        self.bloom_capacity = bloom_capacity
+        self.error_rate = error_rate
+        self.seen = BloomFilter(bloom_capacity, error_rate)
+        if state_path and os.path.exists(state_path):
+            self._load()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, url: str, depth: int, priority: Tuple = (0, 0), force: bool = False) -> bool:
+        """Queue a URL unless it was seen before. Returns True if it was queued"""
+        url = normalise_url(url)
+        if url in self.seen and not force:
+            return False
+        self.seen.add(url)
+        heapq.heappush(self._heap, (list(priority), self._seq, url, depth))
+        self._seq += 1
+        return True
+
+    def pop(self) -> Tuple[str, int]:
+        _, _, url, depth = heapq.heappop(self._heap)
+        self.in_progress[url] = depth
+        return url, depth
+
+    def mark_done(self, url: str):
+        self.in_progress.pop(url, None)
+        self.pages_done += 1
+
+    def reset(self):
+        """Forget every URL, for a new crawl from the seeds"""
+        self._heap = []
+        self._seq = 0
+        self.in_progress = {}
+        self.pages_done = 0
+        self.seen = BloomFilter(self.bloom_capacity, self.error_rate)
+
+    def _load(self):
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        self.seen = BloomFilter.from_dict(state['seen'])
+        self._heap = [tuple(entry) for entry in state['frontier']]
+        heapq.heapify(self._heap)
+        self._seq = state['seq']
+        self.pages_done = state['pages_done']
+        # Pages that were in flight when the last run stopped go to the front
+        for url, depth in state['in_progress'].items():
+            self.push(url, depth, priority=(-1, 0), force=True)
+
+    def save(self):
+        if not self.state_path:
+            return
+        state = {
+            'frontier': self._heap,
+            'in_progress': self.in_progress,
+            'seq': self._seq,
+            'pages_done': self.pages_done,
+            'seen': self.seen.to_dict()
+        }
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+
+class DeepCrawler:
+    """
+    Crawls outward from seed URLs through a HackerNewsJobScraper, so every
+    page still goes through its browser pool, rate limiter and page cache.
+
+    Links found on each page are pushed onto a CrawlFrontier when
+    `follow(url)` allows it and the page is less than `max_depth` links from
+    a seed. Results are yielded as pages complete, with the page's `depth`
+    added, so extraction can start on the first thread while later ones
+    are still loading. Crawl limits and the frontier file come from the
+    scraper's ScraperConfig unless given here.
+    """
+
+    def __init__(
+        self,
+        scraper: HackerNewsJobScraper,
+        state_path: Optional[str] = None,
+        max_pages: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        follow: Callable[[str], bool] = is_hnhiring_archive_url,
+        priority: Callable[[str, int], Tuple] = default_priority,
+        save_every: int = 10
+    ):
+        config = scraper.config
+        self.scraper = scraper
+        self.max_pages = max_pages if max_pages is not None else config.max_crawl_pages
+        self.max_depth = max_depth if max_depth is not None else config.max_crawl_depth
+        self.follow = follow
+        self.priority = priority
+        self.save_every = save_every
+        self.frontier = CrawlFrontier(
+            state_path if state_path is not None else config.frontier_path,
+            bloom_capacity=config.bloom_capacity
+        )
+
+    def _enqueue(self, url: str, depth: int) -> bool:
+        return self.frontier.push(url, depth, self.priority(normalise_url(url), depth))
+
+    async def crawl(self, seeds: Iterable[str], max_concurrency: Optional[int] = None) -> AsyncIterator[dict]:
+        """Crawl from `seeds` (already seen seeds are skipped on resume), yielding results as they arrive"""
+        for url in seeds:
+            self._enqueue(url, 0)
+
+        concurrency = max_concurrency or self.scraper.config.max_concurrency
+        in_flight: Dict[asyncio.Task, Tuple[str, int]] = {}
+        # The cap is per call; frontier.pages_done counts across resumes and is only reported
+        started = 0
+        try:
+            while True:
+                while self.frontier and len(in_flight) < concurrency and started < self.max_pages:
+                    url, depth = self.frontier.pop()
+                    in_flight[asyncio.create_task(self.scraper.scrape_url(url))] = (url, depth)
+                    started += 1
+                if not in_flight:
+                    if not self.frontier:
+                        # Finished rather than stopped at max_pages: the next crawl starts over
+                        self.frontier.reset()
+                    return
+
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    url, depth = in_flight.pop(task)
+                    result = task.result()
+                    result['depth'] = depth
+                    if result['success'] and depth < self.max_depth:
+                        for link in discover_links(str(result['content']), url):
+                            if self.follow(link):
+                                self._enqueue(link, depth + 1)
+                    self.frontier.mark_done(url)
+                    if self.frontier.pages_done % self.save_every == 0:
+                        self.frontier.save()
+                    yield result
+        finally:
+            # Cancelled pages stay in progress and are retried on resume
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            self.frontier.save()
+
+
+async def crawl_hnhiring_archive(state_path: Optional[str] = None) -> AsyncIterator[dict]:
+    """Discover and fetch every monthly hnhiring.com thread, yielding thread pages as they arrive"""
+    async with HackerNewsJobScraper() as scraper:
+        crawler = DeepCrawler(scraper, state_path=state_path)
+        async for result in crawler.crawl([f"https://{HNHIRING_HOST}/"]):
+            if is_thread_page(result['url']):
+                yield result
+
+
+async def run_deep_crawl():
+    async for result in crawl_hnhiring_archive():
+        if result['success']:
+            print(f"Fetched thread {result['url']}{' (cached)' if result.get('from_cache') else ''}")
+        else:
+            print(f"Failed to fetch {result['url']}: {result['error']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_deep_crawl())
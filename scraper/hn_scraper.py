@@ -1,63 +1,299 @@
 import asyncio
-from crawl4ai import AsyncWebCrawler
+import re
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import AsyncIterator, Iterable, List, Optional
+from browser_pool import BrowserPool
+from http_fetcher import HttpFetcher, html_to_markdown, word_count
+from logger import ScraperLogger
+from page_cache import CachePolicy, CachedPage, PageCache, is_not_modified
+from rate_limiter import HostRateLimiter
 from scraper_config import ScraperConfig
 
+MONTHS = [
+    'january', 'february', 'march', 'april', 'may', 'june',
+    'july', 'august', 'september', 'october', 'november', 'december'
+]
+
+
+def hnhiring_month_urls(start_year: int, start_month: int, end_year: int, end_month: int) -> List[str]:
+    """Monthly hnhiring.com thread URLs between two (year, month) pairs, inclusive"""
+    urls = []
+    year, month = start_year, start_month
+    while (year, month) <= (end_year, end_month):
+        urls.append(f"https://hnhiring.com/{MONTHS[month - 1]}-{year}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return urls
+
+
+HNHIRING_MONTH_RE = re.compile(r'hnhiring\.com/([a-z]+)-(\d{4})/?$')
+
+
+def is_closed_thread(url: str, today: Optional[date] = None) -> bool:
+    """True for monthly threads from a past month, whose content no longer changes"""
+    match = HNHIRING_MONTH_RE.search(url.lower())
+    if not match or match.group(1) not in MONTHS:
+        return False
+    today = today or date.today()
+    thread_month = (int(match.group(2)), MONTHS.index(match.group(1)) + 1)
+    return thread_month < (today.year, today.month)
+
+
 class HackerNewsJobScraper:
     
-    def __init__(self):
-        self.crawler = None
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        max_pages_per_browser: int = 50,
+        config: Optional[ScraperConfig] = None
+    ):
+        #We fetch the configurations from scraper_config class
+        self.config = config or ScraperConfig()
+        if pool_size is None:
+            pool_size = self.config.max_concurrency
+
+        # Warm browsers are reused across scrape_url calls instead of
+        # launching a new Chromium for every URL
+        self.pool = BrowserPool(
+            browser_config=self.config.browser_config,
+            size=pool_size,
+            max_pages_per_browser=max_pages_per_browser
+        )
+
+        self.rate_limiter = HostRateLimiter(
+            requests_per_second=self.config.requests_per_second,
+            burst=self.config.burst
+        )
+
+        self.cache = PageCache(
+            cache_dir=self.config.cache_dir,
+            max_bytes=self.config.cache_max_bytes,
+            ttl_seconds=self.config.cache_ttl_seconds
+        )
+
+        # Server-rendered pages skip the browser entirely
+        self.http = HttpFetcher(
+            user_agent=self.config.browser_config.user_agent,
+            max_connections_per_host=self.config.http_max_connections_per_host
+        )
+
+        self.logger = ScraperLogger("scraper")
+
+    async def __aenter__(self):
+        await self.pool.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.pool.close()
+        await self.http.close()
     
-    async def scrape_url(self, url: str) -> dict:
-        
+    @asynccontextmanager
+    async def _network_turn(self, url: str, slots: Optional[asyncio.Semaphore]):
+        """
+        Take one of `slots`, then the host's rate limit token, around a
+        request. The token is taken only once the request can start, so
+        pages queued for a slot cannot hoard tokens and then reach a host
+        together. Cache hits take neither.
+        """
+        if slots is None:
+            await self.rate_limiter.acquire(url)
+            yield
+            return
+        async with slots:
+            await self.rate_limiter.acquire(url)
+            yield
+
+    async def _from_cache(self, url: str, slots: Optional[asyncio.Semaphore] = None) -> Optional[str]:
+        """Return cached markdown for the URL if the cache policy allows serving it"""
+        policy = self.config.cache_policy
+        if policy is CachePolicy.ALWAYS_FRESH:
+            return None
+
+        render_params = self.config.render_params()
+        # Offline, an expired copy is still better than nothing, and must not be deleted
+        cached = self.cache.get(url, render_params, allow_expired=policy is CachePolicy.OFFLINE_ONLY)
+        if cached is None:
+            return None
+
+        # Closed threads never change, so they cost no network at all
+        if policy is CachePolicy.OFFLINE_ONLY or cached.immutable:
+            return cached.markdown
+        # Without validators the origin cannot answer 304, so asking would only cost a token
+        if not cached.etag and not cached.last_modified:
+            return None
+
+        async with self._network_turn(url, slots):
+            with self.logger.timer("fetch"):
+                not_modified = await is_not_modified(cached)
+        if not_modified:
+            # A confirmed-current copy of a now closed thread is final
+            cached.immutable = is_closed_thread(url)
+            self.cache.touch(cached, render_params)
+            return cached.markdown
+        return None
+
+    async def _fetch_static(self, url: str) -> Optional[dict]:
+        """
+        Fetch a server-rendered page over plain HTTP. None if it needs the
+        browser after all; a failed result if the server rejected the URL
+        outright.
+        """
+        try:
+            with self.logger.timer("fetch"):
+                fetched = await self.http.fetch(url)
+        except Exception as e:
+            # Any network or decoding problem falls back to the browser
+            self.logger.debug(f"Plain fetch of {url} failed: {e}")
+            return None
+        if fetched.definite_failure:
+            return {
+                'success': False,
+                'error': f'HTTP {fetched.status}',
+                'url': url
+            }
+        if not fetched.ok:
+            return None
+
+        # Conversion is CPU-bound; keep the other fetches moving meanwhile
+        markdown = await asyncio.to_thread(html_to_markdown, fetched.html, fetched.url)
+        if word_count(markdown) < self.config.crawler_run_config.word_count_threshold:
+            # Probably rendered client-side
+            return None
+
+        self.logger.count("pages_fetched_http")
+        self.logger.count("bytes_fetched", len(fetched.html.encode('utf-8')))
+        headers = {k.lower(): v for k, v in fetched.headers.items()}
+        self.cache.put(
+            CachedPage(
+                url=url,
+                markdown=markdown,
+                html=fetched.html,
+                etag=headers.get('etag'),
+                last_modified=headers.get('last-modified'),
+                immutable=is_closed_thread(url)
+            ),
+            self.config.render_params()
+        )
+        return {
+            'success': True,
+            'content': markdown,
+            'url': url,
+            'fetched_with': 'http'
+        }
+
+    async def scrape_url(self, url: str, slots: Optional[asyncio.Semaphore] = None) -> dict:
+        """Scrape one URL. With `slots`, each request made for it first takes one of them"""
+        self.logger.count("pages_requested")
         try:
-            # Create crawler
-            self.crawler = AsyncWebCrawler(headless=True)
-            
-            # Start crawler
-            await self.crawler.__aenter__()
-
-            #We fetch the configurations from scraper_config class
-            config = ScraperConfig()
-            
-            try:
+            content = await self._from_cache(url, slots)
+            if content is not None:
+                self.logger.count("page_cache_hits")
+                return {
+                    'success': True,
+                    'content': content,
+                    'url': url,
+                    'from_cache': True
+                }
+
+            if self.config.cache_policy is CachePolicy.OFFLINE_ONLY:
+                return {
+                    'success': False,
+                    'error': 'Page not cached and cache policy is offline-only',
+                    'url': url
+                }
+
+            self.logger.count("page_cache_misses")
+
+            if self.config.use_http_fetch(url):
+                async with self._network_turn(url, slots):
+                    page = await self._fetch_static(url)
+                if page is not None:
+                    if not page['success']:
+                        self.logger.count("pages_failed")
+                    return page
+                self.logger.count("http_fallbacks")
+
+            # Borrow a warm crawler from the pool
+            async with self._network_turn(url, slots), self.pool.acquire() as crawler:
                 # Scrape the URL
-                result = await self.crawler.arun(url=url,config=config.crawler_run_config)
+                with self.logger.timer("render"):
+                    result = await crawler.arun(url=url,config=self.config.crawler_run_config)
+                # A failed crawl may have left the browser broken, do not hand it out again
+                if not result.success:
+                    self.pool.mark_unhealthy(crawler)
                 
-                # Check if scraping was successful
-                if result.success:
-                    return {
-                        'success': True,
-                        'content': result.markdown,
-                        'url': url
-                    }
-                else:
-                    return {
-                        'success': False,
-                        'error': 'Scraping failed',
-                        'url': url
-                    }
-                    
-            finally:
-                # Always close crawler
-                await self.crawler.__aexit__(None, None, None)
+            # Check if scraping was successful
+            if result.success:
+                self.logger.count("pages_rendered")
+                self.logger.count("bytes_fetched", len((result.html or '').encode('utf-8')))
+                headers = {k.lower(): v for k, v in (getattr(result, 'response_headers', None) or {}).items()}
+                self.cache.put(
+                    CachedPage(
+                        url=url,
+                        markdown=str(result.markdown),
+                        html=result.html or '',
+                        etag=headers.get('etag'),
+                        last_modified=headers.get('last-modified'),
+                        immutable=is_closed_thread(url)
+                    ),
+                    self.config.render_params()
+                )
+                return {
+                    'success': True,
+                    'content': result.markdown,
+                    'url': url
+                }
+            else:
+                self.logger.count("pages_failed")
+                return {
+                    'success': False,
+                    'error': 'Scraping failed',
+                    'url': url
+                }
                 
         except Exception as e:
+            self.logger.count("pages_failed")
+            self.logger.error(f"Scraping {url} failed: {e}")
             return {
                 'success': False,
                 'error': str(e),
                 'url': url
             }
 
+    async def scrape_many(self, urls: Iterable[str], max_concurrency: Optional[int] = None) -> AsyncIterator[dict]:
+        """
+        Scrape several URLs concurrently, yielding each result as soon as its page completes.
+
+        At most `max_concurrency` requests are in flight at once (defaults
+        to ScraperConfig.max_concurrency) and every host is throttled by its
+        own token bucket, taken once a request has its slot. Cache hits need
+        neither, so they are not slowed down.
+        Results arrive in completion order, not input order.
+        """
+        slots = asyncio.Semaphore(max_concurrency or self.config.max_concurrency)
+        tasks = [asyncio.create_task(self.scrape_url(url, slots)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Stop outstanding work if the consumer breaks out early, and let it unwind
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
 
 async def run_scraper():
-    scraper = HackerNewsJobScraper()
-    result = await scraper.scrape_url("https://hnhiring.com/march-2025")
-    if result['success']:
-        print("Fetched the job openings successfully")
-    else:
-        print("Failed to fetch the job openings")
+    urls = hnhiring_month_urls(2025, 1, 2025, 3)
+    async with HackerNewsJobScraper() as scraper:
+        async for result in scraper.scrape_many(urls):
+            if result['success']:
+                print(f"Fetched the job openings successfully from {result['url']}")
+            else:
+                print(f"Failed to fetch the job openings from {result['url']}")
+        print(scraper.logger.metrics.summary())
+        scraper.logger.export_metrics("metrics.jsonl")
 
 
 if __name__ == "__main__":
     asyncio.run(run_scraper())
-    
\ No newline at end of file
+    
@@ -0,0 +1,239 @@
+import asyncio
+import re
+from html import unescape
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import aiohttp
+
+try:
+    import brotli  # noqa: F401  aiohttp decodes br responses when it is installed
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+WORD_RE = re.compile(r'\w+')
+LINK_TARGET_RE = re.compile(r'\]\([^)]*\)')
+SPACES_RE = re.compile(r'\s+')
+BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+# A comment, doctype, or start/end tag with its raw attributes
+TAG_RE = re.compile(r'<!--.*?-->|<[!?][^>]*>|<(/?)([a-zA-Z][a-zA-Z0-9]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>', re.S)
+HREF_RE = re.compile(r'\bhref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.I)
+
+# Elements whose text is never page content
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'head', 'iframe', 'form', 'button'}
+BLOCK_TAGS = {'p', 'div', 'section', 'article', 'header', 'footer', 'main', 'aside', 'nav',
+              'table', 'tr', 'ul', 'ol', 'dl', 'dt', 'dd', 'blockquote', 'figure', 'center'}
+# 4xx answers a browser render may still get past: bot walls, timeouts, rate limits
+RETRYABLE_CLIENT_ERRORS = {403, 408, 429}
+HEADING_TAGS = {'h1': '#', 'h2': '##', 'h3': '###', 'h4': '####', 'h5': '#####', 'h6': '######'}
+
+
+class FetchResult:
+    """Outcome of a plain HTTP fetch"""
+
+    def __init__(self, url: str, status: int, html: str, headers: Dict[str, str]):
+        self.url = url
+        self.status = status
+        self.html = html
+        self.headers = headers
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    @property
+    def definite_failure(self) -> bool:
+        """The server said the page is not there for anyone (404, 410...), so rendering it would not help"""
+        return 400 <= self.status < 500 and self.status not in RETRYABLE_CLIENT_ERRORS
+
+
+class HttpFetcher:
+    """
+    Pooled keep-alive HTTP client for server-rendered pages.
+
+    One aiohttp session is shared by every fetch, so connections to a host
+    are reused instead of paying a TCP + TLS handshake per page. Responses
+    are requested gzip (and brotli when the brotli package is installed)
+    and decoded transparently.
+    """
+
+    def __init__(
+        self,
+        user_agent: Optional[str] = None,
+        max_connections: int = 32,
+        max_connections_per_host: int = 4,
+        timeout_seconds: float = 30.0
+    ):
+        self.user_agent = user_agent
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout_seconds = timeout_seconds
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            headers = {'Accept-Encoding': ACCEPT_ENCODING, 'Accept': 'text/html,application/xhtml+xml'}
+            if self.user_agent:
+                headers['User-Agent'] = self.user_agent
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    limit_per_host=self.max_connections_per_host,
+                    keepalive_timeout=30,
+                    ttl_dns_cache=300
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout_seconds),
+                headers=headers
+            )
+        return self._session
+
+    async def fetch(self, url: str) -> FetchResult:
+        async with self._get_session().get(url) as response:
+            html = await response.text(errors='replace')
+            return FetchResult(str(response.url), response.status, html, dict(response.headers))
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            # Give the connector a moment to close its sockets cleanly
+            await asyncio.sleep(0)
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+class _MarkdownConverter:
+    """
+    HTML -> markdown for the tags job boards actually use.
+
+    Tokenises with one regex instead of html.parser, which is several times
+    faster on large thread pages; skipped elements are jumped over whole.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.out: List[str] = []
+        self.pre_depth = 0
+        self.list_depth = 0
+        self.links: List[Optional[str]] = []
+
+    def _newline(self, count: int = 1):
+        self.out.append('\n' * count)
+
+    def feed(self, html: str):
+        pos = 0
+        while True:
+            match = TAG_RE.search(html, pos)
+            if match is None:
+                self.handle_data(html[pos:])
+                return
+            if match.start() > pos:
+                self.handle_data(html[pos:match.start()])
+            pos = match.end()
+
+            tag = (match.group(2) or '').lower()
+            if not tag:
+                continue  # comment, doctype or processing instruction
+            if match.group(1):
+                self.handle_endtag(tag)
+            elif tag in SKIP_TAGS:
+                # Jump straight past the element and everything in it
+                closing = re.compile(rf'</{tag}\s*>', re.I).search(html, pos)
+                pos = closing.end() if closing else len(html)
+            else:
+                self.handle_starttag(tag, match.group(3))
+
+    def handle_starttag(self, tag: str, attrs: str):
+        if tag in HEADING_TAGS:
+            self._newline(2)
+            self.out.append(HEADING_TAGS[tag] + ' ')
+        elif tag == 'hr':
+            self.out.append('\n\n---\n\n')
+        elif tag == 'br':
+            self._newline()
+        elif tag in ('ul', 'ol'):
+            self.list_depth += 1
+            self._newline()
+        elif tag == 'li':
+            self.out.append('\n' + '  ' * max(self.list_depth - 1, 0) + '- ')
+        elif tag in ('strong', 'b'):
+            self.out.append('**')
+        elif tag in ('em', 'i'):
+            self.out.append('*')
+        elif tag == 'pre':
+            self.pre_depth += 1
+            self.out.append('\n```\n')
+        elif tag == 'code' and not self.pre_depth:
+            self.out.append('`')
+        elif tag == 'a':
+            match = HREF_RE.search(attrs)
+            href = unescape(next(group for group in match.groups() if group is not None)) if match else None
+            self.links.append(urljoin(self.base_url, href) if href and not href.startswith(('#', 'javascript:')) else None)
+            if self.links[-1]:
+                self.out.append('[')
+        elif tag in ('td', 'th'):
+            self.out.append(' ')
+        elif tag in BLOCK_TAGS:
+            self._newline(2)
+
+    def handle_endtag(self, tag: str):
+        if tag in HEADING_TAGS:
+            self._newline(2)
+        elif tag in ('ul', 'ol'):
+            self.list_depth = max(self.list_depth - 1, 0)
+            self._newline()
+        elif tag in ('strong', 'b'):
+            self.out.append('**')
+        elif tag in ('em', 'i'):
+            self.out.append('*')
+        elif tag == 'pre':
+            self.pre_depth = max(self.pre_depth - 1, 0)
+            self.out.append('\n```\n')
+        elif tag == 'code' and not self.pre_depth:
+            self.out.append('`')
+        elif tag == 'a' and self.links:
+            href = self.links.pop()
+            if href:
+                self.out.append(f']({href})')
+        elif tag in BLOCK_TAGS:
+            self._newline(2)
+
+    def handle_data(self, data: str):
+        if '&' in data:
+            data = unescape(data)
+        # HTML collapses runs of whitespace into one space
+        self.out.append(data if self.pre_depth else SPACES_RE.sub(' ', data))
+
+
+def html_to_markdown(html: str, base_url: str = "") -> str:
+    """
+    Markdown for a server-rendered page: headings, paragraphs, lists,
+    emphasis, code and links (made absolute against `base_url`). Scripts,
+    styles and forms are dropped.
+    """
+    converter = _MarkdownConverter(base_url)
+    converter.feed(html)
+    lines = []
+    in_code = False
+    for line in ''.join(converter.out).split('\n'):
+        if line.strip() == '```':
+            in_code = not in_code
+        if in_code:
+            lines.append(line)
+            continue
+        body = SPACES_RE.sub(' ', line).strip()
+        # Only nested list items keep their indentation
+        indent = len(line) - len(line.lstrip(' ')) if body.startswith('- ') else 0
+        lines.append(' ' * indent + body)
+    return BLANK_LINES_RE.sub('\n\n', '\n'.join(lines)).strip() + '\n'
+
+
+def word_count(markdown: str) -> int:
+    """Words of visible text, link targets excluded"""
+    return len(WORD_RE.findall(LINK_TARGET_RE.sub(']', markdown)))
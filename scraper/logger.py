@@ -1,13 +1,197 @@
 # src/scraper/logger.py - Step 4: Simple Logger
 
+import asyncio
+import functools
+import json
 import logging
+import os
+import re
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+# Latency buckets in seconds, from a cache hit to a slow LLM call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+METRIC_PREFIX = "webcrawler_"
+METRIC_NAME_RE = re.compile(r'[^a-zA-Z0-9_]')
+
+
+class Histogram:
+    """Fixed-bucket histogram, cheap enough to update on every call"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'max': round(self.max, 6),
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.counts))
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters, gauges and latency histograms.
+
+    Thread-safe, since extraction runs in worker threads. Timers record
+    into a `<name>_seconds` histogram. export() writes a snapshot to a
+    local file: Prometheus text format for .prom/.txt paths (rewritten each
+    time), JSON lines otherwise (one snapshot appended per call).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        # Last value set, for levels rather than totals (e.g. a concurrency limit)
+        self.gauges: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram()
+            self.histograms[name].observe(value)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time a block into the `<name>_seconds` histogram, failed blocks included"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - start)
+
+    def timed(self, name: str):
+        """Decorator version of timer, for plain and async functions"""
+        def decorator(fn):
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(name):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+                'histograms': {name: h.to_dict() for name, h in self.histograms.items()}
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = METRIC_PREFIX + METRIC_NAME_RE.sub('_', name) + "_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+            for name, value in sorted(self.gauges.items()):
+                metric = METRIC_PREFIX + METRIC_NAME_RE.sub('_', name)
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {value}")
+            for name, h in sorted(self.histograms.items()):
+                metric = METRIC_PREFIX + METRIC_NAME_RE.sub('_', name)
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip([str(b) for b in h.buckets] + ['+Inf'], h.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f"{metric}_sum {h.sum}")
+                lines.append(f"{metric}_count {h.count}")
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if path.endswith(('.prom', '.txt')):
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, path)
+        else:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(self.snapshot()) + '\n')
+
+    def summary(self) -> str:
+        """One line per metric, for printing at the end of a run"""
+        snapshot = self.snapshot()
+        lines = [f"{name}: {value:g}" for name, value in sorted(snapshot['counters'].items())]
+        lines.extend(f"{name}: {value:g}" for name, value in sorted(snapshot['gauges'].items()))
+        lines.extend(
+            f"{name}: n={h['count']} total={h['sum']:.2f}s p50<={h['p50']}s p95<={h['p95']}s max={h['max']:.3f}s"
+            for name, h in sorted(snapshot['histograms'].items())
+        )
+        return '\n'.join(lines)
+
+
+# Shared by every ScraperLogger, so one export covers the whole run
+METRICS = MetricsRegistry()
+
 
 class ScraperLogger:
-    """Simple logger for the scraper"""
+    """Simple logger for the scraper, plus the shared timing and counter metrics"""
     
-    def __init__(self, name: str = __name__):
+    def __init__(self, name: str = __name__, metrics: Optional[MetricsRegistry] = None):
         self.logger = logging.getLogger(name)
+        self.metrics = metrics or METRICS
         self._setup_logger()
     
     def _setup_logger(self):
@@ -31,10 +215,39 @@ class ScraperLogger:
         """Log info message"""
         self.logger.info(message)
     
+    def warning(self, message: str):
+        """Log warning message"""
+        self.logger.warning(message)
+    
     def error(self, message: str):
         """Log error message"""
         self.logger.error(message)
     
     def debug(self, message: str):
         """Log debug message"""
-        self.logger.debug(message)
\ No newline at end of file
+        self.logger.debug(message)
+
+    def timer(self, stage: str):
+        """Context manager timing a stage: with logger.timer('fetch'): ..."""
+        return self.metrics.timer(stage)
+
+    def timed(self, stage: str):
+        """Decorator timing every call of a function as a stage"""
+        return self.metrics.timed(stage)
+
+    def count(self, name: str, value: float = 1):
+        """Add to a counter such as pages, bytes or cache hits"""
+        self.metrics.inc(name, value)
+
+    def gauge(self, name: str, value: float):
+        """Set a gauge, a level that is replaced rather than added to"""
+        self.metrics.set_gauge(name, value)
+
+    def observe(self, name: str, value: float):
+        """Record a value in a histogram"""
+        self.metrics.observe(name, value)
+
+    def export_metrics(self, path: str):
+        """Write the metrics collected so far to a .prom or JSON lines file"""
+        self.metrics.export(path)
+        self.info(f"Wrote metrics to {path}")
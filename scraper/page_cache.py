@@ -0,0 +1,207 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class CachePolicy(Enum):
+    """How the scraper uses the on-disk page cache"""
+    ALWAYS_FRESH = "always_fresh"  # Always fetch, but still store the result
+    REVALIDATE = "revalidate"  # Serve cached pages after an ETag/Last-Modified check
+    OFFLINE_ONLY = "offline_only"  # Never touch the network, cache or nothing
+
+
+class CachedPage:
+    """A single cached page as stored on disk"""
+
+    def __init__(
+        self,
+        url: str,
+        markdown: str,
+        html: str = "",
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        immutable: bool = False,
+        fetched_at: Optional[float] = None
+    ):
+        self.url = url
+        self.markdown = markdown
+        self.html = html
+        self.etag = etag
+        self.last_modified = last_modified
+        self.immutable = immutable
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(self.markdown.encode('utf-8')).hexdigest()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'url': self.url,
+            'markdown': self.markdown,
+            'html': self.html,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'immutable': self.immutable,
+            'fetched_at': self.fetched_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CachedPage':
+        return cls(**data)
+
+
+class PageCache:
+    """
+    Gzip-compressed on-disk cache for rendered pages.
+
+    Entries are keyed by the URL plus the render settings that produced them,
+    so changing e.g. the extraction strategy never serves stale output.
+    Pages older than `ttl_seconds` are evicted unless marked immutable, and
+    the least recently used entries go first once `max_bytes` is exceeded.
+    The size of the cache is kept as a running total, so the directory is
+    only listed when something has to be evicted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = ".page_cache",
+        max_bytes: int = 500 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 30 * 24 * 3600
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def make_key(url: str, render_params: Optional[Dict[str, Any]] = None) -> str:
+        payload = json.dumps({'url': url, 'render': render_params or {}}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json.gz")
+
+    def get(
+        self,
+        url: str,
+        render_params: Optional[Dict[str, Any]] = None,
+        allow_expired: bool = False
+    ) -> Optional[CachedPage]:
+        """
+        The cached page, or None. Expired entries are removed, unless
+        `allow_expired` (offline runs), which returns them and keeps them.
+        """
+        path = self._path(self.make_key(url, render_params))
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                page = CachedPage.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError):
+            # Corrupt or partially written entry
+            self._remove(path)
+            return None
+
+        if self._expired(page):
+            if not allow_expired:
+                self._remove(path)
+                return None
+            return page
+
+        # Bump mtime so size-based eviction is least-recently-used
+        os.utime(path, None)
+        return page
+
+    def put(self, page: CachedPage, render_params: Optional[Dict[str, Any]] = None):
+        path = self._path(self.make_key(page.url, render_params))
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(page.to_dict(), f, ensure_ascii=False)
+        self._total_bytes += os.path.getsize(tmp_path) - self._size(path)
+        os.replace(tmp_path, path)
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def touch(self, page: CachedPage, render_params: Optional[Dict[str, Any]] = None):
+        """Reset the age of an entry after a successful revalidation"""
+        page.fetched_at = time.time()
+        self.put(page, render_params)
+
+    def _expired(self, page: CachedPage) -> bool:
+        if page.immutable or self.ttl_seconds is None:
+            return False
+        return time.time() - page.fetched_at > self.ttl_seconds
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return 0
+
+    def _remove(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        self._total_bytes -= size
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(last access, size, path) of every entry"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.json.gz'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """Drop entries until the cache fits in max_bytes, oldest access first"""
+        entries = self._entries()
+        # Recounted here, which also picks up entries other processes added or removed
+        self._total_bytes = sum(size for _, size, _ in entries)
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, _, path in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+
+
+def _conditional_get(url: str, etag: Optional[str], last_modified: Optional[str], timeout: float) -> int:
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    # HEAD: a changed page (200) is fetched again by the caller anyway, so its body is never downloaded here
+    request = urllib.request.Request(url, headers=headers, method='HEAD')
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        # urllib reports 304 Not Modified as an HTTPError
+        return e.code
+
+
+async def is_not_modified(page: CachedPage, timeout: float = 10.0) -> bool:
+    """Ask the origin whether a cached page is still current, without rendering it"""
+    if not page.etag and not page.last_modified:
+        return False
+    try:
+        status = await asyncio.to_thread(_conditional_get, page.url, page.etag, page.last_modified, timeout)
+    except (OSError, ValueError):
+        return False
+    return status == 304
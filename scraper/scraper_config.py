@@ -1,9 +1,34 @@
+import re
+from typing import Any, Dict, List, Optional
 from crawl4ai import BrowserConfig, CrawlerRunConfig,CacheMode
+from page_cache import CachePolicy
+
+# Server-rendered targets that need no JavaScript
+DEFAULT_HTTP_FETCH_PATTERNS = [
+    r'^https?://(www\.)?hnhiring\.com/',
+    r'^https?://news\.ycombinator\.com/item\?',
+]
 
 class ScraperConfig:
     """Configuration class for HackerNews scraping"""
     
-    def __init__(self, extraction_strategy= None):
+    def __init__(
+        self,
+        extraction_strategy= None,
+        max_concurrency: int = 4,
+        requests_per_second: float = 1.0,
+        burst: int = 2,
+        cache_policy: CachePolicy = CachePolicy.REVALIDATE,
+        cache_dir: str = ".page_cache",
+        cache_max_bytes: int = 500 * 1024 * 1024,
+        cache_ttl_seconds: float = 30 * 24 * 3600,
+        max_crawl_pages: int = 500,
+        max_crawl_depth: int = 2,
+        frontier_path: str = ".crawl_frontier.json",
+        bloom_capacity: int = 1_000_000,
+        http_fetch_patterns: Optional[List[str]] = None,
+        http_max_connections_per_host: int = 4
+    ):
         self.browser_config = BrowserConfig(
             headless=True,
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -11,9 +36,46 @@ class ScraperConfig:
         )
         
         self.crawler_run_config = CrawlerRunConfig(
-            cache_mode=CacheMode.BYPASS,  # Always fetch fresh content
+            cache_mode=CacheMode.BYPASS,  # Caching is handled by our own PageCache
             word_count_threshold=30,  # Minimum words for valid content
             extraction_strategy = extraction_strategy, #Can we any extraction strategy such as CSS based or LLM based
             page_timeout=80000 
         )
-        
\ No newline at end of file
+
+        # Settings for scrape_many
+        self.max_concurrency = max_concurrency  # Pages fetched in parallel
+        self.requests_per_second = requests_per_second  # Per-host rate limit
+        self.burst = burst  # Requests a host may receive back to back
+
+        # Settings for the on-disk page cache
+        self.cache_policy = cache_policy
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.cache_ttl_seconds = cache_ttl_seconds
+
+        # Settings for deep_crawl.DeepCrawler
+        self.max_crawl_pages = max_crawl_pages  # Pages fetched per crawl() call
+        self.max_crawl_depth = max_crawl_depth  # Links followed away from a seed
+        self.frontier_path = frontier_path  # Where the frontier is saved so a crawl can resume
+        self.bloom_capacity = bloom_capacity  # URLs the seen-set holds at ~1% false positives
+
+        # URLs matching any of these regexes are fetched over plain HTTP and
+        # converted to markdown without a browser. The browser is only used
+        # when that yields fewer than word_count_threshold words
+        if http_fetch_patterns is None:
+            http_fetch_patterns = DEFAULT_HTTP_FETCH_PATTERNS
+        self.http_fetch_patterns = [re.compile(pattern) for pattern in http_fetch_patterns]
+        self.http_max_connections_per_host = http_max_connections_per_host
+
+    def use_http_fetch(self, url: str) -> bool:
+        return any(pattern.search(url) for pattern in self.http_fetch_patterns)
+
+    def render_params(self) -> Dict[str, Any]:
+        """Settings that change the rendered output, used as part of the cache key"""
+        run_config = self.crawler_run_config
+        return {
+            'user_agent': self.browser_config.user_agent,
+            'word_count_threshold': run_config.word_count_threshold,
+            'extraction_strategy': type(run_config.extraction_strategy).__name__
+        }
+        
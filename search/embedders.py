@@ -0,0 +1,129 @@
+import re
+import zlib
+from typing import Any, Dict, List
+
+import numpy as np
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+class HashedTfidfEmbedder:
+    """
+    Dependency-free embedder: word and bigram counts hashed into `dim`
+    buckets, weighted by sublinear TF and IDF, L2-normalised.
+
+    Hashing uses crc32 rather than hash() so vectors are identical across
+    processes and runs.
+    """
+
+    name = "hashed_tfidf"
+
+    def __init__(self, dim: int = 256, bigrams: bool = True):
+        self.dim = dim
+        self.bigrams = bigrams
+        self.idf = np.ones(dim, dtype=np.float32)
+
+    def _buckets(self, document: str) -> List[int]:
+        tokens = TOKEN_RE.findall(document.lower())
+        features = tokens
+        if self.bigrams:
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return [zlib.crc32(feature.encode('utf-8')) % self.dim for feature in features]
+
+    def _term_counts(self, documents: List[str]) -> np.ndarray:
+        rows, cols = [], []
+        for row, document in enumerate(documents):
+            buckets = self._buckets(document)
+            rows.extend([row] * len(buckets))
+            cols.extend(buckets)
+        flat = np.asarray(rows, dtype=np.int64) * self.dim + np.asarray(cols, dtype=np.int64)
+        counts = np.bincount(flat, minlength=len(documents) * self.dim)
+        return counts.reshape(len(documents), self.dim).astype(np.float32)
+
+    def fit(self, documents: List[str], batch_size: int = 4096) -> 'HashedTfidfEmbedder':
+        """Learn IDF weights from the corpus"""
+        doc_freq = np.zeros(self.dim, dtype=np.float64)
+        total = 0
+        for start in range(0, len(documents), batch_size):
+            counts = self._term_counts(documents[start:start + batch_size])
+            doc_freq += (counts > 0).sum(axis=0)
+            total += counts.shape[0]
+        self.idf = (np.log((1 + total) / (1 + doc_freq)) + 1).astype(np.float32)
+        return self
+
+    def encode(self, documents: List[str], batch_size: int = 4096) -> np.ndarray:
+        """Embed documents as an (n, dim) float32 matrix of unit vectors"""
+        vectors = np.empty((len(documents), self.dim), dtype=np.float32)
+        for start in range(0, len(documents), batch_size):
+            counts = self._term_counts(documents[start:start + batch_size])
+            weights = np.log1p(counts, out=counts) * self.idf
+            norms = np.linalg.norm(weights, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            vectors[start:start + len(weights)] = weights / norms
+        return vectors
+
+    def get_config(self) -> Dict[str, Any]:
+        return {'name': self.name, 'dim': self.dim, 'bigrams': self.bigrams}
+
+    def save_state(self, path: str):
+        np.save(path, self.idf)
+
+    def load_state(self, path: str):
+        self.idf = np.load(path)
+
+
+class SentenceTransformerEmbedder:
+    """
+    CPU sentence-transformers model, e.g. all-MiniLM-L6-v2 (384 dims).
+    Needs the optional `sentence-transformers` package.
+    """
+
+    name = "sentence_transformer"
+
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError(
+                "SentenceTransformerEmbedder needs the sentence-transformers package. "
+                "Install it or use HashedTfidfEmbedder instead."
+            )
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def fit(self, documents: List[str], batch_size: int = 64) -> 'SentenceTransformerEmbedder':
+        return self
+
+    def encode(self, documents: List[str], batch_size: int = 64) -> np.ndarray:
+        return self.model.encode(
+            documents,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        ).astype(np.float32)
+
+    def get_config(self) -> Dict[str, Any]:
+        return {'name': self.name, 'model_name': self.model_name}
+
+    def save_state(self, path: str):
+        pass
+
+    def load_state(self, path: str):
+        pass
+
+
+EMBEDDERS = {
+    HashedTfidfEmbedder.name: HashedTfidfEmbedder,
+    SentenceTransformerEmbedder.name: SentenceTransformerEmbedder
+}
+
+
+def create_embedder(config: Dict[str, Any]):
+    """Build an embedder from the dict returned by its get_config()"""
+    config = dict(config)
+    name = config.pop('name')
+    if name not in EMBEDDERS:
+        raise ValueError(f"Unknown embedder {name!r}. Valid embedders: {list(EMBEDDERS)}")
+    return EMBEDDERS[name](**config)
+
@@ -0,0 +1,348 @@
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+SEARCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SEARCH_DIR, '..'))
+sys.path.insert(0, os.path.join(SEARCH_DIR, '..', 'preprocessing'))
+
+from job_facets import FACET_TYPES, job_facets, parse_facet
+from preprocess_data import clean_text, iter_jobs
+
+# Files that make up a facet index directory
+META_FILE = "facet_meta.json"  # term -> container directory, plus counts
+POSTINGS_FILE = "postings.bin"  # every container, back to back
+RECORDS_FILE = "records.jsonl"  # the jobs, one per line, in doc id order
+RECORD_OFFSETS_FILE = "record_offsets.npy"  # byte offset of each record line
+
+# Roaring-style containers: doc ids are split into blocks of 2**16 by their
+# high 16 bits. A block with few ids stores them as a sorted uint16 array,
+# a block with many as a 2**16-bit bitmap (1024 uint64 words, 8 KB), which
+# is smaller past ARRAY_MAX ids and makes AND/OR plain word operations.
+BLOCK_BITS = 16
+BLOCK_SIZE = 1 << BLOCK_BITS
+ARRAY_MAX = 4096
+BITMAP_WORDS = BLOCK_SIZE // 64
+
+KEYWORD_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+# Text fields searched by keyword queries
+KEYWORD_FIELDS = ('company_name_and_location', 'job_description', 'technology_stack', 'application_details')
+
+Container = np.ndarray  # uint16 array or uint64 bitmap
+
+
+def _is_bitmap(container: Container) -> bool:
+    return container.dtype == np.uint64
+
+
+def _to_bitmap(container: Container) -> Container:
+    if _is_bitmap(container):
+        return container
+    bits = np.zeros(BLOCK_SIZE, dtype=bool)
+    bits[container] = True
+    return np.packbits(bits, bitorder='little').view(np.uint64)
+
+
+def _to_array(container: Container) -> Container:
+    if not _is_bitmap(container):
+        return container
+    return np.flatnonzero(np.unpackbits(container.view(np.uint8), bitorder='little')).astype(np.uint16)
+
+
+def _cardinality(container: Container) -> int:
+    if _is_bitmap(container):
+        return int(np.unpackbits(container.view(np.uint8)).sum())
+    return len(container)
+
+
+def _compact(container: Container) -> Optional[Container]:
+    """Smallest representation of a container, None when it is empty"""
+    count = _cardinality(container)
+    if count == 0:
+        return None
+    if _is_bitmap(container) and count <= ARRAY_MAX:
+        return _to_array(container)
+    if not _is_bitmap(container) and count > ARRAY_MAX:
+        return _to_bitmap(container)
+    return container
+
+
+def _and(a: Container, b: Container) -> Optional[Container]:
+    if _is_bitmap(a) and _is_bitmap(b):
+        return _compact(a & b)
+    if _is_bitmap(a) or _is_bitmap(b):
+        array, bitmap = (b, a) if _is_bitmap(a) else (a, b)
+        words = bitmap[array >> 6]
+        hit = (words >> (array & 63).astype(np.uint64)) & np.uint64(1)
+        return _compact(array[hit.astype(bool)])
+    return _compact(np.intersect1d(a, b, assume_unique=True))
+
+
+def _or(a: Container, b: Container) -> Container:
+    if not _is_bitmap(a) and not _is_bitmap(b):
+        return _compact(np.union1d(a, b).astype(np.uint16))
+    return _to_bitmap(a) | _to_bitmap(b)
+
+
+def _and_not(a: Container, b: Container) -> Optional[Container]:
+    if _is_bitmap(a):
+        return _compact(a & ~_to_bitmap(b))
+    if _is_bitmap(b):
+        words = b[a >> 6]
+        hit = (words >> (a & 63).astype(np.uint64)) & np.uint64(1)
+        return _compact(a[~hit.astype(bool)])
+    return _compact(np.setdiff1d(a, b, assume_unique=True).astype(np.uint16))
+
+
+class Bitset:
+    """
+    Compressed set of doc ids (roaring-style: sorted arrays for sparse
+    blocks, bitmaps for dense ones). Supports &, |, - and iteration in
+    ascending order.
+    """
+
+    def __init__(self, containers: Optional[Dict[int, Container]] = None):
+        self.containers: Dict[int, Container] = containers or {}
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> 'Bitset':
+        ids = np.fromiter(ids, dtype=np.int64)
+        # Posting lists arrive sorted, only sort when they are not
+        if len(ids) > 1 and not (ids[1:] > ids[:-1]).all():
+            ids = np.unique(ids)
+        containers = {}
+        if len(ids):
+            blocks = ids >> BLOCK_BITS
+            bounds = np.flatnonzero(np.diff(blocks)) + 1
+            for chunk in np.split(ids, bounds):
+                containers[int(chunk[0] >> BLOCK_BITS)] = _compact((chunk & (BLOCK_SIZE - 1)).astype(np.uint16))
+        return cls(containers)
+
+    def __and__(self, other: 'Bitset') -> 'Bitset':
+        containers = {}
+        for key in self.containers.keys() & other.containers.keys():
+            container = _and(self.containers[key], other.containers[key])
+            if container is not None:
+                containers[key] = container
+        return Bitset(containers)
+
+    def __or__(self, other: 'Bitset') -> 'Bitset':
+        containers = dict(self.containers)
+        for key, container in other.containers.items():
+            containers[key] = _or(containers[key], container) if key in containers else container
+        return Bitset(containers)
+
+    def __sub__(self, other: 'Bitset') -> 'Bitset':
+        containers = {}
+        for key, container in self.containers.items():
+            if key in other.containers:
+                container = _and_not(container, other.containers[key])
+            if container is not None:
+                containers[key] = container
+        return Bitset(containers)
+
+    def __len__(self) -> int:
+        return sum(_cardinality(container) for container in self.containers.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.containers)
+
+    def to_array(self) -> np.ndarray:
+        """Doc ids in ascending order"""
+        parts = [
+            _to_array(self.containers[key]).astype(np.int64) + (key << BLOCK_BITS)
+            for key in sorted(self.containers)
+        ]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.to_array().tolist())
+
+    def nbytes(self) -> int:
+        return sum(container.nbytes for container in self.containers.values())
+
+
+def keyword_terms(text: str) -> List[str]:
+    """Lowercase search terms of a text, keeping 'c++', 'c#' and 'node.js' whole"""
+    return KEYWORD_RE.findall(clean_text(text).lower() if text else '')
+
+
+def _job_terms(job: Dict[str, Any]) -> Tuple[List[str], set]:
+    facets = job_facets(job)
+    words = set()
+    for field in KEYWORD_FIELDS:
+        value = job.get(field)
+        if isinstance(value, (list, tuple)):
+            value = ' '.join(str(item) for item in value)
+        words.update(keyword_terms(str(value or '')))
+    return facets, words
+
+
+def build_facet_index(index_dir: str, jobs: Iterable[Dict[str, Any]]) -> int:
+    """
+    Normalise every job into facets and keyword terms and write an inverted
+    index to `index_dir`. Doc ids are the positions of the jobs. Returns
+    the number of jobs indexed.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    postings: Dict[str, List[int]] = {}
+    offsets = []
+    with open(os.path.join(index_dir, RECORDS_FILE), 'wb') as records:
+        doc_id = 0
+        for job in jobs:
+            if job.get('error', False):
+                continue
+            facets, words = _job_terms(job)
+            for facet in facets:
+                postings.setdefault(facet, []).append(doc_id)
+            for word in words:
+                postings.setdefault('word:' + word, []).append(doc_id)
+            offsets.append(records.tell())
+            records.write(json.dumps(job, ensure_ascii=False).encode('utf-8') + b'\n')
+            doc_id += 1
+
+    directory = {}
+    with open(os.path.join(index_dir, POSTINGS_FILE), 'wb') as f:
+        for term, ids in postings.items():
+            entries = []
+            for key, container in Bitset.from_ids(ids).containers.items():
+                # [block, kind, byte offset, length in elements]
+                entries.append([key, 'b' if _is_bitmap(container) else 'a', f.tell(), len(container)])
+                f.write(container.tobytes())
+            directory[term] = [len(ids), entries]
+
+    np.save(os.path.join(index_dir, RECORD_OFFSETS_FILE), np.asarray(offsets, dtype=np.int64))
+    with open(os.path.join(index_dir, META_FILE), 'w', encoding='utf-8') as f:
+        # dumps rather than dump: dump streams through the slow pure Python encoder
+        f.write(json.dumps({'count': doc_id, 'terms': directory}))
+    return doc_id
+
+
+class FacetIndex:
+    """
+    Faceted filtering and keyword search over an index built by
+    build_facet_index.
+
+    Posting lists are read from a memory map on first use and kept as
+    compressed bitsets, so a filter over years of postings is a handful of
+    block-wise AND/OR operations rather than a scan of jobs.json.
+    """
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, META_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.count = meta['count']
+        self.terms: Dict[str, list] = meta['terms']
+        self._postings = np.memmap(os.path.join(index_dir, POSTINGS_FILE), dtype=np.uint8, mode='r') \
+            if os.path.getsize(os.path.join(index_dir, POSTINGS_FILE)) else np.empty(0, dtype=np.uint8)
+        self._record_offsets = np.load(os.path.join(index_dir, RECORD_OFFSETS_FILE))
+        self._records = open(os.path.join(index_dir, RECORDS_FILE), 'rb')
+        self._cache: Dict[str, Bitset] = {}
+
+    def postings(self, term: str) -> Bitset:
+        """Bitset of the docs with a facet ('tech:python') or keyword ('word:python')"""
+        if term not in self._cache:
+            containers = {}
+            for key, kind, offset, length in self.terms.get(term, [0, []])[1]:
+                dtype = np.uint64 if kind == 'b' else np.uint16
+                size = length * np.dtype(dtype).itemsize
+                containers[key] = np.frombuffer(self._postings[offset:offset + size], dtype=dtype)
+            self._cache[term] = Bitset(containers)
+        return self._cache[term]
+
+    def _all(self) -> Bitset:
+        return Bitset.from_ids(range(self.count))
+
+    def match(
+        self,
+        filters: Optional[Dict[str, Union[str, List[str]]]] = None,
+        require: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        keywords: Optional[str] = None
+    ) -> Bitset:
+        """
+        Docs matching every condition:
+
+          filters   {type: value or [values]}; values of one type are ORed,
+                    types are ANDed: {'tech': ['python', 'go'], 'work': 'remote'}
+          require   facets that must all be present: ['tech:python', 'tech:go']
+          exclude   facets that must be absent: ['work:onsite']
+          keywords  words that must all appear in the job's text
+        """
+        clauses: List[Bitset] = []
+        for kind, values in (filters or {}).items():
+            values = [values] if isinstance(values, str) else values
+            union = Bitset()
+            for value in values:
+                union = union | self.postings(parse_facet(f"{kind}:{value}"))
+            clauses.append(union)
+        clauses.extend(self.postings(parse_facet(facet)) for facet in require or [])
+        clauses.extend(self.postings('word:' + word) for word in keyword_terms(keywords or ''))
+
+        # Intersect the smallest lists first, bailing out once nothing is left
+        clauses.sort(key=len)
+        result = clauses[0] if clauses else self._all()
+        for clause in clauses[1:]:
+            if not result:
+                break
+            result = result & clause
+        for facet in exclude or []:
+            result = result - self.postings(parse_facet(facet))
+        return result
+
+    def record(self, doc_id: int) -> Dict[str, Any]:
+        self._records.seek(int(self._record_offsets[doc_id]))
+        return json.loads(self._records.readline())
+
+    def query(self, limit: Optional[int] = 20, **conditions) -> List[Dict[str, Any]]:
+        """Jobs for match(**conditions), newest first (highest doc id), at most `limit`"""
+        ids = self.match(**conditions).to_array()[::-1]
+        if limit is not None:
+            ids = ids[:limit]
+        return [self.record(doc_id) for doc_id in ids]
+
+    def facet_counts(self, kind: str, within: Optional[Bitset] = None, top: int = 20) -> List[Tuple[str, int]]:
+        """Most common values of a facet type, optionally among the docs of a result"""
+        if kind not in FACET_TYPES:
+            raise ValueError(f"Unknown facet type {kind!r}. Valid types: {list(FACET_TYPES)}")
+        prefix = kind + ':'
+        counts = Counter()
+        for term, (count, _) in self.terms.items():
+            if term.startswith(prefix):
+                counts[term[len(prefix):]] = count if within is None else len(self.postings(term) & within)
+        return [(value, count) for value, count in counts.most_common(top) if count]
+
+    def close(self):
+        self._records.close()
+        self._cache.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def build_job_facet_index(jobs_path: str, index_dir: str) -> int:
+    """Facet index over a jobs.json, JSONL or job store file"""
+    return build_facet_index(index_dir, iter_jobs(jobs_path))
+
+
+# Example usage
+if __name__ == "__main__":
+    count = build_job_facet_index('../jobs.json', '../.facet_index')
+    print(f"Indexed {count} jobs")
+    with FacetIndex('../.facet_index') as index:
+        print("Technologies:", index.facet_counts('tech', top=10))
+        start = time.perf_counter()
+        jobs = index.query(filters={'tech': ['python', 'go'], 'work': 'remote'}, keywords="engineer")
+        print(f"Query took {(time.perf_counter() - start) * 1000:.2f} ms")
+        for job in jobs:
+            print(job['company_name_and_location'])
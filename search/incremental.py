@@ -0,0 +1,241 @@
+import json
+import os
+import shutil
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SEARCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SEARCH_DIR, '..'))
+sys.path.insert(0, os.path.join(SEARCH_DIR, '..', 'preprocessing'))
+
+from job_identity import content_hash, stable_job_id
+from preprocess_data import clean_text, create_document, iter_jobs, validate_field_priority
+from embedders import HashedTfidfEmbedder
+from vector_index import VectorIndex, build_index
+
+DEFAULT_PRIORITY = ['job_description', 'technology_stack', 'company_location']
+
+BASE_DIR = "base"
+STATE_FILE = "incremental_state.json"
+DELTA_VECTORS_FILE = "delta_vectors.npy"
+DELTA_RECORDS_FILE = "delta_records.jsonl"
+
+
+def load_snapshot(jobs_path: str) -> Dict[str, Dict[str, Any]]:
+    """Valid jobs of a jobs.json/JSONL file keyed by stable id. Later duplicates win"""
+    jobs = {}
+    for job in iter_jobs(jobs_path):
+        if job.get('error', False):
+            continue
+        job = dict(job)
+        job['id'] = job.get('id') or stable_job_id(job)
+        jobs[job['id']] = job
+    return jobs
+
+
+def diff_snapshot(previous: Dict[str, str], current: Dict[str, Dict[str, Any]]) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Compare the previous id -> content hash map with the current jobs.
+    Returns (added, changed, removed) id lists.
+    """
+    added, changed = [], []
+    for identifier, job in current.items():
+        if identifier not in previous:
+            added.append(identifier)
+        elif previous[identifier] != content_hash(job):
+            changed.append(identifier)
+    removed = [identifier for identifier in previous if identifier not in current]
+    return added, changed, removed
+
+
+class IncrementalJobIndex:
+    """
+    Job search index that is kept up to date from successive jobs.json
+    snapshots without rebuilding it.
+
+    The bulk of the jobs live in an IVF `base` index. Each refresh only
+    preprocesses and embeds jobs that were added or changed since the last
+    snapshot, appending them to a small brute-force delta segment, and
+    tombstones the old entries of changed and removed jobs. Once the delta
+    and tombstones exceed `compact_ratio` of the base, the whole index is
+    rebuilt so the base stays compact.
+    """
+
+    def __init__(
+        self,
+        index_dir: str,
+        field_priority: List[str] = DEFAULT_PRIORITY,
+        compact_ratio: float = 0.2,
+        embedder_factory=HashedTfidfEmbedder
+    ):
+        validate_field_priority(field_priority)
+        self.index_dir = index_dir
+        self.field_priority = field_priority
+        self.compact_ratio = compact_ratio
+        self.embedder_factory = embedder_factory
+        os.makedirs(index_dir, exist_ok=True)
+
+        self.state = self._load_state()
+        self.base: Optional[VectorIndex] = None
+        self.delta_vectors = None
+        self._open()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+
+    def _empty_state(self) -> Dict[str, Any]:
+        return {
+            'snapshot': {},  # id -> content hash
+            'locations': {},  # id -> ['base' | 'delta', row]
+            'deleted_base': [],
+            'deleted_delta': [],
+            'delta_offsets': []  # byte offsets into the delta records file
+        }
+
+    def _load_state(self) -> Dict[str, Any]:
+        if not os.path.exists(self._path(STATE_FILE)):
+            return self._empty_state()
+        with open(self._path(STATE_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_state(self):
+        tmp_path = self._path(STATE_FILE) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self._path(STATE_FILE))
+
+    def _open(self):
+        self.close()
+        if os.path.exists(self._path(os.path.join(BASE_DIR, 'meta.json'))):
+            self.base = VectorIndex(self._path(BASE_DIR))
+        if os.path.exists(self._path(DELTA_VECTORS_FILE)):
+            self.delta_vectors = np.load(self._path(DELTA_VECTORS_FILE))
+
+    def close(self):
+        if self.base is not None:
+            self.base.close()
+        self.base = None
+        self.delta_vectors = None
+
+    def rebuild(self, jobs: Dict[str, Dict[str, Any]]):
+        """Build the base index from scratch and drop the delta segment"""
+        self.close()
+        records, documents = [], []
+        for job in jobs.values():
+            document = create_document(job, self.field_priority)
+            if document:
+                records.append(job)
+                documents.append(document)
+
+        tmp_dir = self._path(BASE_DIR + '.tmp')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        build_index(tmp_dir, documents, records, self.embedder_factory())
+        shutil.rmtree(self._path(BASE_DIR), ignore_errors=True)
+        os.replace(tmp_dir, self._path(BASE_DIR))
+        for name in (DELTA_VECTORS_FILE, DELTA_RECORDS_FILE):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+
+        self.state = self._empty_state()
+        self.state['snapshot'] = {identifier: content_hash(job) for identifier, job in jobs.items()}
+        self.state['locations'] = {job['id']: ['base', row] for row, job in enumerate(records)}
+        self._save_state()
+        self._open()
+
+    def _tombstone(self, identifier: str):
+        location = self.state['locations'].pop(identifier, None)
+        if location is not None:
+            segment, row = location
+            self.state['deleted_base' if segment == 'base' else 'deleted_delta'].append(row)
+
+    def refresh(self, jobs_path: str) -> Dict[str, int]:
+        """Bring the index in line with a new jobs snapshot. Returns counts of what changed"""
+        jobs = load_snapshot(jobs_path)
+        if self.base is None:
+            self.rebuild(jobs)
+            return {'added': len(jobs), 'changed': 0, 'removed': 0, 'rebuilt': 1}
+
+        added, changed, removed = diff_snapshot(self.state['snapshot'], jobs)
+        for identifier in changed + removed:
+            self._tombstone(identifier)
+        for identifier in removed:
+            del self.state['snapshot'][identifier]
+
+        # Only the delta is preprocessed and embedded
+        new_records, new_documents = [], []
+        for identifier in added + changed:
+            job = jobs[identifier]
+            self.state['snapshot'][identifier] = content_hash(job)
+            document = create_document(job, self.field_priority)
+            if document:
+                new_records.append(job)
+                new_documents.append(document)
+
+        if new_documents:
+            self._append_delta(new_records, new_documents)
+
+        stats = {'added': len(added), 'changed': len(changed), 'removed': len(removed), 'rebuilt': 0}
+        churn = len(self.state['delta_offsets']) + len(self.state['deleted_base'])
+        if churn > self.compact_ratio * len(self.base):
+            self.rebuild(jobs)
+            stats['rebuilt'] = 1
+        else:
+            self._save_state()
+        return stats
+
+    def _append_delta(self, records: List[Dict[str, Any]], documents: List[str]):
+        vectors = self.base.embedder.encode(documents)
+        first_row = len(self.state['delta_offsets'])
+        if self.delta_vectors is not None:
+            vectors = np.concatenate([self.delta_vectors, vectors])
+        np.save(self._path(DELTA_VECTORS_FILE), vectors)
+        self.delta_vectors = vectors
+
+        with open(self._path(DELTA_RECORDS_FILE), 'ab') as f:
+            for i, record in enumerate(records):
+                self.state['delta_offsets'].append(f.tell())
+                self.state['locations'][record['id']] = ['delta', first_row + i]
+                f.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    def _delta_record(self, row: int) -> Dict[str, Any]:
+        with open(self._path(DELTA_RECORDS_FILE), 'rb') as f:
+            f.seek(self.state['delta_offsets'][row])
+            return json.loads(f.readline())
+
+    def search(self, query: str, k: int = 10, nprobe: int = 8) -> List[Tuple[float, Dict[str, Any]]]:
+        """Top-k live jobs for a free-text query as (score, job) pairs, best first"""
+        if self.base is None:
+            return []
+        query_vector = self.base.embedder.encode([clean_text(query)])[0]
+
+        deleted_base = set(self.state['deleted_base'])
+        # Ask for extra base hits to make up for tombstoned ones
+        extra = min(len(deleted_base), 10 * k)
+        candidates = [
+            (score, 'base', row)
+            for score, row in self.base.search_vector(query_vector, k + extra, nprobe)
+            if row not in deleted_base
+        ]
+
+        if self.delta_vectors is not None and len(self.delta_vectors):
+            scores = self.delta_vectors @ query_vector
+            scores[self.state['deleted_delta']] = -np.inf
+            top = np.argsort(-scores)[:k]
+            candidates.extend((float(scores[row]), 'delta', int(row)) for row in top if np.isfinite(scores[row]))
+
+        candidates.sort(key=lambda candidate: -candidate[0])
+        return [
+            (score, self.base.record(row) if segment == 'base' else self._delta_record(row))
+            for score, segment, row in candidates[:k]
+        ]
+
+
+# Example usage: run after every extraction, only the changes get re-indexed
+if __name__ == "__main__":
+    index = IncrementalJobIndex('../.job_index_incremental')
+    print(f"Refresh: {index.refresh('../jobs.json')}")
+    for score, job in index.search("remote python backend engineer", k=3):
+        print(f"{score:.3f}  {job['company_name_and_location']}")
+    index.close()
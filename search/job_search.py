@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'preprocessing'))
+
+from preprocess_data import clean_text, iter_jobs_with_documents
+from embedders import HashedTfidfEmbedder
+from vector_index import VectorIndex, build_index
+
+DEFAULT_PRIORITY = ['job_description', 'technology_stack', 'company_location']
+
+
+def build_job_index(
+    jobs_path: str,
+    index_dir: str,
+    field_priority: List[str] = DEFAULT_PRIORITY,
+    embedder=None,
+    nlist: Optional[int] = None
+):
+    """Preprocess a jobs.json (or JSONL) file and build a search index over it"""
+    jobs, documents = [], []
+    for job, document in iter_jobs_with_documents(jobs_path, field_priority):
+        jobs.append(job)
+        documents.append(document)
+    build_index(index_dir, documents, jobs, embedder or HashedTfidfEmbedder(), nlist=nlist)
+
+
+class JobSearch:
+    """Semantic search over jobs indexed by build_job_index"""
+
+    def __init__(self, index_dir: str):
+        self.index = VectorIndex(index_dir)
+
+    def search(self, query: str, k: int = 10, nprobe: int = 8) -> List[Tuple[float, Dict[str, Any]]]:
+        # Queries get the same cleaning as the indexed documents
+        return self.index.search(clean_text(query), k=k, nprobe=nprobe)
+
+    def close(self):
+        self.index.close()
+
+
+# Example usage
+if __name__ == "__main__":
+    build_job_index('../jobs.json', '../.job_index')
+    searcher = JobSearch('../.job_index')
+
+    query = sys.argv[1] if len(sys.argv) > 1 else "remote python backend engineer"
+    start = time.perf_counter()
+    results = searcher.search(query, k=3)
+    print(f"Query {query!r} took {(time.perf_counter() - start) * 1000:.2f} ms")
+    for score, job in results:
+        print(f"{score:.3f}  {job['company_name_and_location']}")
+    searcher.close()
@@ -0,0 +1,155 @@
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from embedders import create_embedder
+
+# Files that make up an index directory
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.npy"  # float32 (n, dim), grouped by cluster
+ROW_IDS_FILE = "row_ids.npy"  # vector row -> record number
+CENTROIDS_FILE = "centroids.npy"  # float32 (nlist, dim)
+LIST_OFFSETS_FILE = "list_offsets.npy"  # cluster c owns rows [offsets[c], offsets[c + 1])
+RECORDS_FILE = "records.jsonl"  # the jobs.json entries, one per line
+RECORD_OFFSETS_FILE = "record_offsets.npy"  # byte offset of each record line
+EMBEDDER_STATE_FILE = "embedder_state.npy"
+
+
+def _spherical_kmeans(vectors: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity, returning unit-length centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # Re-seed clusters that lost all their members
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        norms[empty] = 1.0
+        centroids = sums / norms
+    return centroids.astype(np.float32)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 65536) -> np.ndarray:
+    assignment = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), batch_size):
+        assignment[start:start + batch_size] = np.argmax(vectors[start:start + batch_size] @ centroids.T, axis=1)
+    return assignment
+
+
+def build_index(
+    index_dir: str,
+    documents: List[str],
+    records: Iterable[Dict[str, Any]],
+    embedder,
+    nlist: Optional[int] = None,
+    batch_size: int = 4096,
+    train_sample: int = 50000
+):
+    """
+    Embed `documents` and write an IVF (inverted file) index to `index_dir`.
+
+    `records` are the jobs.json entries the documents were built from, in the
+    same order; they are returned by search. Vectors are grouped by k-means
+    cluster so a query only scans the few clusters closest to it.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+
+    embedder.fit(documents)
+    vectors = embedder.encode(documents, batch_size=batch_size)
+    count = len(vectors)
+    if count == 0:
+        raise ValueError("Cannot build an index from zero documents")
+
+    # sqrt(n) clusters keeps both the centroid scan and each list small
+    nlist = min(nlist or max(1, int(np.sqrt(count))), count)
+    rng = np.random.default_rng(0)
+    sample = vectors if count <= train_sample else vectors[rng.choice(count, size=train_sample, replace=False)]
+    centroids = _spherical_kmeans(sample, nlist)
+
+    assignment = _assign(vectors, centroids)
+    order = np.argsort(assignment, kind='stable')
+    list_sizes = np.bincount(assignment, minlength=nlist)
+    list_offsets = np.concatenate([[0], np.cumsum(list_sizes)]).astype(np.int64)
+
+    np.save(os.path.join(index_dir, VECTORS_FILE), vectors[order])
+    np.save(os.path.join(index_dir, ROW_IDS_FILE), order.astype(np.int64))
+    np.save(os.path.join(index_dir, CENTROIDS_FILE), centroids)
+    np.save(os.path.join(index_dir, LIST_OFFSETS_FILE), list_offsets)
+    embedder.save_state(os.path.join(index_dir, EMBEDDER_STATE_FILE))
+
+    offsets = []
+    with open(os.path.join(index_dir, RECORDS_FILE), 'wb') as f:
+        for record in records:
+            offsets.append(f.tell())
+            f.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+    if len(offsets) != count:
+        raise ValueError(f"Got {len(offsets)} records for {count} documents")
+    np.save(os.path.join(index_dir, RECORD_OFFSETS_FILE), np.asarray(offsets, dtype=np.int64))
+
+    with open(os.path.join(index_dir, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'count': count, 'nlist': nlist, 'embedder': embedder.get_config()}, f, indent=4)
+
+    print(f"Indexed {count} documents into {nlist} clusters at {index_dir}")
+
+
+class VectorIndex:
+    """Read side of an index written by build_index. Vectors are memory-mapped, not loaded"""
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, META_FILE), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+
+        self.embedder = create_embedder(self.meta['embedder'])
+        self.embedder.load_state(os.path.join(index_dir, EMBEDDER_STATE_FILE))
+
+        self.vectors = np.load(os.path.join(index_dir, VECTORS_FILE), mmap_mode='r')
+        self.row_ids = np.load(os.path.join(index_dir, ROW_IDS_FILE), mmap_mode='r')
+        self.centroids = np.load(os.path.join(index_dir, CENTROIDS_FILE))
+        self.list_offsets = np.load(os.path.join(index_dir, LIST_OFFSETS_FILE))
+        self.record_offsets = np.load(os.path.join(index_dir, RECORD_OFFSETS_FILE), mmap_mode='r')
+        self._records_file = open(os.path.join(index_dir, RECORDS_FILE), 'rb')
+
+    def __len__(self):
+        return self.meta['count']
+
+    def close(self):
+        self._records_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def record(self, record_number: int) -> Dict[str, Any]:
+        self._records_file.seek(int(self.record_offsets[record_number]))
+        return json.loads(self._records_file.readline())
+
+    def search_vector(self, query: np.ndarray, k: int = 10, nprobe: int = 8) -> List[Tuple[float, int]]:
+        """Top-k (score, record_number) by cosine similarity, scanning the `nprobe` nearest clusters"""
+        nprobe = min(nprobe, len(self.centroids))
+        closest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+
+        rows = np.concatenate([
+            np.arange(self.list_offsets[c], self.list_offsets[c + 1]) for c in closest
+        ])
+        if len(rows) == 0:
+            return []
+        rows.sort()  # sequential reads from the memory map
+        scores = np.asarray(self.vectors[rows]) @ query
+
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), int(self.row_ids[rows[i]])) for i in top]
+
+    def search(self, query: str, k: int = 10, nprobe: int = 8) -> List[Tuple[float, Dict[str, Any]]]:
+        """Top-k jobs for a free-text query as (score, job) pairs, best first"""
+        query_vector = self.embedder.encode([query])[0]
+        return [(score, self.record(number)) for score, number in self.search_vector(query_vector, k, nprobe)]
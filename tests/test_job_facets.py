@@ -0,0 +1,16 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from job_facets import job_facets
+
+
+def test_prose_in_the_location_is_not_a_city():
+    facets = job_facets({'company_name_and_location': 'Acme | Visa Sponsorship Available'})
+    assert not [facet for facet in facets if facet.startswith(('city:', 'work:'))]
+
+
+def test_known_city_implies_onsite():
+    facets = job_facets({'company_name_and_location': 'Acme | San Francisco, CA'})
+    assert {'city:san francisco', 'region:us', 'work:onsite'} <= set(facets)
@@ -0,0 +1,55 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from job_identity import stable_job_id
+from job_sink import JsonlJobSink, compact_jsonl_to_json
+from job_store import JobStore
+
+STRIPE_SF = {
+    'company_name_and_location': 'Stripe | San Francisco, CA',
+    'job_description': 'Software Engineer on the Payments team, building card processing',
+    'technology_stack': 'Ruby, Go',
+    'application_details': 'https://stripe.com/jobs',
+    'thread_month': '2025-03'
+}
+STRIPE_DUBLIN = {
+    'company_name_and_location': 'Stripe | Dublin, Ireland',
+    'job_description': 'Software Engineer, Data Infrastructure: batch and streaming pipelines',
+    'technology_stack': 'Scala, Spark',
+    'application_details': 'https://stripe.com/jobs',
+    'thread_month': '2025-03'
+}
+
+
+def test_roles_of_one_company_get_different_ids():
+    assert stable_job_id(STRIPE_SF) != stable_job_id(STRIPE_DUBLIN)
+
+
+def test_reworded_description_keeps_its_id():
+    reworded = dict(STRIPE_SF, job_description='Software Engineer for Payments, working on card processing')
+    assert stable_job_id(reworded) == stable_job_id(STRIPE_SF)
+
+
+def test_recased_role_keeps_its_id():
+    recased = dict(STRIPE_SF, job_description='We are hiring a software engineer for card processing on Payments')
+    assert stable_job_id(recased) == stable_job_id(STRIPE_SF)
+
+
+def test_id_without_a_role_ignores_the_description():
+    first = dict(STRIPE_SF, job_description='Help us build card processing', technology_stack='')
+    second = dict(first, job_description='Come and build our card processing')
+    assert stable_job_id(first) == stable_job_id(second)
+
+
+def test_both_roles_survive_compaction(tmp_path):
+    jsonl_path = str(tmp_path / 'jobs.jsonl')
+    with JsonlJobSink(jsonl_path) as sink:
+        assert sink.write(dict(STRIPE_SF))
+        assert sink.write(dict(STRIPE_DUBLIN))
+    assert compact_jsonl_to_json(jsonl_path, str(tmp_path / 'jobs.json')) == 2
+
+    with JobStore(str(tmp_path / 'jobs.sqlite')) as store:
+        assert store.write_many([dict(STRIPE_SF), dict(STRIPE_DUBLIN)]) == 2
+        assert len(store) == 2
@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from job_sink import JsonlJobSink, compact_jsonl_to_json, read_jsonl
+
+GOOD = '{"company_name_and_location": "Acme | Remote", "job_description": "Backend engineer"}\n'
+LATER = '{"company_name_and_location": "Initech | Austin, TX", "job_description": "Data engineer"}\n'
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    path = str(tmp_path / 'jobs.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(GOOD + '{"company_name_and_location": "Ini')
+    with JsonlJobSink(path) as sink:
+        assert len(sink) == 1
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == GOOD
+
+
+def test_last_line_without_newline_is_kept_apart(tmp_path):
+    path = str(tmp_path / 'jobs.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(GOOD.rstrip('\n'))
+    with JsonlJobSink(path) as sink:
+        sink.write({'company_name_and_location': 'Initech | Austin, TX', 'job_description': 'Data engineer'})
+    assert len(list(read_jsonl(path))) == 2
+
+
+def test_bad_lines_mid_file_keep_the_jobs_after_them(tmp_path):
+    path = str(tmp_path / 'jobs.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(GOOD + 'not json\n[1, 2]\n' + LATER)
+    with JsonlJobSink(path) as sink:
+        assert len(sink) == 2
+    assert len(list(read_jsonl(path))) == 2
+
+
+def test_run_scope_leaves_out_jobs_of_earlier_runs(tmp_path):
+    path = str(tmp_path / 'jobs.jsonl')
+    json_path = str(tmp_path / 'jobs.json')
+    with JsonlJobSink(path) as sink:
+        sink.write({'company_name_and_location': 'Acme | Remote', 'job_description': 'Backend engineer'})
+    with JsonlJobSink(path) as sink:
+        # Unchanged, so not written again, but still part of this run
+        sink.write({'company_name_and_location': 'Acme | Remote', 'job_description': 'Backend engineer'})
+        sink.write({'company_name_and_location': 'Initech | Austin, TX', 'job_description': 'Data engineer'})
+    assert compact_jsonl_to_json(path, json_path, ids=sink.run_ids) == 2
+    with JsonlJobSink(path) as sink:
+        sink.write({'company_name_and_location': 'Initech | Austin, TX', 'job_description': 'Data engineer'})
+    assert compact_jsonl_to_json(path, json_path, ids=sink.run_ids) == 1
+    assert compact_jsonl_to_json(path, json_path) == 2
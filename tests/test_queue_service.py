@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+pytest.importorskip('crawl4ai')
+
+from job_store import JobStore
+from llm_extraction.extraction_cache import ExtractionCache
+from queue_service import QueueClient, QueueService, QueueServiceError, RemoteExtractionCache
+from work_queue import DONE, WorkQueue
+
+JOB = {
+    'company_name_and_location': 'Acme | Remote',
+    'technology_stack': 'Python',
+    'job_description': 'Backend engineer',
+    'application_details': 'jobs@acme.test',
+    'thread_month': '2025-03'
+}
+
+
+@pytest.fixture
+def service(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.sqlite'), lease_seconds=30)
+    cache = ExtractionCache(str(tmp_path / 'cache.sqlite'))
+    with QueueService(queue, str(tmp_path / 'jobs.sqlite'), cache, host='127.0.0.1', port=0, token='secret') as running:
+        yield running
+    cache.close()
+    queue.close()
+
+
+def test_remote_worker_round_trip(service):
+    service.queue.enqueue([('page:a', 'page', {'url': 'a'})])
+    client = QueueClient(service.url, token='secret')
+    assert client.lease_seconds == 30
+
+    task = client.lease('remote-1')
+    assert task.id == 'page:a' and task.payload == {'url': 'a'}
+    assert client.heartbeat(task)
+    assert client.complete(task, [('posts:1', 'posts', {'url': 'a', 'posts': ['x']})])
+    assert service.queue.counts()['page'] == {DONE: 1}
+    assert client.unfinished() == 1
+
+    assert client.write_jobs([JOB]) == 1
+    assert client.write_jobs([JOB]) == 0
+    with JobStore(service.store_path) as store:
+        assert len(store) == 1
+
+    cache = RemoteExtractionCache(client)
+    assert cache.get('k') is None
+    cache.put('k', [JOB])
+    assert cache.get('k') == [JOB]
+
+
+def test_wrong_token_is_refused(service):
+    with pytest.raises(QueueServiceError):
+        QueueClient(service.url, token='guess', retries=0)
@@ -0,0 +1,267 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fast_json import dumps, loads
+
+# Task states. A leased task whose lease has expired counts as pending again
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+# A worker not seen for this many lease periods is reported as gone
+WORKER_TIMEOUT_LEASES = 2
+
+
+class Task:
+    """A leased task. `token` identifies this lease; it changes every time the task is leased"""
+
+    def __init__(self, id: str, kind: str, payload: Any, token: int, attempts: int):
+        self.id = id
+        self.kind = kind
+        self.payload = payload
+        self.token = token
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Task({self.id!r}, kind={self.kind!r}, attempt={self.attempts})"
+
+
+class WorkQueue:
+    """
+    Durable task queue in one SQLite file, shared by the processes of a
+    distributed crawl. The file is opened in WAL mode, whose shared memory
+    index only works between processes on the same host, so processes on
+    other hosts go through queue_service.QueueService instead of opening it
+    over a network share.
+
+    Tasks are enqueued under a caller-chosen id; enqueueing an id that is
+    already there does nothing, so a coordinator or a retried task can
+    enqueue the same work again without duplicating it. A worker leases
+    one task at a time for `lease_seconds` and must renew the lease with
+    heartbeat() while it works. When a worker dies its leases run out and
+    the tasks go to the next worker that asks. Every lease gets a new
+    token and complete() / fail() / heartbeat() only act on the current
+    one, so a worker that stalled past its lease cannot finish a task
+    someone else now holds. A task that failed or lost its lease
+    `max_attempts` times is parked as failed.
+
+    Lower `priority` values are leased first, then older tasks.
+    """
+
+    def __init__(self, path: str = ".work_queue.sqlite", lease_seconds: float = 120.0, max_attempts: int = 5):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Workers call in from threads, access is serialised by _lock. Transactions are explicit
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # No fsync per commit. A crashed process loses nothing; a power cut may undo the
+        # last few state changes, which only means some finished tasks run again
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS tasks (
+                   id TEXT PRIMARY KEY,
+                   kind TEXT NOT NULL,
+                   payload TEXT NOT NULL,
+                   priority INTEGER NOT NULL DEFAULT 0,
+                   state TEXT NOT NULL,
+                   attempts INTEGER NOT NULL DEFAULT 0,
+                   lease_owner TEXT,
+                   lease_token INTEGER NOT NULL DEFAULT 0,
+                   lease_expires REAL,
+                   available_at REAL NOT NULL,
+                   error TEXT,
+                   created_at REAL NOT NULL,
+                   finished_at REAL
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_ready ON tasks(state, priority, available_at)")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS workers (
+                   id TEXT PRIMARY KEY,
+                   last_seen REAL NOT NULL,
+                   tasks_done INTEGER NOT NULL DEFAULT 0
+               )"""
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def enqueue(self, tasks: Iterable[Tuple[str, str, Any]], priority: int = 0, redo_done: bool = False) -> int:
+        """
+        Add (id, kind, payload) tasks. Ids already in the queue are skipped,
+        except, with `redo_done`, those that are done: they become pending
+        again with a fresh attempt budget. Returns how many were added or reset.
+        """
+        with self._lock, self._transaction():
+            return self._insert(tasks, priority, redo_done)
+
+    def _insert(self, tasks: Iterable[Tuple[str, str, Any]], priority: int, redo_done: bool = False) -> int:
+        now = time.time()
+        before = self._conn.total_changes
+        on_conflict = (
+            "ON CONFLICT(id) DO UPDATE SET payload = excluded.payload, state = excluded.state, attempts = 0, "
+            "error = NULL, available_at = excluded.available_at, finished_at = NULL WHERE state = ?"
+            if redo_done else "ON CONFLICT(id) DO NOTHING"
+        )
+        self._conn.executemany(
+            "INSERT INTO tasks (id, kind, payload, priority, state, available_at, created_at) "
+            f"VALUES (?, ?, ?, ?, ?, ?, ?) {on_conflict}",
+            [(task_id, kind, dumps(payload), priority, PENDING, now, now, *((DONE,) if redo_done else ()))
+             for task_id, kind, payload in tasks]
+        )
+        return self._conn.total_changes - before
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two processes never lease the same task
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def lease(self, owner: str, kinds: Optional[Sequence[str]] = None) -> Optional[Task]:
+        """Lease the next ready task (of one of `kinds`) to `owner`, or None when there is none"""
+        now = time.time()
+        kind_filter = f" AND kind IN ({', '.join('?' * len(kinds))})" if kinds else ""
+        with self._lock, self._transaction():
+            # Tasks whose workers keep dying are not handed out forever
+            self._conn.execute(
+                "UPDATE tasks SET state = ?, error = 'lease expired', finished_at = ? "
+                "WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, now, LEASED, now, self.max_attempts)
+            )
+            row = self._conn.execute(
+                "SELECT id FROM tasks "
+                f"WHERE ((state = ? AND available_at <= ?) OR (state = ? AND lease_expires < ?)){kind_filter} "
+                "ORDER BY priority, rowid LIMIT 1",
+                (PENDING, now, LEASED, now, *(kinds or ()))
+            ).fetchone()
+            self._conn.execute(
+                "INSERT INTO workers (id, last_seen) VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET last_seen = excluded.last_seen",
+                (owner, now)
+            )
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE tasks SET state = ?, lease_owner = ?, lease_token = lease_token + 1, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (LEASED, owner, now + self.lease_seconds, row[0])
+            )
+            task_id, kind, payload, token, attempts = self._conn.execute(
+                "SELECT id, kind, payload, lease_token, attempts FROM tasks WHERE id = ?", (row[0],)
+            ).fetchone()
+        return Task(task_id, kind, loads(payload), token, attempts)
+
+    def heartbeat(self, task: Task) -> bool:
+        """Extend the lease on a task. False when the lease was lost and the work should stop"""
+        now = time.time()
+        with self._lock, self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND lease_token = ? AND state = ?",
+                (now + self.lease_seconds, task.id, task.token, LEASED)
+            )
+            if cursor.rowcount != 1:
+                return False
+            self._conn.execute(
+                "UPDATE workers SET last_seen = ? WHERE id = (SELECT lease_owner FROM tasks WHERE id = ?)", (now, task.id)
+            )
+        return True
+
+    def complete(self, task: Task, children: Iterable[Tuple[str, str, Any]] = (), child_priority: int = 0) -> bool:
+        """
+        Mark a task done and enqueue the tasks it produced, in one
+        transaction. False, with nothing changed, when the lease was lost.
+        """
+        with self._lock, self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE tasks SET state = ?, error = NULL, finished_at = ? WHERE id = ? AND lease_token = ? AND state = ?",
+                (DONE, time.time(), task.id, task.token, LEASED)
+            )
+            if cursor.rowcount != 1:
+                return False
+            self._insert(children, child_priority)
+            self._conn.execute(
+                "UPDATE workers SET tasks_done = tasks_done + 1 WHERE id = "
+                "(SELECT lease_owner FROM tasks WHERE id = ?)", (task.id,)
+            )
+        return True
+
+    def fail(self, task: Task, error: str, retry_delay: float = 0.0) -> Optional[str]:
+        """
+        Give a task back after an error: pending again after `retry_delay`
+        seconds, or failed once it has had max_attempts. Returns the new
+        state, or None when the lease was already lost.
+        """
+        state = FAILED if task.attempts >= self.max_attempts else PENDING
+        now = time.time()
+        with self._lock, self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE tasks SET state = ?, error = ?, available_at = ?, lease_expires = NULL, finished_at = ? "
+                "WHERE id = ? AND lease_token = ? AND state = ?",
+                (state, error, now + retry_delay, now if state == FAILED else None, task.id, task.token, LEASED)
+            )
+        return state if cursor.rowcount == 1 else None
+
+    def release(self, task: Task, delay: float = 0.0) -> bool:
+        """Give a task back without counting the attempt (on shutdown, or when the provider is down)"""
+        with self._lock, self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE tasks SET state = ?, attempts = attempts - 1, available_at = ?, lease_expires = NULL "
+                "WHERE id = ? AND lease_token = ? AND state = ?",
+                (PENDING, time.time() + delay, task.id, task.token, LEASED)
+            )
+        return cursor.rowcount == 1
+
+    def retry_failed(self) -> int:
+        """Put failed tasks back as pending with a fresh attempt budget. Returns how many"""
+        with self._lock, self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE tasks SET state = ?, attempts = 0, available_at = ?, finished_at = NULL WHERE state = ?",
+                (PENDING, time.time(), FAILED)
+            )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Tasks per kind and state"""
+        counts: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            rows = self._conn.execute("SELECT kind, state, COUNT(*) FROM tasks GROUP BY kind, state").fetchall()
+        for kind, state, count in rows:
+            counts.setdefault(kind, {})[state] = count
+        return counts
+
+    def unfinished(self) -> int:
+        """Tasks that are still pending or leased"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE state IN (?, ?)", (PENDING, LEASED)
+            ).fetchone()[0]
+
+    def failed_tasks(self) -> List[Tuple[str, str]]:
+        """(id, last error) of the tasks parked as failed"""
+        with self._lock:
+            return self._conn.execute("SELECT id, error FROM tasks WHERE state = ? ORDER BY rowid", (FAILED,)).fetchall()
+
+    def workers(self) -> List[Tuple[str, int, bool]]:
+        """(worker id, tasks done, alive) for every worker that has leased from the queue"""
+        horizon = time.time() - self.lease_seconds * WORKER_TIMEOUT_LEASES
+        with self._lock:
+            rows = self._conn.execute("SELECT id, tasks_done, last_seen FROM workers ORDER BY id").fetchall()
+        return [(worker, done, last_seen >= horizon) for worker, done, last_seen in rows]
+